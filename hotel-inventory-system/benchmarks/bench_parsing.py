@@ -0,0 +1,89 @@
+"""
+Timestamp parsing and daily aggregation, old path vs new.
+
+Builds a raw 'Date Time Served' column ('1/1/2023 19:35' style, minute
+resolution over a year) with bar and item keys, then times:
+
+    parse     pd.to_datetime(errors='coerce') + normalize + .dt.date (Python
+              date objects), vs parse_days (detected format, each distinct
+              date part parsed once, datetime64 days)
+    daily     groupby on (bar, item, date object) as the series index used
+              to, vs build_series_index (datetime64 groupby plus zero-filled
+              calendar days)
+
+Run from the project root:
+    python -m benchmarks.bench_parsing [--rows 10000000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.series_index import build_series_index
+from src.utils import detect_date_format, parse_days
+
+
+def make_raw_timestamps(n_rows, n_bars=20, n_items=100, seed=0):
+    """Raw-export-like frame: time-ordered minute timestamps as strings plus bar/item/consumption."""
+    rng = np.random.default_rng(seed)
+    minutes = pd.date_range('2023-01-01', periods=365 * 24 * 60, freq='min')
+    # Format each distinct minute once; rows share the string objects like a parsed CSV column
+    labels = np.asarray([f"{t.month}/{t.day}/{t.year} {t.hour:02d}:{t.minute:02d}" for t in minutes], dtype=object)
+    served = labels[np.sort(rng.integers(0, len(labels), n_rows))]
+    bars = np.array([f"Bar {b:03d}" for b in range(n_bars)], dtype=object)
+    items = np.array([f"Type {i % 7} - Brand {i:04d}" for i in range(n_items)], dtype=object)
+    return pd.DataFrame({
+        'Date Time Served': served,
+        'Bar Name': pd.Categorical(bars[rng.integers(0, n_bars, n_rows)]),
+        'Item': pd.Categorical(items[rng.integers(0, n_items, n_rows)]),
+        'Consumed (ml)': rng.gamma(2.0, 25.0, n_rows).round(1),
+        'Closing Balance (ml)': rng.uniform(0, 5000, n_rows).round(1)
+    })
+
+
+def legacy_daily(frame):
+    """The series index's aggregation before days became datetime64: one groupby on date objects."""
+    daily = frame.groupby(['Bar Name', 'Item', 'Day'], sort=True, observed=True).agg(
+        consumed=('Consumed (ml)', 'sum'), closing=('Closing Balance (ml)', 'last')).reset_index()
+    bars = daily['Bar Name'].to_numpy(dtype=object)
+    items = daily['Item'].to_numpy(dtype=object)
+    change = np.ones(len(daily), dtype=bool)
+    change[1:] = (bars[1:] != bars[:-1]) | (items[1:] != items[:-1])
+    return daily['Day'].to_numpy(), pd.factorize(daily['Day'].to_numpy(), sort=True), np.flatnonzero(change)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    args = parser.parse_args(argv)
+
+    print(f"Generating {args.rows:,} raw rows...")
+    raw = make_raw_timestamps(args.rows)
+    values = raw['Date Time Served']
+
+    def old_parse():
+        return pd.to_datetime(values, errors='coerce').dt.normalize().dt.date
+
+    old_parse_s, old_days = timed(old_parse)
+    new_parse_s, new_days = timed(lambda: parse_days(values))
+    assert (pd.to_datetime(old_days) == new_days).all()
+
+    keys = raw[['Bar Name', 'Item', 'Consumed (ml)', 'Closing Balance (ml)']]
+    old_daily_s, _ = timed(lambda: legacy_daily(keys.assign(Day=old_days)))
+    new_daily_s, index = timed(lambda: build_series_index(keys.assign(Day=new_days)))
+
+    print(f"Detected format: {detect_date_format(values)!r}; {len(index)} pairs over {len(index.days)} days")
+    print(f"{'step':<10} {'old (s)':>9} {'new (s)':>9} {'speedup':>8}")
+    for step, old, new in (('parse', old_parse_s, new_parse_s), ('daily', old_daily_s, new_daily_s),
+                           ('total', old_parse_s + old_daily_s, new_parse_s + new_daily_s)):
+        print(f"{step:<10} {old:>9.3f} {new:>9.3f} {old / new:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Time every pipeline stage on synthetic exports at several scales, append the
+results to a JSON history file and flag stages that got slower than a stored
+baseline.
+
+Run from the project root:
+    python -m benchmarks.bench_pipeline                      # small + medium
+    python -m benchmarks.bench_pipeline --scales large --backend statsmodels
+    python -m benchmarks.bench_pipeline --update-baseline    # accept current timings
+
+Exits with status 1 when any stage regresses by more than --threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+import matplotlib
+matplotlib.use('Agg')
+
+from benchmarks.synthetic import write_raw_export
+from src.data_model import ForecastTable
+from src.forecasting import forecast_demand
+from src.par_levels import calculate_par_levels
+from src.profiling import RunProfiler
+from src.series_index import build_series_index
+from src.simulation import simulate_inventory_system
+from src.reporting import render_report
+from src.utils import generate_recommendations, load_and_prepare_data
+
+SCALES = {
+    # name: (bars, brands, days, rows per day)
+    'small': (10, 20, 90, 3),
+    'medium': (20, 50, 180, 3),
+    'large': (50, 100, 365, 2),
+}
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+HISTORY_FILE = os.path.join(RESULTS_DIR, 'history.json')
+BASELINE_FILE = os.path.join(RESULTS_DIR, 'baseline.json')
+
+
+def run_pipeline(csv_path, backend, n_jobs, repeats=1):
+    """Run every stage repeats times; returns {stage: record} keeping each stage's fastest run."""
+    best = {}
+    for _ in range(repeats):
+        profiler = RunProfiler()
+        with contextlib.redirect_stdout(io.StringIO()):
+            with profiler.stage('load_and_prepare_data') as stage:
+                df = load_and_prepare_data(csv_path)
+                stage['rows'] = len(df)
+            with profiler.stage('build_series_index', rows=len(df)) as stage:
+                index = build_series_index(df)
+                stage['pairs'] = len(index)
+            with profiler.stage('forecast_demand', pairs=len(index)):
+                forecasts = ForecastTable.from_dict(forecast_demand(
+                    df, forecast_days=30, n_jobs=n_jobs, series_index=index, backend=backend))
+            with profiler.stage('calculate_par_levels', pairs=len(forecasts)):
+                par_levels = calculate_par_levels(forecasts, lead_time_days=3, service_level=0.95)
+            with profiler.stage('simulate_inventory_system', pairs=len(par_levels)):
+                results_df, _ = simulate_inventory_system(df, forecasts, par_levels, simulation_days=30,
+                                                          series_index=index)
+            with profiler.stage('generate_recommendations', pairs=len(par_levels)):
+                rec_df = generate_recommendations(df, forecasts, par_levels, results_df,
+                                                  series_index=index)
+            with profiler.stage('render_report', pairs=len(par_levels)):
+                render_report(index, par_levels, rec_df, n_jobs=n_jobs, force=True)
+        for record in profiler.stages:
+            name = record['stage']
+            if name not in best or record['wall_seconds'] < best[name]['wall_seconds']:
+                best[name] = record
+    return best
+
+
+def compare_to_baseline(results, baseline, threshold=0.2, min_seconds=0.05):
+    """
+    Stages slower than baseline by more than threshold (a fraction).
+
+    results and baseline are {scale: {stage: {'wall_seconds', ...}}}.
+    Differences under min_seconds are treated as timer noise.
+    """
+    regressions = []
+    for scale, stages in results.items():
+        for stage, record in stages.items():
+            base = baseline.get(scale, {}).get(stage)
+            if base is None:
+                continue
+            before, after = base['wall_seconds'], record['wall_seconds']
+            if after - before > min_seconds and after > before * (1 + threshold):
+                regressions.append({'scale': scale, 'stage': stage, 'baseline_seconds': before,
+                                    'seconds': after, 'slowdown': round(after / before, 2)})
+    return regressions
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _read_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _write_json(path, payload):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', default='small,medium',
+                        help=f"comma-separated subset of {', '.join(SCALES)}")
+    parser.add_argument('--backend', default='batched', choices=['batched', 'statsmodels', 'tiered', 'hierarchical'])
+    parser.add_argument('--jobs', type=int, default=1, help='forecast worker processes')
+    parser.add_argument('--repeats', type=int, default=1, help='keep the fastest of N runs per stage')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='flag stages more than this fraction slower than baseline')
+    parser.add_argument('--history', default=HISTORY_FILE)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    scales = [s.strip() for s in args.scales.split(',') if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"unknown scales: {', '.join(unknown)}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)  # render_report writes its PNGs to the working directory
+        try:
+            for scale in scales:
+                n_bars, n_brands, n_days, rows_per_day = SCALES[scale]
+                csv_path = os.path.join(workdir, f"{scale}.csv")
+                n_rows = write_raw_export(csv_path, n_bars=n_bars, n_brands=n_brands, n_days=n_days,
+                                          rows_per_day=rows_per_day)
+                print(f"\n{scale}: {n_bars} bars x {n_brands} brands x {n_days} days = {n_rows} rows")
+                results[scale] = run_pipeline(csv_path, args.backend, args.jobs, args.repeats)
+                for stage, record in results[scale].items():
+                    print(f"   {stage:<28} {record['wall_seconds']:>9.3f}s wall "
+                          f"{record['cpu_seconds']:>9.3f}s cpu")
+        finally:
+            os.chdir(cwd)
+
+    baseline = _read_json(args.baseline, {})
+    if baseline and baseline.get('backend') != args.backend:
+        print(f"\nBaseline was recorded with the {baseline.get('backend')} backend; not comparing")
+        regressions = []
+    else:
+        regressions = compare_to_baseline(results, baseline.get('results', {}), args.threshold)
+
+    history = _read_json(args.history, [])
+    history.append({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'backend': args.backend,
+        'jobs': args.jobs,
+        'results': results,
+        'regressions': regressions
+    })
+    _write_json(args.history, history)
+    print(f"\nAppended run to {args.history}")
+
+    if args.update_baseline or not baseline:
+        kept = baseline.get('results', {}) if baseline.get('backend') == args.backend else {}
+        merged = {**kept, **results}
+        _write_json(args.baseline, {'revision': _git_revision(), 'backend': args.backend,
+                                    'results': merged})
+        print(f"Baseline written to {args.baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) slower than baseline by more than {args.threshold:.0%}:")
+        for r in regressions:
+            print(f"   {r['scale']}/{r['stage']}: {r['baseline_seconds']:.3f}s -> {r['seconds']:.3f}s "
+                  f"({r['slowdown']}x)")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Per-pair boolean masking vs the shared SeriesIndex.
+
+Run from the project root:
+    python -m benchmarks.bench_series_index
+"""
+import time
+
+from benchmarks.synthetic import make_prepared_frame
+from src.series_index import build_series_index
+
+SCALES = [
+    # (bars, items, days)
+    (5, 10, 60),
+    (10, 20, 120),
+    (20, 20, 180),
+    (40, 20, 365),
+]
+
+
+def masked_lookups(df):
+    """What each stage used to do: one full-frame mask (+ sort) per pair."""
+    daily = df.groupby(['Day', 'Bar Name', 'Item'])['Consumed (ml)'].sum().reset_index()
+    for (bar, item), _ in df.groupby(['Bar Name', 'Item']).size().items():
+        daily[(daily['Bar Name'] == bar) & (daily['Item'] == item)].sort_values('Day')
+        df[(df['Bar Name'] == bar) & (df['Item'] == item)].sort_values('Date')
+
+
+def indexed_lookups(df):
+    index = build_series_index(df)
+    for key in index:
+        index[key]
+        index.latest_closing(key)
+
+
+def main():
+    print(f"{'bars':>5} {'items':>6} {'days':>5} {'rows':>10} {'pairs':>6} "
+          f"{'masked (s)':>11} {'indexed (s)':>12} {'speedup':>8}")
+    for n_bars, n_items, n_days in SCALES:
+        df = make_prepared_frame(n_bars, n_items, n_days)
+        start = time.perf_counter()
+        masked_lookups(df)
+        masked = time.perf_counter() - start
+        start = time.perf_counter()
+        indexed_lookups(df)
+        indexed = time.perf_counter() - start
+        print(f"{n_bars:>5} {n_items:>6} {n_days:>5} {len(df):>10} {n_bars * n_items:>6} "
+              f"{masked:>11.3f} {indexed:>12.3f} {masked / indexed:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
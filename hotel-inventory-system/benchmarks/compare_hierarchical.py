@@ -0,0 +1,69 @@
+"""
+Accuracy and runtime of hierarchical forecasting vs per-item fitting.
+
+Holds out the last HOLDOUT calendar days of hotel_bar_inventory.csv, fits
+every backend on the rest and compares each pair's forecast daily demand
+with its actual mean consumption per observed day in the holdout.
+
+Run from the project root:
+    python -m benchmarks.compare_hierarchical [data_file]
+"""
+import contextlib
+import io
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from src.forecasting import forecast_demand
+from src.series_index import build_series_index
+from src.utils import load_and_prepare_data
+
+HOLDOUT = 56
+
+CANDIDATES = [
+    # (label, forecast_demand keyword arguments)
+    ('statsmodels per item', {'backend': 'statsmodels'}),
+    ('batched per item', {'backend': 'batched'}),
+    ('tiered per item', {'backend': 'tiered'}),
+    ('bar_type proportions', {'backend': 'hierarchical', 'hierarchy': 'bar_type', 'reconcile': 'proportions'}),
+    ('bar_type ols', {'backend': 'hierarchical', 'hierarchy': 'bar_type', 'reconcile': 'ols'}),
+    ('bar_type wls', {'backend': 'hierarchical', 'hierarchy': 'bar_type', 'reconcile': 'wls'}),
+    ('brand proportions', {'backend': 'hierarchical', 'hierarchy': 'brand', 'reconcile': 'proportions'}),
+]
+
+
+def main(data_file='hotel_bar_inventory.csv'):
+    warnings.filterwarnings('ignore')
+    df = load_and_prepare_data(data_file)
+    days = build_series_index(df).days
+    cutoff = days[-HOLDOUT]
+    train = df[df['Day'] < cutoff]
+    holdout = df[df['Day'] >= cutoff]
+    daily = holdout.groupby(['Bar Name', 'Item', 'Day'], observed=True)['Consumed (ml)'].sum()
+    actual = daily.groupby(level=[0, 1], observed=True).mean().to_dict()
+    index = build_series_index(train)
+
+    results = []
+    for label, kwargs in CANDIDATES:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            forecasts = forecast_demand(train, forecast_days=HOLDOUT, series_index=index, **kwargs)
+            elapsed = time.perf_counter() - start
+        results.append((label, forecasts, elapsed))
+
+    keys = [k for k in actual if all(k in fc for _, fc, _ in results)]
+    truth = np.array([actual[k] for k in keys])
+    print(f"Pairs compared: {len(keys)} (holdout: last {HOLDOUT} calendar days, "
+          f"actual mean {truth.mean():.2f} ml per observed day)")
+    print(f"{'method':<22} {'time (s)':>9} {'MAE (ml/day)':>13} {'WAPE':>7} {'bias (ml/day)':>14}")
+    for label, forecasts, elapsed in results:
+        fc = np.array([forecasts[k]['forecast_daily'] for k in keys])
+        error = fc - truth
+        print(f"{label:<22} {elapsed:>9.3f} {np.abs(error).mean():>13.2f} "
+              f"{np.abs(error).sum() / truth.sum():>7.1%} {error.mean():>14.2f}")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+
+def make_prepared_frame(n_bars=10, n_items=10, n_days=90, rows_per_day=3, seed=0):
+    """
+    Synthetic frame shaped like the output of load_and_prepare_data.
+
+    Every (bar, item) pair gets rows_per_day transactions per day with a
+    weekly pattern, so rows = n_bars * n_items * n_days * rows_per_day.
+    """
+    rng = np.random.default_rng(seed)
+    bars = [f"Bar {b:03d}" for b in range(n_bars)]
+    items = [f"Type {i % 5} - Brand {i:04d}" for i in range(n_items)]
+    dates = pd.date_range('2023-01-01', periods=n_days, freq='D')
+
+    n_pairs = n_bars * n_items
+    n_rows = n_pairs * n_days * rows_per_day
+    pair_idx = np.repeat(np.arange(n_pairs), n_days * rows_per_day)
+    day_idx = np.tile(np.repeat(np.arange(n_days), rows_per_day), n_pairs)
+
+    weekly = 1.0 + 0.4 * (dates.dayofweek.to_numpy() >= 4)
+    consumed = rng.gamma(2.0, 50.0, n_rows) * weekly[day_idx]
+    closing = rng.uniform(0, 5000, n_rows)
+
+    date_col = dates[day_idx]
+    return pd.DataFrame({
+        'Date': date_col,
+        'Day': date_col,
+        'Bar Name': np.asarray(bars, dtype=object)[pair_idx // n_items],
+        'Item': np.asarray(items, dtype=object)[pair_idx % n_items],
+        'Consumed (ml)': consumed.round(2),
+        'Closing Balance (ml)': closing.round(2)
+    })
+
+
+ALCOHOL_TYPES = ['Beer', 'Gin', 'Rum', 'Tequila', 'Vodka', 'Whiskey', 'Wine']
+
+
+def make_raw_export(n_bars=10, n_brands=10, n_days=90, rows_per_day=3, restock_every=7,
+                    seed=0):
+    """
+    Synthetic inventory export in the raw CSV schema ('Date Time Served',
+    'Bar Name', 'Alcohol Type', 'Brand Name', opening/purchase/consumed/
+    closing balances), ordered by time like the real file.
+
+    Consumption has a weekly pattern (busier Friday-Sunday). Every
+    restock_every rows a pair is topped back up by what it consumed since
+    the last restock, so balances stay consistent row to row:
+    closing = opening + purchase - consumed.
+    """
+    rng = np.random.default_rng(seed)
+    bars = np.array([f"Bar {b:03d}" for b in range(n_bars)], dtype=object)
+    types = np.array([ALCOHOL_TYPES[i % len(ALCOHOL_TYPES)] for i in range(n_brands)], dtype=object)
+    brands = np.array([f"Brand {i:04d}" for i in range(n_brands)], dtype=object)
+    dates = pd.date_range('2023-01-01', periods=n_days, freq='D')
+
+    n_pairs = n_bars * n_brands
+    per_pair = n_days * rows_per_day
+    day_idx = np.repeat(np.arange(n_days), rows_per_day)
+    weekly = 1.0 + 0.4 * (dates.dayofweek.to_numpy() >= 4)
+    # (pairs, rows per pair) in time order within each pair
+    consumed = (rng.gamma(2.0, 50.0, (n_pairs, per_pair)) * weekly[day_idx]).round(2)
+    # Restock rows top up exactly what was consumed over the previous restock_every rows
+    purchase = np.zeros_like(consumed)
+    n_restocks = (per_pair - 1) // restock_every
+    blocks = consumed[:, :n_restocks * restock_every].reshape(n_pairs, n_restocks, restock_every)
+    purchase[:, restock_every::restock_every] = blocks.sum(axis=2).round(2)
+    start = rng.uniform(2000, 5000, (n_pairs, 1)).round(2)
+    closing = (start + np.cumsum(purchase - consumed, axis=1)).round(2)
+    opening = np.concatenate([start, closing[:, :-1]], axis=1)
+
+    minutes = rng.integers(10 * 60, 24 * 60, (n_pairs, n_days, rows_per_day))
+    minutes = np.sort(minutes, axis=2).reshape(n_pairs, per_pair)  # keep each pair's rows in time order
+    served = dates[day_idx].to_numpy() + minutes.astype('timedelta64[m]')
+
+    pair_idx = np.repeat(np.arange(n_pairs), per_pair)
+    frame = pd.DataFrame({
+        'Date Time Served': served.ravel(),
+        'Bar Name': bars[pair_idx // n_brands],
+        'Alcohol Type': types[pair_idx % n_brands],
+        'Brand Name': brands[pair_idx % n_brands],
+        'Opening Balance (ml)': opening.ravel(),
+        'Purchase (ml)': purchase.ravel(),
+        'Consumed (ml)': consumed.ravel(),
+        'Closing Balance (ml)': closing.ravel()
+    })
+    return frame.sort_values('Date Time Served', kind='stable', ignore_index=True)
+
+
+def write_raw_export(path, **kwargs):
+    """Write make_raw_export(**kwargs) as CSV with the real file's timestamp format."""
+    frame = make_raw_export(**kwargs)
+    frame.to_csv(path, index=False, date_format='%m/%d/%Y %H:%M')
+    return len(frame)
@@ -0,0 +1,217 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .forecasting import forecast_demand, _resolve_workers
+except ImportError:
+    from forecasting import forecast_demand, _resolve_workers
+
+# forecast_demand backends, plus 'incremental': batched Holt-Winters whose
+# fitted state is carried from each origin to the next (see forecast_state)
+BACKENDS = ('statsmodels', 'batched', 'tiered', 'hierarchical', 'incremental')
+DEFAULT_BACKENDS = ('batched', 'tiered', 'hierarchical', 'incremental')
+N_ORIGINS = 52
+STEP_DAYS = 7
+HORIZON_DAYS = 7
+MIN_TRAIN_DAYS = 28  # History needed before the first origin
+
+# Index shared by the worker processes, set once per worker by _init_worker
+_WORKER_INDEX = None
+
+
+def rolling_origins(days, n_origins=N_ORIGINS, step_days=STEP_DAYS, horizon_days=HORIZON_DAYS,
+                    min_train_days=MIN_TRAIN_DAYS):
+    """
+    Forecast origins over index days, oldest first, step_days apart.
+
+    The last origin leaves exactly horizon_days of history after it; origins
+    with fewer than min_train_days of history before them are dropped.
+    """
+    if not len(days):
+        return np.array([], dtype='datetime64[D]')
+    last_origin = days[-1] - (horizon_days - 1)
+    origins = last_origin - step_days * np.arange(n_origins)[::-1]
+    return origins[origins >= days[0] + min_train_days]
+
+
+def _backtest_unit(series_index, backend, keys, origins, horizon_days, options):
+    """
+    Forecast keys from each origin in turn (oldest first), training on the
+    days before it, and score the forecast daily demand against the mean
+    daily consumption over the horizon_days from the origin. Only pairs
+    with history on both sides of the origin over the whole horizon are
+    scored. Returns (seconds, origin array, key positions, forecasts, actuals).
+    """
+    start = time.perf_counter()
+    series = [series_index[key] for key in keys]
+    first = np.array([s.days[0] for s in series], dtype='datetime64[D]')
+    last = np.array([s.days[-1] for s in series], dtype='datetime64[D]')
+    consumed, _ = series_index.window_matrix(keys, origins[0])
+    base = np.searchsorted(series_index.days, origins[0], side='left')
+
+    out_origins, out_rows, out_forecast, out_actual = [], [], [], []
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()), \
+            warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        # The state file lives for the whole unit, so each origin advances the previous one's state
+        state_path = os.path.join(tmp_dir, 'state.json') if backend == 'incremental' else None
+        for origin in origins:
+            train = series_index.subset(keys, end=origin - 1)
+            forecasts = forecast_demand(None, forecast_days=horizon_days, series_index=train,
+                                        backend='batched' if state_path else backend,
+                                        state_path=state_path, **options)
+            lo = np.searchsorted(series_index.days, origin, side='left') - base
+            hi = np.searchsorted(series_index.days, origin + horizon_days, side='left') - base
+            actual = consumed[:, lo:hi].sum(axis=1) / horizon_days
+            covered = (first < origin) & (last >= origin + horizon_days - 1)
+            for i in np.flatnonzero(covered):
+                forecast = forecasts.get(keys[i])
+                if forecast is None:
+                    continue
+                out_rows.append(i)
+                out_forecast.append(forecast['forecast_daily'])
+                out_actual.append(actual[i])
+            out_origins.extend([origin] * (len(out_rows) - len(out_origins)))
+
+    return (time.perf_counter() - start, np.array(out_origins, dtype='datetime64[D]'),
+            np.array(out_rows, dtype=int), np.array(out_forecast, dtype=float),
+            np.array(out_actual, dtype=float))
+
+
+def _init_worker(series_index):
+    global _WORKER_INDEX
+    _WORKER_INDEX = series_index
+
+
+def _run_unit(unit):
+    return _backtest_unit(_WORKER_INDEX, *unit)
+
+
+def backtest_forecasts(series_index, backends=DEFAULT_BACKENDS, n_origins=N_ORIGINS, step_days=STEP_DAYS,
+                       horizon_days=HORIZON_DAYS, min_train_days=MIN_TRAIN_DAYS, n_jobs=None,
+                       hierarchy='bar_type', reconcile='proportions', timings=None):
+    """
+    Rolling-origin backtest of forecast_demand backends on a SeriesIndex.
+
+    For each origin from rolling_origins, every backend is fitted on the
+    history before the origin and its forecast daily demand is compared with
+    the actual mean daily consumption over the next horizon_days (days
+    without records count as zero). Returns one row per backend, origin and
+    scored pair: Backend, Origin, Bar Name, Item, Forecast Daily (ml),
+    Actual Daily (ml), Error (ml) (forecast minus actual); see
+    summarize_backtest for MAE/MAPE/bias.
+
+    Work is spread over n_jobs processes (None or <= 0: every core). Origins
+    are independent for the stateless backends, so they are split into
+    blocks of consecutive origins. The 'incremental' backend instead replays
+    every origin in order for a shard of the pairs, advancing each pair's
+    saved Holt-Winters state over the step_days since the previous origin
+    and only refitting on forecast_state's schedule. If a dict is passed as
+    timings it is filled with {backend: {'units', 'seconds'}}, seconds being
+    the summed worker time.
+    """
+    backends = list(backends)
+    unknown = [b for b in backends if b not in BACKENDS]
+    if unknown:
+        raise ValueError(f"Unknown backtest backend(s): {', '.join(unknown)}")
+    origins = rolling_origins(series_index.days, n_origins, step_days, horizon_days, min_train_days)
+    if not len(origins):
+        raise ValueError(f"Not enough history to backtest: need more than {min_train_days + horizon_days} days")
+
+    keys = list(series_index)
+    n_workers = _resolve_workers(n_jobs)
+    print(f"\nBacktesting {', '.join(backends)} on {len(keys)} pairs from {len(origins)} origins "
+          f"({origins[0]} to {origins[-1]}, every {step_days} days, {horizon_days}-day horizon)...")
+
+    units, unit_positions = [], []
+    for backend in backends:
+        options = {'hierarchy': hierarchy, 'reconcile': reconcile} if backend == 'hierarchical' else {}
+        if backend == 'incremental':
+            for shard in np.array_split(np.arange(len(keys)), min(n_workers, len(keys))):
+                units.append((backend, [keys[i] for i in shard], origins, horizon_days, options))
+                unit_positions.append(shard)
+        else:
+            # A couple of blocks per worker keeps the pool busy when origins differ in history length
+            block = max(1, -(-len(origins) // (n_workers * 2)))
+            for i in range(0, len(origins), block):
+                units.append((backend, keys, origins[i:i + block], horizon_days, options))
+                unit_positions.append(np.arange(len(keys)))
+
+    if n_workers > 1 and len(units) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(units)), initializer=_init_worker,
+                                 initargs=(series_index,)) as executor:
+            results = list(executor.map(_run_unit, units))
+    else:
+        results = [_backtest_unit(series_index, *unit) for unit in units]
+
+    bars = np.array([key[0] for key in keys], dtype=object)
+    items = np.array([key[1] for key in keys], dtype=object)
+    frames, stats = {}, {}
+    for unit, positions, (seconds, unit_origins, rows, forecast, actual) in zip(units, unit_positions, results):
+        backend = unit[0]
+        positions = positions[rows]
+        frames.setdefault(backend, []).append(pd.DataFrame({
+            'Backend': backend,
+            'Origin': unit_origins,
+            'Bar Name': bars[positions],
+            'Item': items[positions],
+            'Forecast Daily (ml)': forecast,
+            'Actual Daily (ml)': actual,
+            'Error (ml)': forecast - actual
+        }))
+        stat = stats.setdefault(backend, {'units': 0, 'seconds': 0.0})
+        stat['units'] += 1
+        stat['seconds'] += seconds
+
+    for backend, stat in stats.items():
+        print(f"   → {backend}: {stat['units']} units, {stat['seconds']:.2f}s of worker time")
+    if timings is not None:
+        timings.update(stats)
+    # Backends in the order requested, then by origin and pair
+    return pd.concat([pd.concat(frames[backend], ignore_index=True).sort_values(
+        ['Origin', 'Bar Name', 'Item'], kind='stable') for backend in backends], ignore_index=True)
+
+
+def summarize_backtest(errors):
+    """
+    Accuracy of a backtest_forecasts result as (per_pair, overall) frames.
+
+    per_pair has one row per backend and pair: Origins scored, MAE and bias
+    (mean error; positive means over-forecasting) in ml/day, and MAPE as a
+    fraction over the origins with non-zero actual demand (NaN if none).
+    overall has one row per backend with the same metrics plus WAPE, computed
+    only over the (origin, pair) cases every backend forecast, so backends
+    are compared on the same cases.
+    """
+    frame = errors.assign(
+        abs_error=errors['Error (ml)'].abs(),
+        pct_error=errors['Error (ml)'].abs() / errors['Actual Daily (ml)'].where(errors['Actual Daily (ml)'] > 0))
+    per_pair = frame.groupby(['Backend', 'Bar Name', 'Item'], sort=False).agg(
+        Origins=('Error (ml)', 'size'),
+        MAE=('abs_error', 'mean'),
+        MAPE=('pct_error', 'mean'),
+        Bias=('Error (ml)', 'mean')
+    ).reset_index()
+
+    n_backends = frame['Backend'].nunique()
+    cases = frame.groupby(['Origin', 'Bar Name', 'Item'], sort=False)['Backend'].transform('size')
+    common = frame[cases == n_backends]
+    overall = common.groupby('Backend', sort=False).agg(
+        Pairs=('Item', 'size'),
+        MAE=('abs_error', 'mean'),
+        MAPE=('pct_error', 'mean'),
+        Bias=('Error (ml)', 'mean'),
+        abs_total=('abs_error', 'sum'),
+        actual_total=('Actual Daily (ml)', 'sum')
+    ).reset_index()
+    overall['WAPE'] = overall['abs_total'] / overall['actual_total']
+    overall = overall.rename(columns={'Pairs': 'Cases'}).drop(columns=['abs_total', 'actual_total'])
+    return per_pair, overall
@@ -0,0 +1,189 @@
+import numpy as np
+
+SEASON_LENGTH = 7
+
+# Coarse smoothing-parameter grid searched for every series at once
+ALPHA_GRID = (0.05, 0.2, 0.4, 0.6, 0.8)
+BETA_GRID = (0.0, 0.05, 0.2, 0.4)
+GAMMA_GRID = (0.0, 0.1, 0.3, 0.5)
+
+
+def pad_series(series_list):
+    """
+    Lay variable-length series out as a left-aligned (n_series, max_len)
+    matrix padded with NaN; returns (matrix, lengths).
+    """
+    lengths = np.array([len(s) for s in series_list], dtype=int)
+    width = int(lengths.max()) if len(lengths) else 0
+    matrix = np.full((len(series_list), width), np.nan)
+    for i, s in enumerate(series_list):
+        matrix[i, :len(s)] = s
+    return matrix, lengths
+
+
+def initial_states(matrix, lengths, season_length=SEASON_LENGTH):
+    """
+    Heuristic starting level, trend and seasonal indices for every series:
+    level from the first season, trend from the first two seasons (zero if
+    shorter), seasonal indices as deviations from the starting level.
+    """
+    m = season_length
+    first = matrix[:, :m]
+    level = np.nanmean(first, axis=1)
+    trend = np.zeros(len(matrix))
+    has_two = lengths >= 2 * m
+    if has_two.any():
+        second = np.nanmean(matrix[has_two, m:2 * m], axis=1)
+        trend[has_two] = (second - level[has_two]) / m
+    season = np.nan_to_num(first - level[:, None])
+    if season.shape[1] < m:
+        season = np.pad(season, ((0, 0), (0, m - season.shape[1])))
+    return level, trend, season
+
+
+def run_recursions(matrix, lengths, alpha, beta, gamma, level, trend, season,
+                   season_length=SEASON_LENGTH, start=0):
+    """
+    Run additive Holt-Winters recursions for every series and parameter set,
+    in error-correction form with the same update equations as statsmodels.
+
+    alpha/beta/gamma broadcast against (n_params, n_series); level/trend are
+    (n_series,) or (n_params, n_series), season is (..., n_series, m). Steps
+    past a series' length leave its state untouched. Column t of matrix is
+    time start + t, where start is a scalar or one offset per series (used
+    to advance fitted states over newly arrived observations).
+    Returns (sse, n_errors, level, trend, season).
+    """
+    m = season_length
+    alpha = np.atleast_2d(alpha)
+    beta = np.atleast_2d(beta)
+    gamma = np.atleast_2d(gamma)
+    shape = np.broadcast_shapes(alpha.shape, beta.shape, gamma.shape, (1, len(matrix)))
+    level = np.broadcast_to(level, shape).copy()
+    trend = np.broadcast_to(trend, shape).copy()
+    season = np.broadcast_to(season, shape + (m,)).copy()
+    sse = np.zeros(shape)
+    n_errors = np.zeros(shape[1], dtype=int)
+    start = np.broadcast_to(start, (shape[1],))
+    cols = np.arange(shape[1])
+
+    for t in range(matrix.shape[1]):
+        y = matrix[:, t]
+        active = (start + t < lengths) & ~np.isnan(y)
+        if not active.any():
+            continue
+        slot = (start + t) % m
+        s_old = season[..., cols, slot]
+        error = np.where(active, y - (level + trend + s_old), 0.0)
+        new_level = level + trend + alpha * error
+        new_trend = trend + alpha * beta * error
+        new_season = s_old + gamma * error
+        level = np.where(active, new_level, level)
+        trend = np.where(active, new_trend, trend)
+        season[..., cols, slot] = np.where(active, new_season, s_old)
+        sse += error ** 2
+        n_errors += active
+
+    return sse, n_errors, level, trend, season
+
+
+def forecast_states(level, trend, season, lengths, steps, season_length=SEASON_LENGTH):
+    """Forecast matrix (n_series, steps) from final states after `lengths` observations."""
+    h = np.arange(1, steps + 1)
+    slots = (lengths[:, None] + h[None, :] - 1) % season_length
+    seasonal = np.take_along_axis(season, slots, axis=1)
+    return level[:, None] + trend[:, None] * h[None, :] + seasonal
+
+
+def _grid():
+    a, b, g = np.meshgrid(ALPHA_GRID, BETA_GRID, GAMMA_GRID, indexing='ij')
+    return a.ravel()[:, None], b.ravel()[:, None], g.ravel()[:, None]
+
+
+def _best(sse, alpha, beta, gamma, level, trend, season):
+    """Pick, per series, the parameter row with the lowest SSE."""
+    best = np.nanargmin(np.where(np.isfinite(sse), sse, np.inf), axis=0)
+    cols = np.arange(sse.shape[1])
+
+    def pick(arr):
+        return np.broadcast_to(arr, sse.shape)[best, cols]
+
+    return (pick(alpha), pick(beta), pick(gamma), sse[best, cols],
+            level[best, cols], trend[best, cols], season[best, cols])
+
+
+def fit_holt_winters_batch(series_list, season_length=SEASON_LENGTH, refine=True):
+    """
+    Fit additive Holt-Winters (level, trend, weekly season) to many series at once.
+
+    Smoothing parameters are chosen per series by a batched grid search on
+    one-step-ahead SSE, optionally followed by a finer grid around each
+    series' best point. Returns a dict of per-series arrays: alpha, beta,
+    gamma, sse, level, trend, season (n_series, m) and lengths.
+    """
+    matrix, lengths = pad_series(series_list)
+    level0, trend0, season0 = initial_states(matrix, lengths, season_length)
+
+    alpha, beta, gamma = _grid()
+    sse, _, level, trend, season = run_recursions(
+        matrix, lengths, alpha, beta, gamma, level0, trend0, season0, season_length)
+    fit = _best(sse, alpha, beta, gamma, level, trend, season)
+
+    if refine:
+        offsets = np.array([-0.5, 0.0, 0.5])
+        da, db, dg = np.meshgrid(offsets * 0.2, offsets * 0.1, offsets * 0.2, indexing='ij')
+        alpha = np.clip(fit[0][None, :] + da.ravel()[:, None], 0.0, 1.0)
+        beta = np.clip(fit[1][None, :] + db.ravel()[:, None], 0.0, 1.0)
+        gamma = np.clip(fit[2][None, :] + dg.ravel()[:, None], 0.0, 1.0)
+        sse, _, level, trend, season = run_recursions(
+            matrix, lengths, alpha, beta, gamma, level0, trend0, season0, season_length)
+        fit = _best(sse, alpha, beta, gamma, level, trend, season)
+
+    alpha, beta, gamma, sse, level, trend, season = fit
+    return {
+        'alpha': alpha,
+        'beta': beta,
+        'gamma': gamma,
+        'sse': sse,
+        'level': level,
+        'trend': trend,
+        'season': season,
+        'lengths': lengths
+    }
+
+
+def forecast_demand_batched(series, forecast_days=30, season_length=SEASON_LENGTH):
+    """
+    Batched backend for forecast_demand.
+
+    series is a list of ((bar, item), values). Returns the same forecasts
+    dict as the statsmodels path; series whose fit is not finite fall back
+    to their historical mean.
+    """
+    forecasts = {}
+    if not series:
+        return forecasts
+
+    keys = [key for key, _ in series]
+    values = [np.asarray(v, dtype=float) for _, v in series]
+    fit = fit_holt_winters_batch(values, season_length)
+    paths = forecast_states(fit['level'], fit['trend'], fit['season'],
+                            fit['lengths'], forecast_days, season_length)
+
+    for key, v, path in zip(keys, values, paths):
+        if np.isfinite(path).all():
+            forecasts[key] = {
+                'forecast_daily': path.mean(),
+                'forecast_total': path.sum(),
+                'historical_days': len(v),
+                'method': 'batched_holt_winters'
+            }
+        else:
+            fallback = max(float(np.mean(v)), 0.0)
+            forecasts[key] = {
+                'forecast_daily': fallback,
+                'forecast_total': fallback * forecast_days,
+                'historical_days': len(v),
+                'method': 'mean_fallback'
+            }
+    return forecasts
@@ -0,0 +1,363 @@
+"""
+Command-line entry point for the inventory pipeline.
+
+    python src/cli.py recommend --data hotel_bar_inventory.csv
+    python src/cli.py par --lead-time 5 --service-level 0.99
+    python src/cli.py all --output-dir out/
+    python src/cli.py ingest --exports exports/ --store store/
+    python src/cli.py recommend --store store/
+    python src/cli.py recommend --start 2024-01-01 --end 2024-03-31 --bars 'Main Bar,Pool Bar'
+    python src/cli.py backtest --origins 52 --backtest-backends batched,incremental
+
+Each subcommand runs its stage and whatever upstream stages it needs
+(load only warms the prepared-data cache; the data itself is loaded on
+demand by whichever stage runs first):
+
+    forecast -> par -> simulate
+                    -> recommend -> plot
+    backtest (rolling-origin forecast accuracy per backend)
+
+A stage is skipped when its outputs exist and neither its input files
+(size and mtime) nor its settings changed since it last ran; --force
+reruns the requested stage. --start/--end/--bars/--alcohol-types/--brands/
+--properties restrict the run to a slice of the data: the filter is applied
+while loading, so every stage only processes the matching rows. Pipeline modules, and with them pandas,
+statsmodels and matplotlib, are only imported by the stages that run.
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+from collections import namedtuple
+
+Stage = namedtuple('Stage', ['deps', 'inputs', 'outputs', 'settings', 'run'])
+
+
+def _names(value):
+    """Comma-separated option value as a list of names (None if not given)."""
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def _module(name):
+    """Import a pipeline module on first use, as a script or as part of the src package."""
+    if __package__:
+        return importlib.import_module(f"{__package__}.{name}")
+    return importlib.import_module(name)
+
+
+class PipelineRun:
+    """Paths, settings and lazily loaded shared data for one CLI invocation."""
+
+    def __init__(self, args):
+        self.args = args
+        self._df = None
+        self._series_index = None
+        self.query = _module('query').InventoryQuery(
+            start=args.start, end=args.end, bars=_names(args.bars), alcohol_types=_names(args.alcohol_types),
+            brands=_names(args.brands), properties=_names(args.properties))
+        profiling = _module('profiling')
+        self.profiler = profiling.RunProfiler(enabled=args.report is not None)
+
+    def work(self, name):
+        return os.path.join(self.args.work_dir, name)
+
+    def out(self, name):
+        return os.path.join(self.args.output_dir, name)
+
+    @property
+    def data_input(self):
+        """File whose size/mtime stands for the input data: the export, or the store's manifest."""
+        if self.args.store:
+            return os.path.join(self.args.store, _module('partitioned_store').MANIFEST)
+        return self.args.data
+
+    @property
+    def df(self):
+        if self._df is None:
+            if self.args.store:
+                self._df = _module('partitioned_store').read_store(self.args.store, query=self.query)
+            else:
+                utils = _module('utils')
+                self._df = utils.load_and_prepare_data(self.args.data, cache_dir=self.args.cache_dir or None,
+                                                       query=self.query)
+            if self._df.empty:
+                raise ValueError(f"No rows match the query ({self.query.describe()})")
+        return self._df
+
+    @property
+    def series_index(self):
+        if self._series_index is None:
+            self._series_index = _module('series_index').build_series_index(self.df)
+        return self._series_index
+
+    def read_table(self, name, cls_name):
+        import pandas as pd
+        table_cls = getattr(_module('data_model'), cls_name)
+        return table_cls.from_frame(pd.read_csv(self.work(name)))
+
+
+def _run_load(run):
+    print(f"   → {len(run.df)} rows, {len(run.series_index)} bar-item pairs")
+
+
+def _run_ingest(run):
+    if not run.args.exports:
+        raise ValueError("ingest needs --exports (a directory or glob of CSV exports)")
+    if not run.args.store:
+        raise ValueError("ingest needs --store (the partitioned store directory)")
+    _module('partitioned_store').ingest_exports(run.args.exports, run.args.store, n_jobs=run.args.workers,
+                                                force=run.args.force)
+
+
+def _run_forecast(run):
+    forecasting = _module('forecasting')
+    data_model = _module('data_model')
+    forecasts = forecasting.forecast_demand(
+        run.df, forecast_days=run.args.forecast_days, n_jobs=run.args.workers,
+        series_index=run.series_index, backend=run.args.backend, state_path=run.args.state_file,
+        hierarchy=run.args.hierarchy, reconcile=run.args.reconcile)
+    if not forecasts:
+        raise ValueError(f"No bar-item pair has enough history to forecast ({run.query.describe()})")
+    data_model.ForecastTable.from_dict(forecasts).to_frame().to_csv(run.work('forecasts.csv'), index=False)
+
+
+def _run_par(run):
+    par_levels_module = _module('par_levels')
+    forecasts = run.read_table('forecasts.csv', 'ForecastTable')
+    par_levels = par_levels_module.calculate_par_levels(forecasts, lead_time_days=run.args.lead_time,
+                                                        service_level=run.args.service_level)
+    frame = par_levels.to_frame()
+    frame.to_csv(run.work('par_levels.csv'), index=False)
+    frame.rename(columns={
+        'par_level_ml': 'Par Level (ml)',
+        'reorder_point_ml': 'Reorder Point (ml)',
+        'cycle_stock_ml': 'Cycle Stock (ml)',
+        'safety_stock_ml': 'Safety Stock (ml)'
+    })[['Bar Name', 'Item', 'Par Level (ml)', 'Reorder Point (ml)', 'Cycle Stock (ml)',
+        'Safety Stock (ml)']].to_csv(run.out('par_levels.csv'), index=False)
+
+
+def _run_simulate(run):
+    simulation = _module('simulation')
+    forecasts = run.read_table('forecasts.csv', 'ForecastTable')
+    par_levels = run.read_table('par_levels.csv', 'ParLevelTable')
+    results_df, _ = simulation.simulate_inventory_system(
+        run.df, forecasts, par_levels, simulation_days=run.args.simulation_days,
+        series_index=run.series_index)
+    results_df.to_csv(run.out('simulation_results.csv'), index=False)
+
+
+def _run_recommend(run):
+    utils = _module('utils')
+    par_levels = run.read_table('par_levels.csv', 'ParLevelTable')
+    rec_df = utils.generate_recommendations(run.df, {}, par_levels, None, series_index=run.series_index)
+    rec_df.to_csv(run.out('inventory_recommendations.csv'), index=False)
+    print(f"   → {int((rec_df['Action'] == 'ORDER NOW').sum())} pairs need ordering now")
+
+
+def _run_plot(run):
+    import pandas as pd
+    reporting = _module('reporting')
+    par_levels = run.read_table('par_levels.csv', 'ParLevelTable')
+    rec_df = pd.read_csv(run.out('inventory_recommendations.csv'))
+    reporting.render_report(run.series_index, par_levels, rec_df, output_dir=run.args.output_dir,
+                            n_jobs=run.args.workers, forecast_days=run.args.forecast_days,
+                            force=run.args.force)
+
+
+def build_stages(run):
+    """The stage graph with concrete paths and the settings that affect each stage's output."""
+    a = run.args
+    query = run.query.params()
+    return {
+        'ingest': Stage([], [], [], {}, _run_ingest),
+        'load': Stage([], [], [], {}, _run_load),
+        'forecast': Stage(
+            [], [run.data_input], [run.work('forecasts.csv')],
+            {'forecast_days': a.forecast_days, 'backend': a.backend, 'state_file': a.state_file,
+             'hierarchy': a.hierarchy, 'reconcile': a.reconcile, 'query': query},
+            _run_forecast),
+        'par': Stage(
+            ['forecast'], [run.work('forecasts.csv')],
+            [run.work('par_levels.csv'), run.out('par_levels.csv')],
+            {'lead_time': a.lead_time, 'service_level': a.service_level},
+            _run_par),
+        'simulate': Stage(
+            ['par'], [run.data_input, run.work('forecasts.csv'), run.work('par_levels.csv')],
+            [run.out('simulation_results.csv')],
+            {'simulation_days': a.simulation_days, 'query': query},
+            _run_simulate),
+        'recommend': Stage(
+            ['par'], [run.data_input, run.work('par_levels.csv')],
+            [run.out('inventory_recommendations.csv')], {'query': query}, _run_recommend),
+        'plot': Stage(
+            ['recommend'], [run.data_input, run.work('par_levels.csv'), run.out('inventory_recommendations.csv')],
+            [run.out('inventory_analysis_top_bars.png')], {'query': query}, _run_plot),
+        'backtest': Stage(
+            [], [run.data_input], [run.out('backtest_pairs.csv'), run.out('backtest_summary.csv')],
+            {'backends': _names(a.backtest_backends), 'origins': a.origins, 'origin_step': a.origin_step,
+             'horizon': a.horizon, 'hierarchy': a.hierarchy, 'reconcile': a.reconcile, 'query': query},
+            _run_backtest),
+    }
+
+
+def _run_backtest(run):
+    backtesting = _module('backtesting')
+    a = run.args
+    errors = backtesting.backtest_forecasts(
+        run.series_index, backends=_names(a.backtest_backends), n_origins=a.origins, step_days=a.origin_step,
+        horizon_days=a.horizon, n_jobs=a.workers, hierarchy=a.hierarchy, reconcile=a.reconcile)
+    per_pair, overall = backtesting.summarize_backtest(errors)
+    per_pair.to_csv(run.out('backtest_pairs.csv'), index=False)
+    overall.to_csv(run.out('backtest_summary.csv'), index=False)
+    for row in overall.itertuples(index=False):
+        print(f"   → {row.Backend}: MAE {row.MAE:.2f} ml/day, MAPE {row.MAPE:.1%}, "
+              f"bias {row.Bias:+.2f} ml/day over {row.Cases} forecasts")
+
+
+def _stamp(stage):
+    inputs = {}
+    for path in stage.inputs:
+        st = os.stat(path)
+        inputs[os.path.abspath(path)] = [st.st_size, st.st_mtime_ns]
+    return {'settings': stage.settings, 'inputs': inputs}
+
+
+def _stamp_path(run, name):
+    return run.work(os.path.join('stamps', f"{name}.json"))
+
+
+def is_fresh(run, name, stage):
+    """True when every output exists and the stage's inputs and settings match its last run."""
+    if not stage.outputs or not all(os.path.exists(p) for p in stage.outputs):
+        return False
+    try:
+        with open(_stamp_path(run, name)) as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return previous == json.loads(json.dumps(_stamp(stage)))
+
+
+def execute(run, targets, force=()):
+    """Run targets and their upstream stages in dependency order, skipping fresh ones."""
+    stages = build_stages(run)
+    done = []
+
+    def visit(name):
+        if name in done:
+            return
+        stage = stages[name]
+        for dep in stage.deps:
+            visit(dep)
+        done.append(name)
+        if name not in force and is_fresh(run, name, stage):
+            print(f"\n[{name}] up to date, skipped")
+            return
+        print(f"\n[{name}]")
+        with run.profiler.stage(name):
+            stage.run(run)
+        if stage.outputs:
+            stamp_path = _stamp_path(run, name)
+            os.makedirs(os.path.dirname(stamp_path), exist_ok=True)
+            with open(stamp_path, 'w') as f:
+                json.dump(_stamp(stage), f)
+
+    for target in targets:
+        visit(target)
+    return done
+
+
+TARGETS = {
+    'ingest': ['ingest'], 'load': ['load'], 'forecast': ['forecast'], 'par': ['par'], 'simulate': ['simulate'],
+    'recommend': ['recommend'], 'plot': ['plot'], 'all': ['simulate', 'recommend', 'plot'],
+    'backtest': ['backtest']
+}
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--data', default='hotel_bar_inventory.csv', help='inventory export CSV')
+    common.add_argument('--exports', default=None,
+                        help='directory or glob of per-property exports to ingest')
+    common.add_argument('--store', default=None,
+                        help='partitioned store to ingest into, and to read instead of --data')
+    common.add_argument('--start', default=None, help='first day to include (YYYY-MM-DD)')
+    common.add_argument('--end', default=None, help='last day to include (YYYY-MM-DD)')
+    common.add_argument('--bars', default=None, help='comma-separated bars to include')
+    common.add_argument('--alcohol-types', default=None, help='comma-separated alcohol types to include')
+    common.add_argument('--brands', default=None, help='comma-separated brands to include')
+    common.add_argument('--properties', default=None, help='comma-separated properties to include (with --store)')
+    common.add_argument('--cache-dir', default='.cache',
+                        help="prepared-data cache (needs pyarrow); '' to always parse the CSV")
+    common.add_argument('--work-dir', default='.pipeline',
+                        help='intermediate forecasts, par levels and stage stamps')
+    common.add_argument('--output-dir', default='.', help='CSV and PNG outputs')
+    common.add_argument('--forecast-days', type=int, default=30)
+    common.add_argument('--backend', default='statsmodels', choices=['statsmodels', 'batched', 'tiered', 'hierarchical'])
+    common.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='processes used to fit forecast models')
+    common.add_argument('--hierarchy', default='bar_type', choices=['bar_type', 'bar', 'brand'],
+                        help='aggregate level for the hierarchical backend')
+    common.add_argument('--reconcile', default='proportions', choices=['proportions', 'ols', 'wls'],
+                        help='how the hierarchical backend disaggregates to items')
+    common.add_argument('--state-file', default=None,
+                        help='persisted Holt-Winters state to advance instead of refitting')
+    common.add_argument('--lead-time', type=float, default=3, help='lead time in days')
+    common.add_argument('--service-level', type=float, default=0.95)
+    common.add_argument('--simulation-days', type=int, default=30)
+    common.add_argument('--backtest-backends', default='batched,tiered,hierarchical,incremental',
+                        help="comma-separated backends to backtest ('incremental' carries state between origins)")
+    common.add_argument('--origins', type=int, default=52, help='rolling forecast origins to backtest')
+    common.add_argument('--origin-step', type=int, default=7, help='days between backtest origins')
+    common.add_argument('--horizon', type=int, default=7, help='days scored after each backtest origin')
+    common.add_argument('--force', action='store_true', help='rerun the requested stage even if fresh')
+    common.add_argument('--report', default=None, help='write per-stage timings to this JSON file')
+
+    parser = argparse.ArgumentParser(prog='hotel-inventory', description='Hotel bar inventory pipeline')
+    sub = parser.add_subparsers(dest='command', required=True)
+    help_text = {
+        'ingest': 'parse --exports in parallel into the partitioned --store',
+        'load': 'load the export and warm the prepared-data cache',
+        'forecast': 'forecast daily demand per bar-item pair',
+        'par': 'calculate par levels and reorder points',
+        'simulate': 'simulate inventory under the par levels',
+        'recommend': 'write order recommendations',
+        'plot': 'render analysis charts',
+        'all': 'simulate, recommend and plot',
+        'backtest': 'score each forecasting backend over rolling origins'
+    }
+    for name in TARGETS:
+        sub.add_parser(name, parents=[common], help=help_text[name])
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not 0 < args.service_level < 1:
+        parser.error("--service-level must be between 0 and 1")
+    if args.state_file and args.backend not in ('statsmodels', 'batched'):
+        parser.error(f"--state-file holds batched Holt-Winters state and can't be used with --backend {args.backend}")
+    os.makedirs(args.work_dir, exist_ok=True)
+    os.makedirs(args.output_dir, exist_ok=True)
+    try:
+        run = PipelineRun(args)
+    except ValueError as e:  # unparseable or inverted --start/--end
+        parser.error(str(e))
+    targets = TARGETS[args.command]
+    try:
+        execute(run, targets, force=set(targets) if args.force else ())
+    except (FileNotFoundError, ValueError) as e:
+        print(f"\n❌ Error: {e}", file=sys.stderr)
+        return 1
+    if args.report:
+        run.profiler.write_report(args.report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Optional dependency: without it the cache is disabled
+    pa = feather = None
+
+CACHE_VERSION = 2
+CATEGORICAL_COLUMNS = ['Bar Name', 'Item', 'Alcohol Type', 'Brand Name']
+
+
+def cache_available():
+    return feather is not None
+
+
+def file_fingerprint(file_path, with_hash=True):
+    """Size, mtime and (optionally) SHA-256 of the source file."""
+    stat = os.stat(file_path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        fingerprint['sha256'] = digest.hexdigest()
+    return fingerprint
+
+
+def _cache_paths(file_path, cache_dir):
+    source = os.path.abspath(file_path)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    tag = hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+    base = os.path.join(cache_dir, f"{stem}-{tag}")
+    return base + '.feather', base + '.json'
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('version') == CACHE_VERSION else None
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = meta_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def load_cached_frame(file_path, cache_dir, query=None):
+    """
+    Return the prepared frame cached for file_path, or None on a miss.
+
+    A matching size and mtime is trusted without reading the source; if only
+    the mtime moved, the content hash decides (a touched but unchanged
+    export still hits). The Feather file is memory-mapped, not parsed.
+    With a query, only the columns it filters on are converted to decide
+    which rows to keep, and only those rows are converted to pandas.
+    """
+    if feather is None:
+        return None
+    data_path, meta_path = _cache_paths(file_path, cache_dir)
+    meta = _read_meta(meta_path)
+    if meta is None or not os.path.exists(data_path):
+        return None
+
+    current = file_fingerprint(file_path, with_hash=False)
+    if current['size'] != meta['size']:
+        return None
+    if current['mtime_ns'] != meta['mtime_ns']:
+        current = file_fingerprint(file_path)
+        if current['sha256'] != meta['sha256']:
+            return None
+        meta['mtime_ns'] = current['mtime_ns']
+        _write_meta(meta_path, meta)
+
+    table = feather.read_table(data_path, memory_map=True)
+    if query is not None and not query.unrestricted:
+        keys = table.select([c for c in query.columns if c in table.column_names]).to_pandas()
+        table = table.filter(pa.array(query.mask(keys)))
+        print(f"   → Query ({query.describe()}) kept {table.num_rows} of {len(keys)} cached rows")
+    return table.to_pandas()
+
+
+def write_cached_frame(df, file_path, cache_dir):
+    """Store the prepared frame for file_path with its fingerprint; returns the cached frame."""
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    if feather is None:
+        return df
+
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path, meta_path = _cache_paths(file_path, cache_dir)
+    meta = file_fingerprint(file_path)
+    meta['version'] = CACHE_VERSION
+    meta['source'] = os.path.abspath(file_path)
+
+    tmp_path = data_path + '.tmp'
+    # Uncompressed so later loads can memory-map the columns directly
+    feather.write_feather(df, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, data_path)
+    _write_meta(meta_path, meta)
+    return df
+
+
+def invalidate_cache(file_path, cache_dir):
+    """Drop the cached frame for file_path; returns True if anything was removed."""
+    removed = False
+    for path in _cache_paths(file_path, cache_dir):
+        if os.path.exists(path):
+            os.remove(path)
+            removed = True
+    return removed
@@ -0,0 +1,167 @@
+import numbers
+
+import numpy as np
+import pandas as pd
+
+
+class PairCodes:
+    """
+    Interned (Bar Name, Item) keys.
+
+    Bars and items are stored once each in sorted dictionary arrays; every
+    pair is a row of two small integer codes into them.
+    """
+
+    __slots__ = ('bars', 'items', 'bar_codes', 'item_codes', '_positions')
+
+    def __init__(self, bars, items, bar_codes, item_codes):
+        self.bars = np.asarray(bars, dtype=object)
+        self.items = np.asarray(items, dtype=object)
+        self.bar_codes = np.asarray(bar_codes, dtype=np.int32)
+        self.item_codes = np.asarray(item_codes, dtype=np.int32)
+        self._positions = None
+
+    @classmethod
+    def from_keys(cls, keys):
+        keys = list(keys)
+        bar_codes, bars = pd.factorize(pd.Series([k[0] for k in keys], dtype=object), sort=True)
+        item_codes, items = pd.factorize(pd.Series([k[1] for k in keys], dtype=object), sort=True)
+        return cls(bars, items, bar_codes, item_codes)
+
+    def __len__(self):
+        return len(self.bar_codes)
+
+    def key(self, i):
+        return (self.bars[self.bar_codes[i]], self.items[self.item_codes[i]])
+
+    def keys(self):
+        return list(zip(self.bars[self.bar_codes], self.items[self.item_codes]))
+
+    def position(self, key):
+        """Row of key, or -1 if the pair is not in the table."""
+        if self._positions is None:
+            self._positions = {k: i for i, k in enumerate(self.keys())}
+        return self._positions.get(key, -1)
+
+
+class PairView:
+    """Read-only, dict-like view of one pair's row in a PairTable."""
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, name):
+        value = self._table.columns[name][self._row]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def get(self, name, default=None):
+        return self[name] if name in self._table.columns else default
+
+    def __contains__(self, name):
+        return name in self._table.columns
+
+    def keys(self):
+        return self._table.columns.keys()
+
+    def to_dict(self):
+        return {name: self[name] for name in self._table.columns}
+
+    def __repr__(self):
+        return f"PairView({self._table.pairs.key(self._row)!r}, {self.to_dict()!r})"
+
+
+class PairTable:
+    """
+    Struct-of-arrays table with one row per (Bar Name, Item).
+
+    Each field is a NumPy column aligned with `pairs`. The table also
+    behaves like the {(bar, item): {field: value}} dicts used across the
+    pipeline (items(), [key], in, len) by handing out PairView rows, and
+    to_dict()/from_dict() convert to and from that form.
+    """
+
+    def __init__(self, pairs, columns):
+        self.pairs = pairs
+        self.columns = columns
+
+    @classmethod
+    def from_dict(cls, records):
+        """Build a table from a {(bar, item): {field: value}} dict."""
+        keys = list(records)
+        names = []
+        for info in records.values():
+            names.extend(name for name in info if name not in names)
+        columns = {}
+        for name in names:
+            values = [records[key].get(name) for key in keys]
+            if all(isinstance(v, numbers.Real) or v is None for v in values):
+                columns[name] = np.array([np.nan if v is None else v for v in values], dtype=float)
+            else:
+                columns[name] = np.array(values, dtype=object)
+        return cls(PairCodes.from_keys(keys), columns)
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Build a table from a frame with 'Bar Name', 'Item' and one column per field."""
+        pairs = PairCodes.from_keys(zip(frame['Bar Name'], frame['Item']))
+        columns = {name: frame[name].to_numpy() for name in frame.columns
+                   if name not in ('Bar Name', 'Item')}
+        return cls(pairs, columns)
+
+    def to_frame(self):
+        """One row per pair: 'Bar Name', 'Item' and every field column."""
+        frame = pd.DataFrame({'Bar Name': self.pairs.bars[self.pairs.bar_codes],
+                              'Item': self.pairs.items[self.pairs.item_codes]})
+        for name, values in self.columns.items():
+            frame[name] = values
+        return frame
+
+    def to_dict(self):
+        """Adapter back to the nested-dict form."""
+        return {key: PairView(self, i).to_dict() for i, key in enumerate(self.pairs.keys())}
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def __iter__(self):
+        return iter(self.pairs.keys())
+
+    def __contains__(self, key):
+        return self.pairs.position(key) >= 0
+
+    def __getitem__(self, key):
+        row = self.pairs.position(key)
+        if row < 0:
+            raise KeyError(key)
+        return PairView(self, row)
+
+    def keys(self):
+        return self.pairs.keys()
+
+    def items(self):
+        return ((key, PairView(self, i)) for i, key in enumerate(self.pairs.keys()))
+
+    def select(self, keys):
+        """Table of the same type holding only keys (in that order) that are present."""
+        rows = np.array([self.pairs.position(key) for key in keys], dtype=int)
+        rows = rows[rows >= 0]
+        pairs = PairCodes(self.pairs.bars, self.pairs.items,
+                          self.pairs.bar_codes[rows], self.pairs.item_codes[rows])
+        return type(self)(pairs, {name: values[rows] for name, values in self.columns.items()})
+
+    def column(self, name, default=np.nan):
+        """Field as a float array; missing fields are filled with default."""
+        if name in self.columns:
+            return self.columns[name]
+        return np.full(len(self), default, dtype=float)
+
+
+class ForecastTable(PairTable):
+    """Forecasts per pair (forecast_daily, forecast_total, historical_days, ...)."""
+
+
+class ParLevelTable(PairTable):
+    """Par levels per pair (par_level_ml, reorder_point_ml, safety_stock_ml, ...)."""
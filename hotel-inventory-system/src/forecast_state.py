@@ -0,0 +1,176 @@
+import datetime
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .batched_holt_winters import (SEASON_LENGTH, fit_holt_winters_batch,
+                                       forecast_states, pad_series, run_recursions)
+except ImportError:
+    from batched_holt_winters import (SEASON_LENGTH, fit_holt_winters_batch,
+                                      forecast_states, pad_series, run_recursions)
+
+STATE_VERSION = 2
+REFIT_EVERY_DAYS = 28      # Full refit after this many new observations
+DRIFT_TOLERANCE = 1.5      # ... or when recent one-step RMSE exceeds fit RMSE by this factor
+MIN_DRIFT_OBSERVATIONS = 7
+
+
+def load_state(state_path):
+    """Read the per-pair smoothing state store; empty if missing or from another version."""
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path) as f:
+        store = json.load(f)
+    if store.get('version') != STATE_VERSION or store.get('season_length') != SEASON_LENGTH:
+        return {}
+    return {(rec['bar'], rec['item']): rec for rec in store['pairs']}
+
+
+def save_state(state_path, states):
+    """Write the state store atomically so an interrupted run never leaves a torn file."""
+    store = {
+        'version': STATE_VERSION,
+        'season_length': SEASON_LENGTH,
+        'pairs': list(states.values())
+    }
+    directory = os.path.dirname(os.path.abspath(state_path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(store, f)
+    os.replace(tmp_path, state_path)
+
+
+def _as_day(stored, days):
+    """Convert a stored ISO day back to the element type of an index day array."""
+    ts = pd.Timestamp(stored)
+    if days.dtype.kind == 'M':
+        return ts.to_datetime64().astype(days.dtype)
+    first = days[0]
+    if isinstance(first, datetime.date) and not isinstance(first, datetime.datetime):
+        return ts.date()
+    return ts
+
+
+def _needs_refit(state, offset, refit_every, drift_tolerance):
+    if state is None or offset != state['n_obs']:
+        # New pair, or its history changed underneath the stored state
+        return True
+    if state['n_obs'] - state['fitted_n_obs'] >= refit_every:
+        return True
+    if state['recent_n'] >= MIN_DRIFT_OBSERVATIONS:
+        recent_rmse = np.sqrt(state['recent_sse'] / state['recent_n'])
+        return recent_rmse > drift_tolerance * state['fit_rmse']
+    return False
+
+
+def _record(key, fit, i, n_obs, last_day):
+    return {
+        'bar': key[0],
+        'item': key[1],
+        'alpha': float(fit['alpha'][i]),
+        'beta': float(fit['beta'][i]),
+        'gamma': float(fit['gamma'][i]),
+        'level': float(fit['level'][i]),
+        'trend': float(fit['trend'][i]),
+        'season': [float(v) for v in fit['season'][i]],
+        'n_obs': int(n_obs),
+        'last_day': pd.Timestamp(last_day).isoformat(),
+        'fitted_n_obs': int(n_obs),
+        'fit_rmse': float(np.sqrt(fit['sse'][i] / n_obs)),
+        'recent_sse': 0.0,
+        'recent_n': 0
+    }
+
+
+def forecast_demand_incremental(series_index, state_path, forecast_days=30,
+                                refit_every=REFIT_EVERY_DAYS, drift_tolerance=DRIFT_TOLERANCE):
+    """
+    Holt-Winters forecasts that reuse the smoothing state saved by the previous run.
+
+    Each pair's stored level/trend/seasonal state is advanced over only the
+    days after its last_day. A pair is refitted from its full history when it
+    is new, its history changed, refit_every observations have arrived since
+    the last fit, or its recent one-step RMSE drifted past drift_tolerance x
+    the fit RMSE. Days are treated as complete once they have been seen.
+    Returns (forecasts, stats) where stats counts advanced/refitted pairs.
+    """
+    states = load_state(state_path)
+
+    refit_keys, advance_keys, advance_offsets = [], [], []
+    for key in series_index:
+        series = series_index[key]
+        if len(series.consumed) < 3:  # Need minimum data points
+            continue
+        state = states.get(key)
+        offset = None
+        if state is not None:
+            last_day = _as_day(state['last_day'], series.days)
+            offset = int(np.searchsorted(series.days, last_day, side='right'))
+        if _needs_refit(state, offset, refit_every, drift_tolerance):
+            refit_keys.append(key)
+        else:
+            advance_keys.append(key)
+            advance_offsets.append(offset)
+
+    if refit_keys:
+        fit = fit_holt_winters_batch([series_index[key].consumed for key in refit_keys])
+        for i, key in enumerate(refit_keys):
+            series = series_index[key]
+            states[key] = _record(key, fit, i, len(series.consumed), series.days[-1])
+
+    new_rows = 0
+    if advance_keys:
+        new_values = [series_index[key].consumed[offset:]
+                      for key, offset in zip(advance_keys, advance_offsets)]
+        new_rows = sum(len(v) for v in new_values)
+        if new_rows:
+            previous = [states[key] for key in advance_keys]
+            matrix, counts = pad_series(new_values)
+            start = np.array([s['n_obs'] for s in previous])
+            sse, n_errors, level, trend, season = run_recursions(
+                matrix, start + counts,
+                np.array([s['alpha'] for s in previous]),
+                np.array([s['beta'] for s in previous]),
+                np.array([s['gamma'] for s in previous]),
+                np.array([s['level'] for s in previous]),
+                np.array([s['trend'] for s in previous]),
+                np.array([s['season'] for s in previous]),
+                start=start)
+            for i, key in enumerate(advance_keys):
+                if counts[i] == 0:
+                    continue
+                state = states[key]
+                state['level'] = float(level[0, i])
+                state['trend'] = float(trend[0, i])
+                state['season'] = [float(v) for v in season[0, i]]
+                state['n_obs'] += int(counts[i])
+                state['last_day'] = pd.Timestamp(series_index[key].days[-1]).isoformat()
+                state['recent_sse'] += float(sse[0, i])
+                state['recent_n'] += int(n_errors[i])
+
+    forecasts = {}
+    keys = refit_keys + advance_keys
+    if keys:
+        current = [states[key] for key in keys]
+        paths = forecast_states(np.array([s['level'] for s in current]),
+                                np.array([s['trend'] for s in current]),
+                                np.array([s['season'] for s in current]),
+                                np.array([s['n_obs'] for s in current]),
+                                forecast_days)
+        for key, state, path in zip(keys, current, paths):
+            forecasts[key] = {
+                'forecast_daily': path.mean(),
+                'forecast_total': path.sum(),
+                'historical_days': state['n_obs'],
+                'method': 'incremental_holt_winters'
+            }
+        # Keep the series_index order the other backends return
+        forecasts = {key: forecasts[key] for key in series_index if key in forecasts}
+
+    save_state(state_path, states)
+    stats = {'refitted': len(refit_keys), 'advanced': len(advance_keys), 'new_rows': new_rows}
+    return forecasts, stats
@@ -1,53 +1,212 @@
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
 
-def forecast_demand(df, forecast_days=30):
-    print(f"\n[3/6] Forecasting demand for next {forecast_days} days using Holt-Winters...")
+try:
+    from .series_index import build_series_index
+    from .batched_holt_winters import forecast_demand_batched
+    from .forecast_state import forecast_demand_incremental
+    from .tiered_forecasting import forecast_demand_tiered
+    from .hierarchical_forecasting import forecast_demand_hierarchical
+except ImportError:
+    from series_index import build_series_index
+    from batched_holt_winters import forecast_demand_batched
+    from forecast_state import forecast_demand_incremental
+    from tiered_forecasting import forecast_demand_tiered
+    from hierarchical_forecasting import forecast_demand_hierarchical
 
-    forecasts = {}
-    
-    # Aggregate daily consumption by bar and item
-    daily_consumption = df.groupby(['Day', 'Bar Name', 'Item'])['Consumed (ml)'].sum().reset_index()
-    
-    # Get unique combinations
-    combinations = df.groupby(['Bar Name', 'Item']).size().reset_index()[['Bar Name', 'Item']]
-    
-    print(f"   → Forecasting for {len(combinations)} bar-item combinations...")
-    
-    for idx, row in combinations.iterrows():
-        bar = row['Bar Name']
-        item = row['Item']
-        
-        # Get historical data for this combination
-        item_data = daily_consumption[
-            (daily_consumption['Bar Name'] == bar) & 
-            (daily_consumption['Item'] == item)
-        ].copy()
-        
-        if len(item_data) < 3:  # Need minimum data points
-            continue
-        
-        # Create time index
-        item_data = item_data.sort_values('Day')
-        item_data.set_index('Day', inplace=True)
-        
-        # Fit Holt-Winters model
-        model = ExponentialSmoothing(item_data['Consumed (ml)'], 
-                                      trend='add', 
-                                      seasonal='add', 
-                                      seasonal_periods=7)
+SLOWEST_FITS_KEPT = 10
+
+
+def _fit_pair(values, forecast_days):
+    """
+    Fit a Holt-Winters model on one daily consumption series.
+
+    If the fit fails (e.g. too little history for weekly seasonality) the
+    pair falls back to its historical mean so the rest of the batch is unaffected.
+    """
+    # Imported on first fit so batched and incremental runs never load statsmodels (~2 s)
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    try:
+        model = ExponentialSmoothing(values,
+                                     trend='add',
+                                     seasonal='add',
+                                     seasonal_periods=7)
         model_fit = model.fit()
-        
-        # Forecast for the specified number of days
-        forecast = model_fit.forecast(steps=forecast_days)
-        
-        # Store forecast
-        forecasts[(bar, item)] = {
+        forecast = np.asarray(model_fit.forecast(steps=forecast_days), dtype=float)
+        if not np.isfinite(forecast).all():
+            raise ValueError("Holt-Winters produced a non-finite forecast")
+        return {
             'forecast_daily': forecast.mean(),
             'forecast_total': forecast.sum(),
-            'historical_days': len(item_data)
+            'historical_days': len(values),
+            'method': 'holt_winters'
+        }
+    except Exception:
+        fallback = max(float(np.mean(values)), 0.0)
+        return {
+            'forecast_daily': fallback,
+            'forecast_total': fallback * forecast_days,
+            'historical_days': len(values),
+            'method': 'mean_fallback'
         }
-    
+
+
+def _fit_chunk(chunk, forecast_days):
+    """
+    Fit every series in a chunk; returns (pid, elapsed seconds,
+    [(key, forecast), ...], [(key, fit seconds), ...] for the slowest fits).
+    """
+    start = time.perf_counter()
+    results, fit_seconds = [], []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for key, values in chunk:
+            fit_start = time.perf_counter()
+            results.append((key, _fit_pair(values, forecast_days)))
+            fit_seconds.append((key, time.perf_counter() - fit_start))
+    return os.getpid(), time.perf_counter() - start, results, _slowest(fit_seconds)
+
+
+def _slowest(fit_seconds, n=SLOWEST_FITS_KEPT):
+    return sorted(fit_seconds, key=lambda kv: kv[1], reverse=True)[:n]
+
+
+def _resolve_workers(n_jobs):
+    if n_jobs is None or n_jobs < 1:
+        return os.cpu_count() or 1
+    return n_jobs
+
+
+def forecast_demand(df, forecast_days=30, n_jobs=1, chunk_size=None, timings=None,
+                    series_index=None, backend='statsmodels', state_path=None,
+                    hierarchy='bar_type', reconcile='proportions', query=None):
+    """
+    Forecast daily demand per (Bar Name, Item) with Holt-Winters.
+
+    n_jobs > 1 spreads the model fits over a process pool in chunks of
+    chunk_size series (n_jobs <= 0 or None uses every core). The forecasts
+    dict is identical to the serial path. If a dict is passed as timings it
+    is filled with per-worker stats: {pid: {'chunks', 'fits', 'seconds',
+    'slowest'}}, where 'slowest' lists that worker's slowest (key, seconds) fits.
+    Pass a prebuilt series_index to skip re-aggregating df.
+
+    backend='batched' fits all series together as one padded NumPy matrix
+    (see batched_holt_winters) instead of one statsmodels model per pair;
+    n_jobs and chunk_size do not apply to it.
+
+    backend='tiered' routes each series by length and intermittency: short
+    and intermittent series get a moving average or Croston/SBA, and only
+    regular series are fitted with (batched) Holt-Winters, which must beat
+    the moving average to be kept (see tiered_forecasting). It also
+    forecasts the 1-2 day series the other backends skip; timings is filled
+    with per-tier counts and seconds instead of per-worker stats.
+
+    backend='hierarchical' fits one batched Holt-Winters model per
+    aggregate (hierarchy='bar_type', 'bar' or 'brand') and disaggregates
+    to items by historical proportions or OLS/WLS reconciliation
+    (reconcile='proportions', 'ols' or 'wls'; see hierarchical_forecasting).
+
+    With state_path set, each pair's fitted smoothing state is persisted
+    there and later runs only advance it over newly arrived days, refitting
+    on a schedule or when errors drift (see forecast_state). The saved
+    state is batched Holt-Winters, so state_path only combines with the
+    'statsmodels' and 'batched' backends; others raise ValueError.
+
+    query (an InventoryQuery) limits forecasting to the pairs it matches,
+    fitted on history inside its date window only.
+    """
+    if backend not in ('statsmodels', 'batched', 'tiered', 'hierarchical'):
+        raise ValueError(f"Unknown forecasting backend: {backend!r}")
+    if state_path is not None and backend not in ('statsmodels', 'batched'):
+        raise ValueError(f"Saved forecast state is batched Holt-Winters; it can't be used with the "
+                         f"{backend!r} backend")
+
+    print(f"\n[3/6] Forecasting demand for next {forecast_days} days using Holt-Winters...")
+
+    forecasts = {}
+
+    if series_index is None:
+        series_index = build_series_index(df if query is None else query.apply(df))
+    if query is not None:
+        series_index = query.restrict(series_index)
+
+    print(f"   → Forecasting for {len(series_index)} bar-item combinations...")
+
+    # The tiered backend has a method for any non-empty series
+    min_points = 1 if backend == 'tiered' else 3
+    series = []
+    for key in series_index:
+        consumed = series_index[key].consumed
+        if len(consumed) < min_points:  # Need minimum data points
+            continue
+        series.append((key, consumed))
+
+    if state_path is not None:
+        forecasts, stats = forecast_demand_incremental(series_index, state_path, forecast_days)
+        print(f"   → Advanced {stats['advanced']} saved states over {stats['new_rows']} new daily observations, "
+              f"refitted {stats['refitted']}")
+    elif backend == 'batched':
+        forecasts = forecast_demand_batched(series, forecast_days)
+    elif backend == 'tiered':
+        forecasts = forecast_demand_tiered(series, forecast_days, timings)
+    elif backend == 'hierarchical':
+        forecasts = forecast_demand_hierarchical(series_index, [key for key, _ in series], forecast_days,
+                                                 hierarchy=hierarchy, reconcile=reconcile)
+    else:
+        forecasts = _forecast_statsmodels(series, forecast_days, n_jobs, chunk_size, timings)
+
+    # History statistics used for cycle and safety stock in calculate_par_levels
+    for key, consumed in series:
+        if key in forecasts:
+            forecasts[key]['avg_daily_consumption'] = float(consumed.mean())
+            forecasts[key]['std_consumption'] = float(consumed.std(ddof=1)) if len(consumed) > 1 else 0.0
+
     print(f"   ✓ Generated forecasts for {len(forecasts)} combinations")
-    return forecasts
\ No newline at end of file
+    return forecasts
+
+
+def _forecast_statsmodels(series, forecast_days, n_jobs, chunk_size, timings):
+    """One statsmodels fit per series, serially or over a process pool in chunks."""
+    forecasts = {}
+    n_workers = min(_resolve_workers(n_jobs), max(len(series), 1))
+    if chunk_size is None:
+        # A few chunks per worker keeps the pool busy when series lengths differ
+        chunk_size = max(1, -(-len(series) // (n_workers * 4)))
+    chunks = [series[i:i + chunk_size] for i in range(0, len(series), chunk_size)]
+
+    if n_workers > 1 and len(chunks) > 1:
+        print(f"   → Fitting in {len(chunks)} chunks across {n_workers} worker processes...")
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            chunk_results = list(executor.map(_fit_chunk, chunks,
+                                              [forecast_days] * len(chunks)))
+    else:
+        chunk_results = [_fit_chunk(chunk, forecast_days) for chunk in chunks]
+
+    worker_stats = {}
+    for pid, elapsed, results, slowest in chunk_results:
+        stats = worker_stats.setdefault(pid, {'chunks': 0, 'fits': 0, 'seconds': 0.0, 'slowest': []})
+        stats['chunks'] += 1
+        stats['fits'] += len(results)
+        stats['seconds'] += elapsed
+        stats['slowest'] = _slowest(stats['slowest'] + slowest)
+        for key, forecast in results:
+            # Store forecast
+            forecasts[key] = forecast
+
+    if n_workers > 1:
+        for pid, stats in sorted(worker_stats.items()):
+            print(f"   → Worker {pid}: {stats['fits']} fits in {stats['chunks']} chunks, "
+                  f"{stats['seconds']:.2f}s")
+    if timings is not None:
+        timings.update(worker_stats)
+
+    fallbacks = sum(1 for f in forecasts.values() if f['method'] == 'mean_fallback')
+    if fallbacks:
+        print(f"   → {fallbacks} fits failed and fell back to the historical mean")
+    return forecasts
@@ -0,0 +1,136 @@
+import numpy as np
+
+try:
+    from .batched_holt_winters import fit_holt_winters_batch, forecast_states
+except ImportError:
+    from batched_holt_winters import fit_holt_winters_batch, forecast_states
+
+HIERARCHIES = ('bar_type', 'bar', 'brand')
+RECONCILIATIONS = ('proportions', 'ols', 'wls')
+# Calendar days of recent history used for item shares and item-level base forecasts
+SHARE_WINDOW = 90
+
+
+def group_label(key, hierarchy='bar_type'):
+    """
+    Aggregate series a (bar, item) pair belongs to.
+
+    'bar_type' groups by bar and alcohol type (the part of the item before
+    ' - '), 'bar' by bar alone and 'brand' by item across every bar.
+    """
+    bar, item = key
+    if hierarchy == 'bar_type':
+        return (bar, str(item).split(' - ', 1)[0])
+    if hierarchy == 'bar':
+        return (bar,)
+    if hierarchy == 'brand':
+        return (item,)
+    raise ValueError(f"Unknown hierarchy: {hierarchy!r}")
+
+
+def group_codes(keys, hierarchy='bar_type'):
+    """(codes aligned with keys, list of group labels)."""
+    positions = {}
+    codes = np.empty(len(keys), dtype=int)
+    for i, key in enumerate(keys):
+        codes[i] = positions.setdefault(group_label(key, hierarchy), len(positions))
+    return codes, list(positions)
+
+
+def reconcile_levels(top, bottom, codes, method='ols'):
+    """
+    Reconcile group (top) and item (bottom) base forecasts so items sum to
+    their group, for a two-level hierarchy of disjoint groups.
+
+    Closed form of (S'W^-1 S)^-1 S'W^-1 y per group: W is the identity for
+    'ols', and for 'wls' each group forecast is weighted by its number of
+    items (structural scaling, the diagonal MinT variant that needs no
+    residual covariance). Returns reconciled item forecasts.
+    """
+    n_groups = len(top)
+    sizes = np.bincount(codes, minlength=n_groups).astype(float)
+    if method == 'ols':
+        c = np.ones(n_groups)
+    elif method == 'wls':
+        c = 1.0 / np.maximum(sizes, 1.0)
+    else:
+        raise ValueError(f"Unknown reconciliation: {method!r}")
+    v = c[codes] * top[codes] + bottom
+    v_sum = np.bincount(codes, weights=v, minlength=n_groups)
+    return v - (c / (1.0 + c * sizes))[codes] * v_sum[codes]
+
+
+def _shares(consumed, codes, n_groups, window):
+    """Each item's share of its group's consumption over the last window days (all history if empty)."""
+    shares = np.zeros(len(codes))
+    for cols in (slice(-window, None), slice(None)):
+        item_total = consumed[:, cols].sum(axis=1)
+        group_total = np.bincount(codes, weights=item_total, minlength=n_groups)
+        todo = (shares == 0) & (group_total[codes] > 0)
+        shares[todo] = item_total[todo] / group_total[codes][todo]
+    # Groups with no consumption at all split evenly
+    sizes = np.bincount(codes, minlength=n_groups)
+    empty = np.bincount(codes, weights=shares, minlength=n_groups) == 0
+    shares[empty[codes]] = 1.0 / sizes[codes][empty[codes]]
+    return shares
+
+
+def forecast_demand_hierarchical(series_index, keys, forecast_days=30, hierarchy='bar_type',
+                                 reconcile='proportions', share_window=SHARE_WINDOW):
+    """
+    Hierarchical backend for forecast_demand.
+
+    Item series are summed per group on the shared calendar (a day without
+    a record counts as zero), one batched Holt-Winters model is fitted per
+    group, and group forecasts are pushed down to items either by recent
+    historical proportions or by OLS/WLS reconciliation against cheap
+    item-level base forecasts (the item's recent calendar-day mean).
+
+    Item rates are converted back to demand per observed day, the unit the
+    per-item backends forecast in, by dividing by the share of days since
+    the item's first record on which it has data.
+    """
+    if reconcile not in RECONCILIATIONS:
+        raise ValueError(f"Unknown reconciliation: {reconcile!r}")
+    forecasts = {}
+    if not keys:
+        return forecasts
+
+    consumed, present = series_index.window_matrix(keys, series_index.days[0])
+    codes, labels = group_codes(keys, hierarchy)
+    n_groups, n_days = len(labels), consumed.shape[1]
+
+    group_matrix = np.zeros((n_groups, n_days))
+    np.add.at(group_matrix, codes, consumed)
+    group_present = np.zeros((n_groups, n_days), dtype=bool)
+    np.logical_or.at(group_present, codes, present)
+    # Each group's series starts at its first recorded day
+    first = group_present.argmax(axis=1)
+    fit = fit_holt_winters_batch([group_matrix[g, first[g]:] for g in range(n_groups)])
+    paths = forecast_states(fit['level'], fit['trend'], fit['season'], fit['lengths'], forecast_days)
+    window = min(share_window, n_days)
+    recent_mean = group_matrix[:, -window:].mean(axis=1)
+    top = np.where(np.isfinite(paths).all(axis=1), paths.mean(axis=1), recent_mean)
+    top = np.maximum(top, 0.0)
+
+    if reconcile == 'proportions':
+        rate = _shares(consumed, codes, n_groups, window) * top[codes]
+    else:
+        bottom = consumed[:, -window:].mean(axis=1)
+        rate = reconcile_levels(top, bottom, codes, reconcile)
+    rate = np.maximum(rate, 0.0)
+
+    observed = present.sum(axis=1)
+    span = n_days - present.argmax(axis=1)
+    per_observed_day = rate * span / np.maximum(observed, 1)
+
+    method = f"hierarchical_{reconcile}"
+    for key, daily, days in zip(keys, per_observed_day, observed):
+        forecasts[key] = {
+            'forecast_daily': float(daily),
+            'forecast_total': float(daily) * forecast_days,
+            'historical_days': int(days),
+            'method': method
+        }
+    print(f"   → {len(keys)} items forecast from {n_groups} {hierarchy} aggregates ({reconcile})")
+    return forecasts
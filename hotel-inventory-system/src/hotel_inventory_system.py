@@ -1,56 +1,165 @@
+import os
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime
 import warnings
 from forecasting import forecast_demand
 from par_levels import calculate_par_levels
 from simulation import simulate_inventory_system
-from utils import load_and_prepare_data, perform_eda, generate_recommendations, create_visualizations
+from monte_carlo import simulate_monte_carlo
+from order_pipeline import simulate_order_pipeline
+from series_index import build_series_index
+from ingestion import load_daily_aggregates
+from data_model import ForecastTable
+from profiling import RunProfiler
+from stage_cache import StageCache, stage_key
+from data_cache import file_fingerprint
+from partitioned_store import ingest_exports, read_store, store_fingerprint
+from query import InventoryQuery
+from reporting import render_report
+from utils import load_and_prepare_data, perform_eda, generate_recommendations
 
 warnings.filterwarnings('ignore')
 
-print("="*80)
-print("HOTEL BAR INVENTORY MANAGEMENT SYSTEM")
-print("="*80)
-
 # MAIN EXECUTION
 
 def main():
-    """Main execution function"""
+    """Main execution function (runs every stage; see cli.py to run selected ones)"""
+    
+    print("="*80)
+    print("HOTEL BAR INVENTORY MANAGEMENT SYSTEM")
+    print("="*80)
     
     # Configuration
     DATA_FILE = 'hotel_bar_inventory.csv'  # Update with your file path
+    DATA_CACHE_DIR = '.cache'  # Prepared-data cache (needs pyarrow); None to always parse the CSV
+    STREAM_CHUNK_ROWS = None  # e.g. 250_000 to stream exports too large for memory
+    EXPORTS_SOURCE = None  # e.g. 'exports/' or 'exports/*/*.csv' to ingest per-property exports instead of DATA_FILE
+    STORE_DIR = 'store'  # Store partitioned by property and month, used with EXPORTS_SOURCE
+    # Slice to run on; every stage only processes matching rows (None = no restriction)
+    QUERY_START = None  # e.g. '2024-01-01'
+    QUERY_END = None  # e.g. '2024-03-31'
+    QUERY_BARS = None  # e.g. ['Main Bar', 'Pool Bar']
+    QUERY_ALCOHOL_TYPES = None  # e.g. ['Whisky', 'Gin']
+    QUERY_BRANDS = None
+    QUERY_PROPERTIES = None  # with EXPORTS_SOURCE
     FORECAST_DAYS = 30
     LEAD_TIME_DAYS = 3
     SERVICE_LEVEL = 0.95
+    FORECAST_WORKERS = os.cpu_count() or 1  # Processes used to fit forecast models
+    FORECAST_BACKEND = 'statsmodels'  # 'batched' fits all series as one NumPy matrix; 'tiered' routes sparse series to cheap methods
+    FORECAST_HIERARCHY = 'bar_type'  # with backend 'hierarchical': fit per bar/type ('bar_type'), 'bar' or 'brand'
+    FORECAST_RECONCILE = 'proportions'  # or 'ols'/'wls' to reconcile aggregate and item forecasts
+    FORECAST_STATE_FILE = None  # e.g. 'forecast_state.json' to advance saved models between runs
+    MONTE_CARLO_SCENARIOS = 0  # e.g. 1000 to stress-test par levels over sampled demand paths
+    ORDER_POLICY = None  # 'order_up_to' or 'sS' to replay a year with delivery lead times
+    REVIEW_PERIOD_DAYS = 1
+    RUN_REPORT_FILE = 'run_report.json'  # Per-stage timings/memory; None to skip instrumentation
+    TRACE_MEMORY = False  # Per-stage peak allocations via tracemalloc (slows the run)
+    PROFILE_DIR = None  # e.g. 'profiles' to dump a cProfile .prof file per stage
+    STAGE_CACHE_DIR = '.cache/stages'  # Memoized forecast/par/simulation outputs; None to recompute
+    STAGE_CACHE_MAX_MB = 512
+    SIMULATION_DAYS = 30
     
+    profiler = RunProfiler(enabled=RUN_REPORT_FILE is not None,
+                           trace_memory=TRACE_MEMORY, profile_dir=PROFILE_DIR)
     try:
+        query = InventoryQuery(start=QUERY_START, end=QUERY_END, bars=QUERY_BARS,
+                               alcohol_types=QUERY_ALCOHOL_TYPES, brands=QUERY_BRANDS,
+                               properties=QUERY_PROPERTIES)
+        
         # Step 1: Load data
-        df = load_and_prepare_data(DATA_FILE)
+        with profiler.stage('load_and_prepare_data') as stage:
+            if EXPORTS_SOURCE:
+                ingest_exports(EXPORTS_SOURCE, STORE_DIR, n_jobs=FORECAST_WORKERS)
+                df = read_store(STORE_DIR, query=query)
+            elif STREAM_CHUNK_ROWS:
+                df = load_daily_aggregates(DATA_FILE, chunksize=STREAM_CHUNK_ROWS, query=query)
+            else:
+                df = load_and_prepare_data(DATA_FILE, cache_dir=DATA_CACHE_DIR, query=query)
+            stage['rows'] = len(df)
+        with profiler.stage('build_series_index', rows=len(df)) as stage:
+            series_index = build_series_index(df)
+            stage['pairs'] = len(series_index)
+        
+        # Stage outputs are keyed by the data's content hash, the query and the parameters they depend on,
+        # so changing e.g. SERVICE_LEVEL reuses the cached forecasts and only recomputes par levels
+        stage_cache = StageCache(STAGE_CACHE_DIR, max_bytes=STAGE_CACHE_MAX_MB * 2 ** 20)
+        if EXPORTS_SOURCE:
+            data_key = stage_key('data', {'store': store_fingerprint(STORE_DIR), 'query': query.params()})
+        else:
+            data_key = stage_key('data', {'sha256': file_fingerprint(DATA_FILE)['sha256'],
+                                          'stream_chunk_rows': STREAM_CHUNK_ROWS,
+                                          'query': query.params()})
+        forecast_key = stage_key('forecast', {'forecast_days': FORECAST_DAYS,
+                                              'backend': FORECAST_BACKEND,
+                                              'hierarchy': FORECAST_HIERARCHY,
+                                              'reconcile': FORECAST_RECONCILE}, data_key)
+        par_key = stage_key('par', {'lead_time_days': LEAD_TIME_DAYS,
+                                    'service_level': SERVICE_LEVEL}, forecast_key)
+        simulation_key = stage_key('simulate', {'simulation_days': SIMULATION_DAYS}, data_key, par_key)
         
         # Step 2: EDA
         top_items, bar_consumption = perform_eda(df)
         
         # Step 3: Forecast demand using Holt-Winters or Prophet
-        forecasts = forecast_demand(df, forecast_days=FORECAST_DAYS)
+        fit_timings = {}
+        def run_forecast():
+            return ForecastTable.from_dict(forecast_demand(
+                df, forecast_days=FORECAST_DAYS,
+                n_jobs=FORECAST_WORKERS,
+                series_index=series_index,
+                backend=FORECAST_BACKEND,
+                state_path=FORECAST_STATE_FILE,
+                timings=fit_timings,
+                hierarchy=FORECAST_HIERARCHY,
+                reconcile=FORECAST_RECONCILE))
+        
+        with profiler.stage('forecast_demand', rows=len(df), pairs=len(series_index)) as stage:
+            # Saved forecast state advances between runs, so it bypasses the memo
+            forecasts = run_forecast() if FORECAST_STATE_FILE else stage_cache.memoize(forecast_key, run_forecast)
+            stage['forecasts'] = len(forecasts)
+        profiler.add_fit_timings(fit_timings)
         
         # Step 4: Calculate par levels
-        par_levels = calculate_par_levels(forecasts, 
-                                         lead_time_days=LEAD_TIME_DAYS,
-                                         service_level=SERVICE_LEVEL)
+        with profiler.stage('calculate_par_levels', pairs=len(forecasts)):
+            par_levels = stage_cache.memoize(par_key, lambda: calculate_par_levels(
+                forecasts, lead_time_days=LEAD_TIME_DAYS, service_level=SERVICE_LEVEL))
         
         # Step 5: Simulate system
-        results_df, service_level_achieved = simulate_inventory_system(
-            df, forecasts, par_levels, simulation_days=30
-        )
+        with profiler.stage('simulate_inventory_system', pairs=len(par_levels)):
+            results_df, service_level_achieved = stage_cache.memoize(
+                simulation_key, lambda: simulate_inventory_system(
+                    df, forecasts, par_levels, simulation_days=SIMULATION_DAYS,
+                    series_index=series_index
+                ))
+        
+        if MONTE_CARLO_SCENARIOS:
+            with profiler.stage('simulate_monte_carlo', pairs=len(par_levels),
+                                scenarios=MONTE_CARLO_SCENARIOS):
+                mc_df, mc_summary = simulate_monte_carlo(
+                    df, forecasts, par_levels, n_scenarios=MONTE_CARLO_SCENARIOS,
+                    n_jobs=FORECAST_WORKERS, series_index=series_index
+                )
+            mc_df.to_csv('monte_carlo_results.csv', index=False)
+        
+        if ORDER_POLICY:
+            with profiler.stage('simulate_order_pipeline', pairs=len(par_levels)):
+                pipeline_df, pipeline_summary = simulate_order_pipeline(
+                    df, forecasts, par_levels, simulation_days=365,
+                    lead_time_days=LEAD_TIME_DAYS, policy=ORDER_POLICY,
+                    review_period=REVIEW_PERIOD_DAYS, series_index=series_index
+                )
+            pipeline_df.to_csv('order_pipeline_results.csv', index=False)
         
         # Step 6: Generate recommendations
-        rec_df = generate_recommendations(df, forecasts, par_levels, results_df)
+        with profiler.stage('generate_recommendations', pairs=len(par_levels)):
+            rec_df = generate_recommendations(df, forecasts, par_levels, results_df,
+                                              series_index=series_index)
         
-        # Step 7: Visualizations
-        create_visualizations(df, forecasts, par_levels, rec_df)
+        # Step 7: Charts (unchanged charts from the last run are skipped)
+        with profiler.stage('render_report', pairs=len(par_levels)) as stage:
+            report = render_report(series_index, par_levels, rec_df, n_jobs=FORECAST_WORKERS,
+                                   forecast_days=FORECAST_DAYS)
+            stage['charts'], stage['rendered'] = report['charts'], report['rendered']
         
         # Save outputs
         print("\nSaving outputs...")
@@ -78,12 +187,16 @@ def main():
         print("  1. inventory_recommendations.csv - Action items for each bar-item")
         print("  2. par_levels.csv - Recommended par levels for all items")
         print("  3. simulation_results.csv - Simulation performance metrics")
-        print("  4. inventory_analysis.png - Visual analysis charts")
+        print("  4. inventory_analysis_*.png - Summary charts")
+        print("  5. charts/ - Consumption trend, forecast band and par vs stock per bar and item")
         print("\nKey Insights:")
         print(f"  • Service Level Achieved: {service_level_achieved*100:.2f}%")
         print(f"  • Items Analyzed: {len(par_levels)}")
         print(f"  • Immediate Actions Needed: {len(rec_df[rec_df['Action'] == 'ORDER NOW'])}")
         
+        if RUN_REPORT_FILE:
+            profiler.write_report(RUN_REPORT_FILE)
+        
     except FileNotFoundError:
         print(f"\n❌ Error: Could not find '{DATA_FILE}'")
         print("   Please update DATA_FILE variable with correct path")
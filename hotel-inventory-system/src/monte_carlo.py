@@ -0,0 +1,164 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .series_index import build_series_index
+    from .simulation import par_arrays
+    from .batched_holt_winters import pad_series
+except ImportError:
+    from series_index import build_series_index
+    from simulation import par_arrays
+    from batched_holt_winters import pad_series
+
+DEMAND_METHODS = ('bootstrap', 'forecast_error')
+Z_95 = 1.959964
+
+
+def _draw_demand(rng, method, history, lengths, mean, std, n_scenarios, days):
+    """Demand array (scenarios, pairs, days) for one chunk of scenarios."""
+    n_pairs = len(lengths)
+    if method == 'bootstrap':
+        # Resample each pair's observed daily consumption with replacement
+        picks = (rng.random((n_scenarios, n_pairs, days)) * lengths[None, :, None]).astype(np.int64)
+        return history[np.arange(n_pairs)[None, :, None], picks]
+    draws = rng.standard_normal((n_scenarios, n_pairs, days))
+    return np.maximum(mean[None, :, None] + std[None, :, None] * draws, 0.0)
+
+
+def _simulate_chunk(args):
+    """
+    Simulate one chunk of scenarios for every pair.
+
+    Returns running sums (per pair: scenarios with a stockout, stockout days,
+    fill rate and its square) plus the per-scenario overall service level,
+    so results from any number of chunks combine in O(pairs) memory.
+    """
+    (chunk_id, n_scenarios, seed, method, history, lengths, mean, std,
+     par_level, reorder_point, days) = args
+    rng = np.random.default_rng([seed, chunk_id])
+    demand = _draw_demand(rng, method, history, lengths, mean, std, n_scenarios, days)
+
+    inventory = np.broadcast_to(par_level, demand.shape[:2]).astype(float)
+    stockout_days = np.zeros(demand.shape[:2], dtype=np.int64)
+    served = np.zeros(demand.shape[:2])
+
+    for day in range(days):
+        consumption = demand[:, :, day]
+        short = inventory < consumption
+        stockout_days += short
+        served += np.where(short, inventory, consumption)
+        inventory = np.where(short, 0.0, inventory - consumption)
+        # Reorder if below reorder point
+        inventory = np.where(inventory <= reorder_point, par_level, inventory)
+
+    total_demand = demand.sum(axis=2)
+    fill_rate = np.divide(served, total_demand, out=np.ones_like(served), where=total_demand > 0)
+    scenario_service = 1 - stockout_days.sum(axis=1) / (len(lengths) * days)
+
+    return {
+        'stockout_any': (stockout_days > 0).sum(axis=0),
+        'stockout_days': stockout_days.sum(axis=0),
+        'fill_sum': fill_rate.sum(axis=0),
+        'fill_sq_sum': (fill_rate ** 2).sum(axis=0),
+        'scenario_service': scenario_service
+    }
+
+
+def simulate_monte_carlo(df, forecasts, par_levels, n_scenarios=1000, simulation_days=30,
+                         method='bootstrap', seed=0, max_memory_mb=256, n_jobs=1,
+                         series_index=None):
+    """
+    Monte Carlo stress test of par levels over many demand scenarios.
+
+    Draws n_scenarios demand paths per pair, either by bootstrapping the
+    pair's historical daily consumption ('bootstrap') or from
+    N(forecast_daily, std_daily) clipped at zero ('forecast_error'), and
+    runs the same replenishment policy as simulate_inventory_system on a
+    batched (scenarios, pairs, days) array. Scenarios are processed in
+    chunks sized to stay under max_memory_mb; with n_jobs > 1 the chunks
+    run on a process pool. Results do not depend on n_jobs.
+
+    Returns (mc_df, summary): per-pair stockout probability and fill rate
+    with 95% confidence intervals, and the overall service level with a
+    95% interval across scenarios.
+    """
+    if method not in DEMAND_METHODS:
+        raise ValueError(f"Unknown demand method: {method!r}")
+    if n_scenarios < 1:
+        raise ValueError(f"n_scenarios must be at least 1, got {n_scenarios}")
+
+    print(f"\n[5/6] Running Monte Carlo simulation: {n_scenarios} scenarios x {simulation_days} days...")
+
+    if series_index is None:
+        series_index = build_series_index(df)
+
+    keys, par_level, reorder_point = par_arrays(par_levels)
+    keep = [i for i, key in enumerate(keys) if key in series_index]
+    keys = [keys[i] for i in keep]
+    par_level = np.asarray(par_level, dtype=float)[keep]
+    reorder_point = np.asarray(reorder_point, dtype=float)[keep]
+
+    history, lengths = pad_series([series_index[key].consumed for key in keys])
+    if method == 'forecast_error':
+        mean = np.array([par_levels[key].get('forecast_daily', 0.0) for key in keys], dtype=float)
+        std = np.array([par_levels[key].get('std_daily', 0.0) for key in keys], dtype=float)
+    else:
+        mean = std = np.zeros(len(keys))
+
+    # Demand plus a few same-shaped temporaries per scenario
+    bytes_per_scenario = max(len(keys), 1) * simulation_days * 8 * 4
+    chunk_size = max(1, min(n_scenarios, int(max_memory_mb * 2 ** 20 // bytes_per_scenario)))
+    sizes = [min(chunk_size, n_scenarios - start) for start in range(0, n_scenarios, chunk_size)]
+    tasks = [(i, size, seed, method, history, lengths, mean, std, par_level, reorder_point,
+              simulation_days) for i, size in enumerate(sizes)]
+    print(f"   → {len(keys)} pairs, {len(sizes)} chunks of up to {chunk_size} scenarios")
+
+    if n_jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            partials = list(executor.map(_simulate_chunk, tasks))
+    else:
+        partials = [_simulate_chunk(task) for task in tasks]
+
+    stockout_any = sum(p['stockout_any'] for p in partials)
+    stockout_days = sum(p['stockout_days'] for p in partials)
+    fill_sum = sum(p['fill_sum'] for p in partials)
+    fill_sq_sum = sum(p['fill_sq_sum'] for p in partials)
+    scenario_service = np.concatenate([p['scenario_service'] for p in partials])
+
+    n = n_scenarios
+    stockout_prob = stockout_any / n
+    prob_half_width = Z_95 * np.sqrt(stockout_prob * (1 - stockout_prob) / n)
+    fill_mean = fill_sum / n
+    fill_var = np.maximum(fill_sq_sum / n - fill_mean ** 2, 0.0) * n / max(n - 1, 1)
+    fill_half_width = Z_95 * np.sqrt(fill_var / n)
+
+    mc_df = pd.DataFrame({
+        'Bar Name': [key[0] for key in keys],
+        'Item': [key[1] for key in keys],
+        'Scenarios': n,
+        'Stockout Probability': stockout_prob,
+        'Stockout Probability CI Low': np.clip(stockout_prob - prob_half_width, 0, 1),
+        'Stockout Probability CI High': np.clip(stockout_prob + prob_half_width, 0, 1),
+        'Expected Stockout Days': stockout_days / n,
+        'Fill Rate': fill_mean,
+        'Fill Rate CI Low': np.clip(fill_mean - fill_half_width, 0, 1),
+        'Fill Rate CI High': np.clip(fill_mean + fill_half_width, 0, 1)
+    })
+
+    summary = {
+        'scenarios': n,
+        'service_level_mean': float(scenario_service.mean()) if n else 1.0,
+        'service_level_ci': (float(np.percentile(scenario_service, 2.5)),
+                             float(np.percentile(scenario_service, 97.5))) if n else (1.0, 1.0)
+    }
+
+    print("\n   Monte Carlo Results:")
+    print(f"   → Mean service level: {summary['service_level_mean']*100:.2f}% "
+          f"(95% of scenarios within {summary['service_level_ci'][0]*100:.2f}%-"
+          f"{summary['service_level_ci'][1]*100:.2f}%)")
+    print(f"   → Items with stockout probability > 5%: {(stockout_prob > 0.05).sum()}")
+    print("   ✓ Monte Carlo simulation complete")
+
+    return mc_df, summary
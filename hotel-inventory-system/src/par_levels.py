@@ -1,6 +1,187 @@
-import pandas as pd
+from statistics import NormalDist
+
 import numpy as np
 
+try:
+    from .data_model import ForecastTable, ParLevelTable
+except ImportError:
+    from data_model import ForecastTable, ParLevelTable
+
+# Accepted names for each forecast input, in order of preference
+AVG_KEYS = ['avg_daily_consumption', 'avg_daily', 'avg_consumption', 'mean_daily', 'mean_consumption']
+STD_KEYS = ['std_consumption', 'std_daily', 'std', 'stddev']
+FORECAST_KEYS = ['forecast_daily', 'forecast_mean', 'forecast', 'forecast_values']
+HISTORY_KEYS = ['history', 'actuals', 'series', 'y']
+
+
+def service_level_z(service_level):
+    """Inverse-normal z-score for a cycle service level (scalar or per-pair array)."""
+    levels = np.asarray(service_level, dtype=float)
+    if np.any((levels <= 0) | (levels >= 1)):
+        raise ValueError(f"Service level must be strictly between 0 and 1, got {service_level}")
+    z = np.vectorize(NormalDist().inv_cdf, otypes=[float])(levels)
+    return float(z) if z.ndim == 0 else z
+
+
+def compute_par_levels(avg_daily, std_daily, forecast_daily, lead_time_days=3, service_level=0.95):
+    """
+    Par level maths for every pair at once.
+
+    avg_daily, std_daily and forecast_daily are aligned per-pair arrays
+    (NaN where unknown); lead_time_days and service_level are scalars or
+    per-pair arrays. Returns a dict of rounded arrays named like the
+    par-level records.
+    """
+    avg_daily = np.nan_to_num(np.asarray(avg_daily, dtype=float), nan=0.0)
+    std_daily = np.asarray(std_daily, dtype=float)
+    forecast_daily = np.asarray(forecast_daily, dtype=float)
+    lead_time_days = np.asarray(lead_time_days, dtype=float)
+    z_score = service_level_z(service_level)
+
+    # Guard against zero/missing std
+    std_daily = np.where(np.isnan(std_daily) | (std_daily == 0),
+                         np.maximum(avg_daily * 0.2, 1e-6), std_daily)
+    forecast_daily = np.where(np.isnan(forecast_daily), np.round(avg_daily, 2), forecast_daily)
+
+    # Cycle stock: expected demand during lead time
+    cycle_stock = avg_daily * lead_time_days
+
+    # Safety stock: buffer for demand variability
+    safety_stock = z_score * std_daily * np.sqrt(lead_time_days)
+
+    # Par level
+    par_level = cycle_stock + safety_stock
+
+    # Reorder point (when to order) = expected demand during lead time + safety stock
+    reorder_point = cycle_stock + safety_stock
+
+    return {
+        'par_level_ml': np.round(par_level, 2),
+        'cycle_stock_ml': np.round(cycle_stock, 2),
+        'safety_stock_ml': np.round(safety_stock, 2),
+        'reorder_point_ml': np.round(reorder_point, 2),
+        'avg_daily_demand': np.round(avg_daily, 2),
+        'std_daily': np.round(std_daily, 2),
+        'forecast_daily': np.round(forecast_daily, 2)
+    }
+
+
+def _first_column(table, names):
+    """Per row, the first candidate column holding a numeric value (NaN if none)."""
+    out = np.full(len(table), np.nan)
+    for name in names:
+        if name in table.columns and table.columns[name].dtype.kind == 'f':
+            out = np.where(np.isnan(out), table.columns[name], out)
+    return out
+
+
+def _lead_times(lead_time_days, keys):
+    """Scalar lead time, or one per pair from a {(bar, item): days} dict or aligned array."""
+    if isinstance(lead_time_days, dict):
+        return np.array([lead_time_days[key] for key in keys], dtype=float)
+    return lead_time_days
+
+
+def _forecast_inputs(forecast):
+    """Defensive (avg, std, forecast daily) extraction from one forecast dict; NaN if unknown."""
+    # defensive retrieval of average daily consumption
+    avg_daily = None
+    for k in AVG_KEYS:
+        if k in forecast:
+            avg_daily = forecast[k]
+            break
+
+    std_daily = None
+    for k in STD_KEYS:
+        if k in forecast:
+            std_daily = forecast[k]
+            break
+
+    forecast_daily = None
+    for k in FORECAST_KEYS:
+        if k in forecast:
+            forecast_daily = forecast[k]
+            break
+
+    # If not present, try to compute from history/actuals/series
+    history = forecast.get('history') or forecast.get('actuals') or forecast.get('series') or forecast.get('y')
+    if avg_daily is None and history is not None:
+        try:
+            arr = np.array(history, dtype=float)
+            avg_daily = float(np.nanmean(arr))
+        except Exception:
+            avg_daily = 0.0
+
+    if std_daily is None and history is not None:
+        try:
+            arr = np.array(history, dtype=float)
+            std_daily = float(np.nanstd(arr, ddof=1))
+        except Exception:
+            std_daily = 0.0
+
+    # If still missing, set reasonable defaults
+    try:
+        avg_daily = float(avg_daily) if avg_daily is not None else 0.0
+    except Exception:
+        avg_daily = 0.0
+
+    try:
+        std_daily = float(std_daily) if std_daily is not None else 0.0
+    except Exception:
+        std_daily = np.nan
+
+    # Forecast daily (single value) - try to reduce array to mean if needed
+    if isinstance(forecast_daily, (list, tuple, np.ndarray)):
+        try:
+            forecast_daily = float(np.nanmean(np.array(forecast_daily, dtype=float)))
+        except Exception:
+            forecast_daily = np.nan
+    else:
+        try:
+            forecast_daily = float(forecast_daily) if forecast_daily is not None else np.nan
+        except Exception:
+            forecast_daily = np.nan
+
+    return avg_daily, std_daily, forecast_daily
+
+
+def _history_fallback(table, avg_daily, std_daily):
+    """
+    Fill the avg/std a table row has no value for from its history series,
+    as _forecast_inputs does for a forecast dict.
+    """
+    names = [name for name in HISTORY_KEYS if name in table.columns]
+    if not names:
+        return avg_daily, std_daily
+    avg_daily, std_daily = avg_daily.copy(), std_daily.copy()
+    for row in np.flatnonzero(np.isnan(avg_daily) | np.isnan(std_daily)):
+        record = {}
+        for name in names:
+            value = table.columns[name][row]
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                continue
+            record[name] = value.tolist() if isinstance(value, np.ndarray) else value
+        if not record:
+            continue
+        avg, std, _ = _forecast_inputs(record)
+        if np.isnan(avg_daily[row]):
+            avg_daily[row] = avg
+        if np.isnan(std_daily[row]):
+            std_daily[row] = std
+    return avg_daily, std_daily
+
+
+def forecast_arrays(forecasts):
+    """(keys, avg_daily, std_daily, forecast_daily) aligned arrays from a ForecastTable or dict."""
+    if isinstance(forecasts, ForecastTable):
+        avg_daily, std_daily = _history_fallback(forecasts, _first_column(forecasts, AVG_KEYS),
+                                                 _first_column(forecasts, STD_KEYS))
+        return forecasts.keys(), avg_daily, std_daily, _first_column(forecasts, FORECAST_KEYS)
+    keys = list(forecasts)
+    inputs = np.array([_forecast_inputs(forecasts[key]) for key in keys], dtype=float).reshape(-1, 3)
+    return keys, inputs[:, 0], inputs[:, 1], inputs[:, 2]
+
+
 def calculate_par_levels(forecasts, lead_time_days=3, service_level=0.95):
     """
     Calculate optimal inventory par levels.
@@ -8,105 +189,43 @@ def calculate_par_levels(forecasts, lead_time_days=3, service_level=0.95):
     Par Level = (Average Daily Demand × Lead Time) + Safety Stock
     Safety Stock = Z-score × Std Dev × sqrt(Lead Time)
 
+    The z-score is the inverse normal of service_level, so any level in
+    (0, 1) works. lead_time_days is a scalar or a per-pair lead time
+    ({(bar, item): days} or an array aligned with the forecasts).
+
     This implementation is defensive about forecast dict keys:
     - Tries common names for avg/std/forecast values
     - Falls back to computing mean/std from a 'history' or 'actuals' series if provided
+      (for a dict and a ForecastTable alike)
+
+    A ForecastTable input is computed column-wise and returns a ParLevelTable;
+    a dict is reduced to the same columns and computed in one pass too.
     """
     print(f"\nCalculating par levels...")
-    print(f"   → Lead time: {lead_time_days} days")
-    print(f"   → Service level: {service_level*100}%")
-
-    # Z-score for service level
-    z_scores = {0.90: 1.28, 0.95: 1.65, 0.99: 2.33}
-    z_score = z_scores.get(service_level, 1.65)
-
-    par_levels = {}
-
-    for (bar, item), forecast in forecasts.items():
-        # defensive retrieval of average daily consumption
-        avg_keys = ['avg_daily_consumption', 'avg_daily', 'avg_consumption', 'mean_daily', 'mean_consumption']
-        std_keys = ['std_consumption', 'std_daily', 'std', 'stddev']
-        forecast_keys = ['forecast_daily', 'forecast_mean', 'forecast', 'forecast_values']
-
-        avg_daily = None
-        for k in avg_keys:
-            if k in forecast:
-                avg_daily = forecast[k]
-                break
-
-        std_daily = None
-        for k in std_keys:
-            if k in forecast:
-                std_daily = forecast[k]
-                break
-
-        forecast_daily = None
-        for k in forecast_keys:
-            if k in forecast:
-                forecast_daily = forecast[k]
-                break
-
-        # If not present, try to compute from history/actuals/series
-        history = forecast.get('history') or forecast.get('actuals') or forecast.get('series') or forecast.get('y')
-        if avg_daily is None and history is not None:
-            try:
-                arr = np.array(history, dtype=float)
-                avg_daily = float(np.nanmean(arr))
-            except Exception:
-                avg_daily = 0.0
-
-        if std_daily is None and history is not None:
-            try:
-                arr = np.array(history, dtype=float)
-                std_daily = float(np.nanstd(arr, ddof=1))
-            except Exception:
-                std_daily = 0.0
-
-        # If still missing, set reasonable defaults
-        try:
-            avg_daily = float(avg_daily) if avg_daily is not None else 0.0
-        except Exception:
-            avg_daily = 0.0
-
-        try:
-            std_daily = float(std_daily) if std_daily is not None else 0.0
-        except Exception:
-            std_daily = max(avg_daily * 0.2, 1e-6)
-
-        # Guard against zero std
-        if std_daily == 0 or pd.isna(std_daily):
-            std_daily = max(avg_daily * 0.2, 1e-6)
-
-        # Cycle stock: expected demand during lead time
-        cycle_stock = avg_daily * lead_time_days
-
-        # Safety stock: buffer for demand variability
-        safety_stock = z_score * std_daily * np.sqrt(lead_time_days)
-
-        # Par level
-        par_level = cycle_stock + safety_stock
-
-        # Reorder point (when to order) = expected demand during lead time + safety stock
-        reorder_point = cycle_stock + safety_stock
-
-        # Forecast daily (single value) - try to reduce array to mean if needed
-        if isinstance(forecast_daily, (list, tuple, np.ndarray)):
-            try:
-                forecast_daily_val = float(np.nanmean(np.array(forecast_daily, dtype=float)))
-            except Exception:
-                forecast_daily_val = round(avg_daily, 2)
-        else:
-            forecast_daily_val = float(forecast_daily) if forecast_daily is not None else round(avg_daily, 2)
-
-        par_levels[(bar, item)] = {
-            'par_level_ml': round(par_level, 2),
-            'cycle_stock_ml': round(cycle_stock, 2),
-            'safety_stock_ml': round(safety_stock, 2),
-            'reorder_point_ml': round(reorder_point, 2),
-            'avg_daily_demand': round(avg_daily, 2),
-            'std_daily': round(std_daily, 2),
-            'forecast_daily': round(forecast_daily_val, 2)
-        }
+    if np.ndim(lead_time_days) == 0 and not isinstance(lead_time_days, dict):
+        print(f"   → Lead time: {lead_time_days} days")
+    else:
+        lead = np.asarray(list(lead_time_days.values()) if isinstance(lead_time_days, dict)
+                          else lead_time_days, dtype=float)
+        print(f"   → Lead time: per pair ({lead.min():g}-{lead.max():g} days)")
+    if np.ndim(service_level) == 0:
+        print(f"   → Service level: {service_level*100}%")
+    else:
+        print(f"   → Service level: per pair")
+
+    keys, avg_daily, std_daily, forecast_daily = forecast_arrays(forecasts)
+    columns = compute_par_levels(avg_daily, std_daily, forecast_daily,
+                                 _lead_times(lead_time_days, keys), service_level)
+
+    if isinstance(forecasts, ForecastTable):
+        par_levels = ParLevelTable(forecasts.pairs, columns)
+        print(f"   ✓ Calculated par levels for {len(par_levels)} combinations")
+        return par_levels
+
+    par_levels = {
+        key: {name: float(values[i]) for name, values in columns.items()}
+        for i, key in enumerate(keys)
+    }
 
     print(f"   ✓ Calculated par levels for {len(par_levels)} combinations")
-    return par_levels
\ No newline at end of file
+    return par_levels
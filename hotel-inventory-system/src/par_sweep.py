@@ -0,0 +1,195 @@
+import hashlib
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .series_index import build_series_index
+    from .par_levels import compute_par_levels, forecast_arrays
+    from .order_pipeline import POLICIES, run_pipeline
+except ImportError:
+    from series_index import build_series_index
+    from par_levels import compute_par_levels, forecast_arrays
+    from order_pipeline import POLICIES, run_pipeline
+
+# Evaluated grid points, keyed by data digest + parameters; survives across calls in one process
+_POINT_CACHE = {}
+_worker_demand = None
+
+
+def _init_worker(demand_by_day):
+    """Ship the (days, pairs) demand matrix to each worker once, not once per point."""
+    global _worker_demand
+    _worker_demand = demand_by_day
+
+
+def _evaluate_point(args):
+    """Simulate one grid point; returns the per-pair metrics the sweep keeps."""
+    par_level, trigger, lead, review_period = args
+    run = run_pipeline(_worker_demand, par_level, trigger, lead, review_period)
+    days = max(len(_worker_demand), 1)
+    return {
+        'stockout_days': run['stockout_days'],
+        'served': run['served'],
+        'avg_on_hand': run['holding'] / days,
+        'orders_placed': run['orders_placed']
+    }
+
+
+def _data_digest(keys, demand, *arrays):
+    digest = hashlib.sha1(repr(keys).encode('utf-8'))
+    for array in (demand,) + arrays:
+        digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def _cache_path(cache_dir, point_key):
+    name = hashlib.sha1(repr(point_key).encode('utf-8')).hexdigest()[:20]
+    return os.path.join(cache_dir, f"sweep-{name}.npz")
+
+
+def _load_point(point_key, cache_dir):
+    if point_key in _POINT_CACHE:
+        return _POINT_CACHE[point_key]
+    if cache_dir is None:
+        return None
+    path = _cache_path(cache_dir, point_key)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        result = {name: data[name] for name in data.files}
+    _POINT_CACHE[point_key] = result
+    return result
+
+
+def _store_point(point_key, result, cache_dir):
+    _POINT_CACHE[point_key] = result
+    if cache_dir is None:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(cache_dir, point_key)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, **result)
+    os.replace(tmp_path, path)
+
+
+def pareto_mask(holding, stockout_rate):
+    """
+    Non-dominated grid points per pair.
+
+    holding and stockout_rate are (points, pairs); a point is dominated when
+    another point for the same pair is no worse on both and better on one.
+    """
+    h_le = holding[:, None, :] <= holding[None, :, :]
+    s_le = stockout_rate[:, None, :] <= stockout_rate[None, :, :]
+    strictly = (holding[:, None, :] < holding[None, :, :]) | (stockout_rate[:, None, :] < stockout_rate[None, :, :])
+    # dominated[j] if any point i beats it
+    dominated = (h_le & s_le & strictly).any(axis=0)
+    return ~dominated
+
+
+def sweep_par_levels(df, forecasts, lead_times=(1, 3, 7), service_levels=(0.90, 0.95, 0.99),
+                     review_periods=(1, 7), simulation_days=365, policy='order_up_to',
+                     n_jobs=1, cache_dir=None, series_index=None):
+    """
+    Evaluate par levels over a grid of lead time, service level and review period.
+
+    One forecast is reused for the whole grid: each point only recomputes
+    par levels (vectorised) and replays the order pipeline for every pair,
+    with grid points spread over n_jobs processes. Par levels cover the
+    protection period of lead time + review period - 1 days, so a daily
+    review matches calculate_par_levels.
+
+    Evaluated points are kept in memory for the rest of the process (and in
+    cache_dir, when given), keyed by the demand, forecast inputs and point
+    parameters, so re-running with a wider grid only simulates new points.
+
+    Returns (sweep_df, pareto_df): per-pair holding stock and stockout rate
+    for every grid point, and the per-pair Pareto-optimal subset.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown replenishment policy: {policy!r}")
+
+    print(f"\nSweeping par levels over {len(lead_times)} lead times x {len(service_levels)} "
+          f"service levels x {len(review_periods)} review periods...")
+
+    if series_index is None:
+        series_index = build_series_index(df)
+
+    keys, avg_daily, std_daily, forecast_daily = forecast_arrays(forecasts)
+    keep = [i for i, key in enumerate(keys) if key in series_index]
+    keys = [keys[i] for i in keep]
+    avg_daily, std_daily, forecast_daily = avg_daily[keep], std_daily[keep], forecast_daily[keep]
+
+    unique_days = series_index.days
+    simulation_days = min(simulation_days, len(unique_days))
+    demand, _ = series_index.window_matrix(keys, unique_days[-simulation_days])
+    demand_by_day = np.ascontiguousarray(demand.T)
+    digest = _data_digest(keys, demand, avg_daily, std_daily, forecast_daily)
+
+    points = list(itertools.product(lead_times, service_levels, review_periods))
+    par_by_point = {}
+    results = {}
+    tasks = []
+    for lead_time, service_level, review_period in points:
+        columns = compute_par_levels(avg_daily, std_daily, forecast_daily,
+                                     lead_time + review_period - 1, service_level)
+        par_by_point[(lead_time, service_level, review_period)] = columns['par_level_ml']
+        point_key = (digest, policy, lead_time, float(service_level), review_period)
+        cached = _load_point(point_key, cache_dir)
+        if cached is not None:
+            results[point_key] = cached
+            continue
+        trigger = columns['par_level_ml'] if policy == 'order_up_to' else columns['reorder_point_ml']
+        lead = np.full(len(keys), max(int(lead_time), 1))
+        tasks.append((point_key, (columns['par_level_ml'], trigger, lead, review_period)))
+
+    print(f"   → {len(keys)} pairs, {len(points)} grid points ({len(points) - len(tasks)} cached)")
+
+    if n_jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(demand_by_day,)) as executor:
+            computed = list(executor.map(_evaluate_point, [args for _, args in tasks]))
+    else:
+        _init_worker(demand_by_day)
+        computed = [_evaluate_point(args) for _, args in tasks]
+    for (point_key, _), result in zip(tasks, computed):
+        _store_point(point_key, result, cache_dir)
+        results[point_key] = result
+
+    total_demand = demand.sum(axis=1)
+    demand_days = (demand > 0).sum(axis=1)
+    n_pairs = len(keys)
+    frames = []
+    holding = np.empty((len(points), n_pairs))
+    stockout_rate = np.empty((len(points), n_pairs))
+    for p, (lead_time, service_level, review_period) in enumerate(points):
+        result = results[(digest, policy, lead_time, float(service_level), review_period)]
+        holding[p] = result['avg_on_hand']
+        stockout_rate[p] = np.divide(result['stockout_days'], demand_days, out=np.zeros(n_pairs),
+                                     where=demand_days > 0)
+        frames.append(pd.DataFrame({
+            'Bar Name': [key[0] for key in keys],
+            'Item': [key[1] for key in keys],
+            'Lead Time (days)': lead_time,
+            'Service Level': service_level,
+            'Review Period (days)': review_period,
+            'Par Level': par_by_point[(lead_time, service_level, review_period)],
+            'Avg On Hand (ml)': np.round(holding[p], 2),
+            'Stockout Rate': stockout_rate[p],
+            'Fill Rate': np.divide(result['served'], total_demand, out=np.ones(n_pairs),
+                                   where=total_demand > 0),
+            'Orders Placed': result['orders_placed']
+        }))
+
+    sweep_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if len(sweep_df):
+        sweep_df['Pareto Optimal'] = pareto_mask(holding, stockout_rate).ravel()
+    pareto_df = sweep_df[sweep_df['Pareto Optimal']].reset_index(drop=True) if len(sweep_df) else sweep_df
+
+    print(f"   → Pareto-optimal settings: {len(pareto_df)} across {n_pairs} pairs")
+    print("   ✓ Par level sweep complete")
+    return sweep_df, pareto_df
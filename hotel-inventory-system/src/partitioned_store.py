@@ -0,0 +1,265 @@
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+try:
+    from .utils import prepare_frame
+    from .data_cache import feather, file_fingerprint
+    from .query import PROPERTY_SEPARATOR
+except ImportError:
+    from utils import prepare_frame
+    from data_cache import feather, file_fingerprint
+    from query import PROPERTY_SEPARATOR
+
+STORE_VERSION = 3
+MANIFEST = 'manifest.json'
+# Columns prepare_frame or ingestion add; everything else is raw export data used to spot duplicate rows
+DERIVED_COLUMNS = ('Date', 'Day', 'Item', 'Month', 'Source')
+
+
+def find_exports(source):
+    """CSV exports under a directory (recursively), matching a glob, or a single file."""
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, '**', '*.csv'), recursive=True)
+    elif any(ch in source for ch in '*?['):
+        paths = glob.glob(source, recursive=True)
+    else:
+        paths = [source] if os.path.exists(source) else []
+    return sorted(paths)
+
+
+def property_of(path, root=None):
+    """
+    Property an export belongs to: the first sub-directory below root
+    (root/<property>/...csv), otherwise the file name up to its first '_'
+    (<property>_2024-03-01.csv). A 'Property' column in the file wins.
+    """
+    if root is not None and os.path.isdir(root):
+        parts = os.path.relpath(path, root).split(os.sep)
+        if len(parts) > 1:
+            return parts[0]
+    return os.path.splitext(os.path.basename(path))[0].split('_', 1)[0]
+
+
+def _parse_export(args):
+    """Parse and normalise one export (runs in a worker process)."""
+    path, prop = args
+    frame = pd.read_csv(path)
+    frame = prepare_frame(frame, strict=False)
+    if 'Property' not in frame.columns:
+        frame['Property'] = prop
+    frame['Property'] = frame['Property'].astype(str)
+    # The export each row came from, so re-ingesting a changed file can replace its rows
+    frame['Source'] = os.path.abspath(path)
+    return frame.dropna(subset=['Date'])
+
+
+def _partition_name(prop, month):
+    return os.path.join(f"property={prop}", f"month={month}")
+
+
+def _data_file(store_dir, name):
+    suffix = '.feather' if feather is not None else '.pkl'
+    return os.path.join(store_dir, name, 'part' + suffix)
+
+
+def _read_partition(path, columns=None):
+    if path.endswith('.feather'):
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    frame = pd.read_pickle(path)
+    return frame[columns] if columns is not None else frame
+
+
+def _write_partition(frame, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    if path.endswith('.feather'):
+        feather.write_feather(frame.reset_index(drop=True), tmp_path, compression='uncompressed')
+    else:
+        frame.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _dedupe(frame):
+    subset = [c for c in frame.columns if c not in DERIVED_COLUMNS]
+    return frame.drop_duplicates(subset=subset, ignore_index=True)
+
+
+def load_manifest(store_dir):
+    try:
+        with open(os.path.join(store_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get('version') != STORE_VERSION:
+        manifest = {'version': STORE_VERSION, 'files': {}, 'file_partitions': {}, 'partitions': {}}
+    return manifest
+
+
+def _save_manifest(store_dir, manifest):
+    path = os.path.join(store_dir, MANIFEST)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def store_fingerprint(store_dir):
+    """Digest of the store's partition metadata; changes whenever ingestion changes any partition."""
+    partitions = load_manifest(store_dir)['partitions']
+    return hashlib.sha256(json.dumps(partitions, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def ingest_exports(source, store_dir, n_jobs=None, force=False):
+    """
+    Parse every export under source into a store partitioned by property and month.
+
+    Files whose size and mtime match the manifest are skipped unless force.
+    New or changed files are parsed across n_jobs processes (None: one per
+    core), rows repeated across overlapping exports are dropped (a shared
+    row is kept under the first file that brought it), and each touched
+    partition is merged with what it already holds. A re-parsed file
+    replaces the rows it contributed before, so a corrected export never
+    double counts. Returns counts of files seen/parsed, net rows added and
+    partitions written.
+    """
+    root = source if os.path.isdir(source) else None
+    paths = find_exports(source)
+    if not paths:
+        raise FileNotFoundError(f"No CSV exports found at {source}")
+
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = load_manifest(store_dir)
+    todo = []
+    for path in paths:
+        fingerprint = file_fingerprint(path, with_hash=False)
+        if force or manifest['files'].get(os.path.abspath(path)) != fingerprint:
+            todo.append((path, fingerprint))
+
+    print(f"\nIngesting {len(todo)} of {len(paths)} exports into {store_dir}...")
+    stats = {'files': len(paths), 'parsed': len(todo), 'rows_added': 0, 'partitions_written': 0}
+    if not todo:
+        return stats
+
+    tasks = [(path, property_of(path, root)) for path, _ in todo]
+    n_workers = min(n_jobs or os.cpu_count() or 1, len(tasks))
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            frames = list(executor.map(_parse_export, tasks))
+    else:
+        frames = [_parse_export(task) for task in tasks]
+
+    new = _dedupe(pd.concat(frames, ignore_index=True))
+    new['Month'] = new['Date'].dt.strftime('%Y-%m')
+    replaced = {os.path.abspath(path) for path, _ in todo}
+    # Partitions holding rows of re-parsed files must be rewritten even if the new rows moved elsewhere
+    stale = {name for source in replaced for name in manifest['file_partitions'].get(source, [])}
+    parts = dict(iter(new.groupby(['Property', 'Month'], sort=True)))
+    names = {_partition_name(prop, month): (prop, month) for prop, month in parts}
+    for name in stale:
+        if name in manifest['partitions']:
+            meta = manifest['partitions'][name]
+            names.setdefault(name, (meta['property'], meta['month']))
+
+    for name, (prop, month) in sorted(names.items()):
+        path = _data_file(store_dir, name)
+        part = parts.get((prop, month), new.iloc[:0])
+        before = 0
+        if name in manifest['partitions'] and os.path.exists(path):
+            existing = _read_partition(path)
+            before = len(existing)
+            existing = existing[~existing['Source'].isin(replaced)]
+            part = _dedupe(pd.concat([existing, part], ignore_index=True))
+        stats['rows_added'] += len(part) - before
+        if part.empty:
+            os.remove(path)
+            del manifest['partitions'][name]
+            continue
+        part = part.sort_values('Date', kind='mergesort', ignore_index=True)
+        _write_partition(part, path)
+        stats['partitions_written'] += 1
+        manifest['partitions'][name] = {
+            'property': prop,
+            'month': month,
+            'rows': len(part),
+            'bars': sorted(part['Bar Name'].astype(str).unique().tolist()),
+            'file': os.path.relpath(path, store_dir)
+        }
+
+    owned = new[['Source', 'Property', 'Month']].drop_duplicates()
+    for path, fingerprint in todo:
+        source = os.path.abspath(path)
+        rows = owned[owned['Source'] == source]
+        manifest['files'][source] = fingerprint
+        manifest['file_partitions'][source] = sorted(
+            _partition_name(prop, month) for prop, month in zip(rows['Property'], rows['Month']))
+    _save_manifest(store_dir, manifest)
+    print(f"   → {stats['rows_added']} net new rows across {stats['partitions_written']} partitions")
+    return stats
+
+
+def select_partitions(manifest, start=None, end=None, bars=None, properties=None):
+    """Names of partitions that can hold rows for the date window, bars and properties."""
+    start_month = pd.Timestamp(start).strftime('%Y-%m') if start is not None else None
+    end_month = pd.Timestamp(end).strftime('%Y-%m') if end is not None else None
+    bars = set(bars) if bars is not None else None
+    selected = []
+    for name, meta in sorted(manifest['partitions'].items()):
+        if start_month is not None and meta['month'] < start_month:
+            continue
+        if end_month is not None and meta['month'] > end_month:
+            continue
+        if properties is not None and meta['property'] not in properties:
+            continue
+        if bars is not None and bars.isdisjoint(meta['bars']):
+            continue
+        selected.append(name)
+    return selected
+
+
+def read_store(store_dir, start=None, end=None, bars=None, properties=None, qualify_bars=None, query=None):
+    """
+    Prepared frame for the given date window (inclusive), bars and properties.
+
+    Only partitions whose month, property and bar list can match are
+    opened; rows are then filtered to the exact window and bars (plain bar
+    names as exported). Bar names are rewritten as '<property> / <bar>' when
+    qualify_bars is True, or by default when the rows span several
+    properties, so same-named bars at different hotels stay separate pairs.
+
+    A query (InventoryQuery) supplies the window, bars and properties
+    instead, and its alcohol type and brand filters are applied to the rows
+    read; its bars may be plain or property-qualified names.
+    """
+    if query is not None:
+        start, end, properties = query.start, query.end, query.properties
+        bars = ({bar.split(PROPERTY_SEPARATOR, 1)[-1] for bar in query.bars}
+                if query.bars is not None else None)
+    manifest = load_manifest(store_dir)
+    names = select_partitions(manifest, start, end, bars, properties)
+    print(f"   → Reading {len(names)} of {len(manifest['partitions'])} store partitions")
+    if not names:
+        raise ValueError(f"No partitions in {store_dir} match the requested window and bars")
+    frames = []
+    for name in names:
+        frame = _read_partition(os.path.join(store_dir, manifest['partitions'][name]['file']))
+        mask = pd.Series(True, index=frame.index)
+        if start is not None:
+            mask &= frame['Date'] >= pd.Timestamp(start)
+        if end is not None:
+            mask &= frame['Date'] <= pd.Timestamp(end)
+        if bars is not None:
+            mask &= frame['Bar Name'].isin(list(bars))
+        frames.append(frame[mask])
+    df = pd.concat(frames, ignore_index=True).drop(columns=['Month', 'Source'])
+    if qualify_bars is None:
+        qualify_bars = df['Property'].nunique() > 1
+    if qualify_bars:
+        df['Bar Name'] = df['Property'].astype(str) + PROPERTY_SEPARATOR + df['Bar Name'].astype(str)
+    if query is not None and query.filters_pairs:
+        df = df[query.mask(df)]
+    return df.sort_values('Date', kind='mergesort', ignore_index=True)
@@ -0,0 +1,124 @@
+import cProfile
+import json
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Not available on Windows: max RSS is left out of the report
+    resource = None
+
+REPORT_VERSION = 1
+
+
+def _max_rss_mb():
+    """Peak resident set size of this process so far, in MB (None if unknown)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return round(rss / 2 ** 20 if platform.system() == 'Darwin' else rss / 2 ** 10, 2)
+
+
+def _json_key(key):
+    return list(key) if isinstance(key, tuple) else key
+
+
+class RunProfiler:
+    """
+    Wall/CPU time, peak memory and row/pair counts for each pipeline stage.
+
+    Wrap each stage in `with profiler.stage(name, rows=...) as stage:` and
+    set stage['pairs'] (or any other counter) inside the block. With
+    trace_memory=True the stage's peak Python/NumPy allocation is measured
+    with tracemalloc (slower); the process's max RSS is always recorded.
+    With profile_dir set, each stage also runs under cProfile and its stats
+    are dumped to <profile_dir>/<stage>.prof for pstats/snakeviz. CPU time
+    covers this process only; process-pool workers report their own time
+    through forecast_demand's timings.
+
+    A disabled profiler keeps the same interface but records nothing, so
+    the pipeline code does not need two paths.
+    """
+
+    def __init__(self, enabled=True, trace_memory=False, profile_dir=None):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.stages = []
+        self.slowest_fits = []
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, **counters):
+        """Record one stage; yields a dict the caller may add counters to."""
+        record = {'stage': name, **counters}
+        if not self.enabled:
+            yield record
+            return
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+        profiler = cProfile.Profile() if self.profile_dir else None
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record['wall_seconds'] = round(time.perf_counter() - wall, 4)
+            record['cpu_seconds'] = round(time.process_time() - cpu, 4)
+            if self.trace_memory:
+                record['peak_traced_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+                if tracing:
+                    tracemalloc.stop()
+            record['max_rss_mb'] = _max_rss_mb()
+            if profiler is not None:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                record['profile'] = os.path.join(self.profile_dir, f"{name}.prof")
+                profiler.dump_stats(record['profile'])
+            self.stages.append(record)
+
+    def add_fit_timings(self, timings, n=10):
+        """Keep the n slowest model fits from forecast_demand's timings dict."""
+        fits = [fit for stats in timings.values() for fit in stats.get('slowest', [])]
+        fits = sorted(self.slowest_fits + fits, key=lambda kv: kv[1], reverse=True)
+        self.slowest_fits = fits[:n]
+
+    def report(self):
+        """The run report as a JSON-serialisable dict."""
+        total_wall = sum(s['wall_seconds'] for s in self.stages if 'wall_seconds' in s)
+        return {
+            'version': REPORT_VERSION,
+            'started_at': self.started_at,
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'total_wall_seconds': round(time.perf_counter() - self._start, 4),
+            'stages': [
+                {**s, 'share': round(s['wall_seconds'] / total_wall, 4) if total_wall else None}
+                for s in self.stages
+            ],
+            'slowest_fits': [{'key': _json_key(key), 'seconds': round(seconds, 4)}
+                             for key, seconds in self.slowest_fits]
+        }
+
+    def write_report(self, path):
+        """Write the run report as JSON and print a one-line-per-stage summary."""
+        report = self.report()
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\nStage timings (report: {path}):")
+        for s in report['stages']:
+            counts = ', '.join(f"{k}={s[k]}" for k in ('rows', 'pairs') if s.get(k) is not None)
+            print(f"   → {s['stage']:<28} {s['wall_seconds']:>9.3f}s wall "
+                  f"{s['cpu_seconds']:>9.3f}s cpu" + (f"  ({counts})" if counts else ""))
+        return report
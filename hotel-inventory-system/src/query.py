@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+# Separator between property and bar in bar names read from a multi-property store
+PROPERTY_SEPARATOR = ' / '
+# Separator between alcohol type and brand in prepared Item names
+ITEM_SEPARATOR = ' - '
+
+
+def _as_set(values):
+    """None, one name or an iterable of names as a frozenset of strings (None stays None)."""
+    if values is None:
+        return None
+    if isinstance(values, str):
+        values = [values]
+    return frozenset(str(v) for v in values)
+
+
+def split_item(item):
+    """(alcohol type, brand) of a prepared Item name such as 'Whisky - Glenfiddich'."""
+    alcohol_type, _, brand = str(item).partition(ITEM_SEPARATOR)
+    return alcohol_type, brand or alcohol_type
+
+
+def _matching(column, predicate):
+    """Boolean array marking rows whose value satisfies predicate, testing each distinct value once."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        values = column.cat.categories
+    else:
+        values = pd.unique(column)
+    keep = [v for v in values if predicate(v)]
+    return column.isin(keep).to_numpy()
+
+
+class InventoryQuery:
+    """
+    The slice of the inventory a run works on: an inclusive date window
+    plus optional lists of bars, alcohol types, brands and properties.
+
+    Unset fields do not restrict anything. Bars match the exported bar name
+    or the '<property> / <bar>' name used for multi-property reads; alcohol
+    types and brands match the two halves of the 'Type - Brand' Item name.
+    The query is applied where the data is loaded (mask/apply) and to a
+    prebuilt SeriesIndex (restrict), so every later stage only sees, and
+    only pays for, the requested pairs and days.
+    """
+
+    def __init__(self, start=None, end=None, bars=None, alcohol_types=None, brands=None, properties=None):
+        self.start = pd.Timestamp(start).normalize() if start is not None else None
+        self.end = pd.Timestamp(end).normalize() if end is not None else None
+        if self.start is not None and self.end is not None and self.start > self.end:
+            raise ValueError(f"Query start {self.start.date()} is after its end {self.end.date()}")
+        self.bars = _as_set(bars)
+        self.alcohol_types = _as_set(alcohol_types)
+        self.brands = _as_set(brands)
+        self.properties = _as_set(properties)
+
+    @property
+    def unrestricted(self):
+        return all(v is None for v in (self.start, self.end, self.bars, self.alcohol_types,
+                                       self.brands, self.properties))
+
+    @property
+    def filters_pairs(self):
+        return any(v is not None for v in (self.bars, self.alcohol_types, self.brands))
+
+    @property
+    def columns(self):
+        """Columns mask() reads."""
+        return ['Date', 'Bar Name', 'Item', 'Property']
+
+    def params(self):
+        """JSON-friendly form, for stage cache keys and CLI stamps."""
+        def names(values):
+            return sorted(values) if values is not None else None
+        return {
+            'start': self.start.date().isoformat() if self.start is not None else None,
+            'end': self.end.date().isoformat() if self.end is not None else None,
+            'bars': names(self.bars),
+            'alcohol_types': names(self.alcohol_types),
+            'brands': names(self.brands),
+            'properties': names(self.properties)
+        }
+
+    def describe(self):
+        parts = []
+        if self.start is not None or self.end is not None:
+            start = self.start.date() if self.start is not None else '…'
+            end = self.end.date() if self.end is not None else '…'
+            parts.append(f"{start} to {end}")
+        for label, values in (('bars', self.bars), ('types', self.alcohol_types),
+                              ('brands', self.brands), ('properties', self.properties)):
+            if values is not None:
+                parts.append(f"{len(values)} {label}")
+        return ', '.join(parts) if parts else 'everything'
+
+    def matches_bar(self, bar):
+        if self.bars is None:
+            return True
+        bar = str(bar)
+        return bar in self.bars or bar.split(PROPERTY_SEPARATOR, 1)[-1] in self.bars
+
+    def matches_item(self, item):
+        alcohol_type, brand = split_item(item)
+        return ((self.alcohol_types is None or alcohol_type in self.alcohol_types)
+                and (self.brands is None or brand in self.brands))
+
+    def matches(self, key):
+        """True if the (bar, item) pair is inside the query (dates aside)."""
+        bar, item = key
+        return self.matches_bar(bar) and self.matches_item(item)
+
+    def mask(self, df):
+        """Boolean array selecting df's rows inside the query."""
+        mask = np.ones(len(df), dtype=bool)
+        if self.start is not None:
+            mask &= (df['Date'] >= self.start).to_numpy()
+        if self.end is not None:
+            mask &= (df['Date'] <= self.end).to_numpy()
+        if self.properties is not None and 'Property' in df.columns:
+            mask &= df['Property'].astype(str).isin(self.properties).to_numpy()
+        if self.bars is not None:
+            mask &= _matching(df['Bar Name'], self.matches_bar)
+        if self.alcohol_types is not None or self.brands is not None:
+            mask &= _matching(df['Item'], self.matches_item)
+        return mask
+
+    def apply(self, df):
+        """Rows of df inside the query (df itself when unrestricted)."""
+        if self.unrestricted:
+            return df
+        sliced = df[self.mask(df)].reset_index(drop=True)
+        print(f"   → Query ({self.describe()}) kept {len(sliced)} of {len(df)} rows")
+        return sliced
+
+    def restrict(self, series_index):
+        """SeriesIndex limited to the query's pairs and date window (the same index when unrestricted)."""
+        if self.start is None and self.end is None and not self.filters_pairs:
+            return series_index
+        keys = [key for key in series_index if self.matches(key)] if self.filters_pairs else None
+        return series_index.subset(keys, self.start, self.end)
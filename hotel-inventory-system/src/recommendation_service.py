@@ -0,0 +1,428 @@
+import asyncio
+import json
+from datetime import date, datetime
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .utils import load_and_prepare_data, recommendation_columns
+    from .series_index import build_series_index
+    from .forecasting import forecast_demand
+    from .par_levels import calculate_par_levels
+    from .simulation import par_arrays
+    from .data_model import ForecastTable, PairTable
+except ImportError:
+    from utils import load_and_prepare_data, recommendation_columns
+    from series_index import build_series_index
+    from forecasting import forecast_demand
+    from par_levels import calculate_par_levels
+    from simulation import par_arrays
+    from data_model import ForecastTable, PairTable
+
+MAX_BODY_BYTES = 64 * 2 ** 20
+
+
+class PayloadTooLarge(ValueError):
+    pass
+
+
+def _par_field(par_levels, keys, name):
+    if isinstance(par_levels, PairTable):
+        return par_levels.column(name, 0.0).astype(float)
+    return np.array([par_levels[key].get(name, 0.0) for key in keys], dtype=float)
+
+
+def build_par_levels(df, forecast_days=30, lead_time_days=3, service_level=0.95, backend='batched'):
+    """Forecast + par levels for df; runs in the refresh executor."""
+    forecasts = ForecastTable.from_dict(forecast_demand(df, forecast_days=forecast_days, backend=backend))
+    return calculate_par_levels(forecasts, lead_time_days=lead_time_days, service_level=service_level)
+
+
+class InventoryState:
+    """
+    In-memory per-(bar, item) state behind the recommendation service.
+
+    Closing balances and par-level fields are NumPy columns indexed through
+    a {(bar, item): row} dict, so answering one pair is a dict lookup plus a
+    one-row slice. Events update balances in place and are kept as daily
+    history rows for the next forecast refresh.
+    """
+
+    def __init__(self, keys, closing, par_level, reorder_point, avg_daily_demand, forecast_daily,
+                 history=None):
+        self._rows = {key: i for i, key in enumerate(keys)}
+        self.keys = list(keys)
+        self.columns = {
+            'closing': np.asarray(closing, dtype=float),
+            'par_level': np.asarray(par_level, dtype=float),
+            'reorder_point': np.asarray(reorder_point, dtype=float),
+            'avg_daily_demand': np.asarray(avg_daily_demand, dtype=float),
+            'forecast_daily': np.asarray(forecast_daily, dtype=float)
+        }
+        self.history = history
+        self.events = []
+        self.events_applied = 0
+        self.last_refresh = datetime.now().isoformat(timespec='seconds')
+        self._refresh_task = None
+
+    @classmethod
+    def from_pipeline(cls, df, par_levels, series_index=None):
+        """State from a prepared frame and par levels (dict or ParLevelTable)."""
+        if series_index is None:
+            series_index = build_series_index(df)
+        keys, par_level, reorder_point = par_arrays(par_levels)
+        keys = list(keys)
+        return cls(keys,
+                   series_index.latest_closings(keys, default=0),
+                   par_level,
+                   reorder_point,
+                   _par_field(par_levels, keys, 'avg_daily_demand'),
+                   _par_field(par_levels, keys, 'forecast_daily'),
+                   history=df)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def _add_pair(self, key):
+        """New pair seen in an event: zero par levels until the next refresh."""
+        self._rows[key] = len(self.keys)
+        self.keys.append(key)
+        for name, values in self.columns.items():
+            self.columns[name] = np.append(values, 0.0)
+        return self._rows[key]
+
+    def _recommend_rows(self, rows):
+        c = self.columns
+        stock = c['closing'][rows]
+        action, order_quantity, days_of_stock = recommendation_columns(
+            stock, c['par_level'][rows], c['reorder_point'][rows], c['avg_daily_demand'][rows])
+        return [{
+            'Bar Name': self.keys[row][0],
+            'Item': self.keys[row][1],
+            'Current Stock (ml)': round(float(stock[i]), 2),
+            'Par Level (ml)': round(float(c['par_level'][row]), 2),
+            'Reorder Point (ml)': round(float(c['reorder_point'][row]), 2),
+            'Avg Daily Demand (ml)': float(c['avg_daily_demand'][row]),
+            'Forecasted Daily Demand (ml)': float(c['forecast_daily'][row]),
+            'Action': str(action[i]),
+            'Order Quantity (ml)': round(float(order_quantity[i]), 2),
+            'Days of Stock': None if np.isnan(days_of_stock[i]) else float(days_of_stock[i])
+        } for i, row in enumerate(rows)]
+
+    def recommend(self, bar, item):
+        """Recommendation for one pair, or None if the pair is unknown."""
+        row = self._rows.get((bar, item))
+        if row is None:
+            return None
+        return self._recommend_rows([row])[0]
+
+    def recommend_bar(self, bar):
+        return self._recommend_rows([row for key, row in self._rows.items() if key[0] == bar])
+
+    @staticmethod
+    def _parse_event(event):
+        """Validate one event into (key, day, consumed, purchased, closing); raises ValueError."""
+        if not isinstance(event, dict):
+            raise ValueError(f"each event must be a JSON object, got {type(event).__name__}")
+        key = (event.get('bar'), event.get('item'))
+        if not all(isinstance(name, str) for name in key):
+            raise ValueError("each event needs string 'bar' and 'item'")
+        amounts = {}
+        for name in ('consumed', 'purchased', 'closing'):
+            value = event.get(name)
+            if value is None:
+                amounts[name] = None
+                continue
+            try:
+                amounts[name] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"'{name}' must be a number, got {value!r}") from None
+            if not np.isfinite(amounts[name]):
+                raise ValueError(f"'{name}' must be finite, got {value!r}")
+        raw_date = event.get('date') or date.today().isoformat()
+        try:
+            if not isinstance(raw_date, str):
+                raise TypeError
+            day = pd.Timestamp(raw_date)
+            if pd.isna(day):
+                raise ValueError
+        except (TypeError, ValueError):
+            raise ValueError(f"'date' must be an ISO date, got {raw_date!r}") from None
+        if day.tz is not None:
+            day = day.tz_convert(None)
+        return key, day.normalize(), amounts['consumed'] or 0.0, amounts['purchased'] or 0.0, amounts['closing']
+
+    def apply_events(self, events):
+        """
+        Apply a batch of events all-or-nothing: every event is validated
+        before any balance changes, so one bad event rejects the batch with
+        ValueError. Returns the number applied.
+        """
+        parsed = [self._parse_event(event) for event in events]
+        for key, day, consumed, purchased, absolute in parsed:
+            row = self._rows.get(key)
+            if row is None:
+                row = self._add_pair(key)
+            closing = self.columns['closing']
+            if absolute is not None:
+                closing[row] = absolute
+            else:
+                closing[row] = max(closing[row] + purchased - consumed, 0.0)
+            self.events.append((key, day, consumed, closing[row]))
+        self.events_applied += len(parsed)
+        return len(parsed)
+
+    def apply_event(self, event):
+        """
+        Apply one consumption/purchase event.
+
+        event: {'bar', 'item', 'consumed' (ml), 'purchased' (ml), optional
+        'closing' (ml, an absolute stock count that overrides the running
+        balance) and optional ISO 'date' (default today)}. Invalid events
+        raise ValueError and leave the state unchanged.
+        """
+        self.apply_events([event])
+
+    def history_frame(self):
+        """Loaded history plus events since startup, in the prepared-frame layout."""
+        if not self.events:
+            return self.history
+        events = pd.DataFrame(self.events, columns=['key', 'Date', 'Consumed (ml)', 'Closing Balance (ml)'])
+        events['Bar Name'] = [key[0] for key in events['key']]
+        events['Item'] = [key[1] for key in events['key']]
+        events['Date'] = pd.to_datetime(events['Date']).dt.normalize()
+        events['Day'] = events['Date']
+        events = events.drop(columns='key')
+        if self.history is None:
+            return events
+        history = self.history[[c for c in events.columns if c in self.history.columns]]
+        for col in ('Bar Name', 'Item'):
+            history = history.assign(**{col: history[col].astype(object)})
+        return pd.concat([history, events], ignore_index=True)
+
+    def update_par_levels(self, par_levels):
+        """Swap in refreshed par levels; balances and unseen pairs are kept."""
+        keys, par_level, reorder_point = par_arrays(par_levels)
+        fields = {
+            'par_level': par_level,
+            'reorder_point': reorder_point,
+            'avg_daily_demand': _par_field(par_levels, keys, 'avg_daily_demand'),
+            'forecast_daily': _par_field(par_levels, keys, 'forecast_daily')
+        }
+        rows = np.array([self._rows.get(key, -1) for key in keys], dtype=int)
+        for i, key in enumerate(keys):
+            if rows[i] < 0:
+                rows[i] = self._add_pair(key)
+        for name, values in fields.items():
+            self.columns[name][rows] = values
+        self.last_refresh = datetime.now().isoformat(timespec='seconds')
+
+    async def refresh(self, executor=None, **settings):
+        """
+        Recompute forecasts and par levels in executor without blocking lookups.
+
+        Returns False if a refresh is already running.
+        """
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return False
+        loop = asyncio.get_running_loop()
+        frame = self.history_frame()
+        future = loop.run_in_executor(executor, lambda: build_par_levels(frame, **settings))
+        self._refresh_task = asyncio.ensure_future(future)
+        par_levels = await self._refresh_task
+        self.update_par_levels(par_levels)
+        return True
+
+    @property
+    def refreshing(self):
+        return self._refresh_task is not None and not self._refresh_task.done()
+
+
+def _response(status, payload):
+    body = json.dumps(payload).encode('utf-8')
+    reason = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found',
+              405: 'Method Not Allowed', 413: 'Payload Too Large'}[status]
+    return (f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode('ascii') + body
+
+
+def _chunked(headers):
+    return headers.get('transfer-encoding', '').lower() == 'chunked'
+
+
+async def _body_lines(reader, headers):
+    """
+    Yield body lines as they arrive (Content-Length or chunked transfer encoding).
+
+    Bodies over MAX_BODY_BYTES raise PayloadTooLarge, chunked ones as soon
+    as the running total passes the limit.
+    """
+    buffer = b''
+    if _chunked(headers):
+        received = 0
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+            if size == 0:
+                await reader.readline()
+                break
+            received += size
+            if received > MAX_BODY_BYTES:
+                raise PayloadTooLarge(f'body over {MAX_BODY_BYTES} bytes')
+            buffer += await reader.readexactly(size)
+            await reader.readexactly(2)
+            *lines, buffer = buffer.split(b'\n')
+            for line in lines:
+                yield line
+    else:
+        length = int(headers.get('content-length', 0))
+        if length > MAX_BODY_BYTES:
+            raise PayloadTooLarge(f'body over {MAX_BODY_BYTES} bytes')
+        buffer = await reader.readexactly(length)
+    for line in buffer.split(b'\n'):
+        yield line
+
+
+class RecommendationServer:
+    """
+    Minimal asyncio HTTP/1.1 front end for an InventoryState.
+
+    GET  /recommendation?bar=..&item=..   one pair
+    GET  /recommendations?bar=..          every item at a bar
+    POST /events                          JSON event, JSON list, or NDJSON stream (all-or-nothing)
+    POST /refresh                         start a background forecast refresh
+    GET  /health                          pair count, events, refresh status
+    """
+
+    def __init__(self, state, executor=None, refresh_settings=None):
+        self.state = state
+        self.executor = executor
+        self.refresh_settings = refresh_settings or {}
+        self._background = set()
+
+    def _start_refresh(self):
+        if self.state.refreshing:
+            return False
+        task = asyncio.ensure_future(self.state.refresh(self.executor, **self.refresh_settings))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return True
+
+    async def _events(self, reader, headers):
+        # The whole body is parsed before anything is applied, so a bad event rejects the request as a unit
+        events = []
+        async for line in _body_lines(reader, headers):
+            line = line.strip()
+            if not line:
+                continue
+            payload = json.loads(line)
+            events.extend(payload if isinstance(payload, list) else [payload])
+        return self.state.apply_events(events)
+
+    async def _dispatch(self, method, target, reader, headers):
+        url = urlsplit(target)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == '/recommendation' and method == 'GET':
+            if 'bar' not in query or 'item' not in query:
+                return 400, {'error': 'bar and item are required'}
+            rec = self.state.recommend(query['bar'], query['item'])
+            return (200, rec) if rec is not None else (404, {'error': 'unknown bar/item'})
+        if url.path == '/recommendations' and method == 'GET':
+            if 'bar' not in query:
+                return 400, {'error': 'bar is required'}
+            return 200, self.state.recommend_bar(query['bar'])
+        if url.path == '/events' and method == 'POST':
+            return 200, {'applied': await self._events(reader, headers)}
+        if url.path == '/refresh' and method == 'POST':
+            return 202, {'started': self._start_refresh()}
+        if url.path == '/health' and method == 'GET':
+            return 200, {'pairs': len(self.state), 'events_applied': self.state.events_applied,
+                         'last_refresh': self.state.last_refresh, 'refreshing': self.state.refreshing}
+        if url.path in ('/recommendation', '/recommendations', '/events', '/refresh', '/health'):
+            return 405, {'error': f'{method} not allowed'}
+        return 404, {'error': 'not found'}
+
+    async def handle(self, reader, writer):
+        """Serve requests on one keep-alive connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                parts = request_line.decode('latin-1').split(' ', 2)
+                if len(parts) != 3:
+                    # Without a request line the rest of the stream cannot be framed
+                    writer.write(_response(400, {'error': 'malformed request line'}))
+                    await writer.drain()
+                    break
+                method, target, _ = parts
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                close = headers.get('connection', '').lower() == 'close'
+                try:
+                    status, payload = await self._dispatch(method, target, reader, headers)
+                except PayloadTooLarge as e:
+                    status, payload = 413, {'error': str(e)}
+                except (KeyError, ValueError, TypeError) as e:
+                    status, payload = 400, {'error': str(e)}
+                if status in (400, 413) and (_chunked(headers) or headers.get('content-length', '0') != '0'):
+                    # Part of the body may be unread; it must not be parsed as the next request
+                    close = True
+                writer.write(_response(status, payload))
+                await writer.drain()
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8080, path=None):
+        """Listen on host:port, or on a Unix socket when path is given."""
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path=path)
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def serve(state, host='127.0.0.1', port=8080, path=None, refresh_every_seconds=None,
+                executor=None, refresh_settings=None):
+    """Run the service until cancelled, optionally refreshing forecasts on a timer."""
+    app = RecommendationServer(state, executor, refresh_settings)
+    server = await app.start(host, port, path)
+    print(f"   ✓ Serving recommendations for {len(state)} pairs on "
+          f"{path or f'http://{host}:{port}'}")
+    async with server:
+        if refresh_every_seconds:
+            while True:
+                await asyncio.sleep(refresh_every_seconds)
+                app._start_refresh()
+        await server.serve_forever()
+
+
+def main():
+    # Configuration
+    DATA_FILE = 'hotel_bar_inventory.csv'
+    DATA_CACHE_DIR = '.cache'
+    HOST, PORT = '127.0.0.1', 8080
+    SOCKET_PATH = None  # e.g. '/tmp/inventory.sock' to serve on a Unix socket instead
+    REFRESH_EVERY_SECONDS = 3600
+    REFRESH_SETTINGS = {'forecast_days': 30, 'lead_time_days': 3, 'service_level': 0.95,
+                        'backend': 'batched'}
+
+    df = load_and_prepare_data(DATA_FILE, cache_dir=DATA_CACHE_DIR)
+    state = InventoryState.from_pipeline(df, build_par_levels(df, **REFRESH_SETTINGS))
+    asyncio.run(serve(state, HOST, PORT, SOCKET_PATH, REFRESH_EVERY_SECONDS,
+                      refresh_settings=REFRESH_SETTINGS))
+
+
+if __name__ == '__main__':
+    main()
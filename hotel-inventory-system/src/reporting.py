@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .data_model import PairTable
+    from .simulation import par_arrays
+except ImportError:
+    from data_model import PairTable
+    from simulation import par_arrays
+
+RENDER_VERSION = 1
+CHART_DIR = 'charts'
+MANIFEST = 'manifest.json'
+HISTORY_DAYS = 90  # Days of history shown before the forecast band
+BAND_Z = 1.96  # Forecast band of +/- BAND_Z daily standard deviations
+TOP_N = 10
+STOCK_ROWS = 25  # Items per bar shown against par, lowest stock-to-par ratio first
+DPI = 100
+
+TOP_BARS_FILE = 'inventory_analysis_top_bars.png'
+URGENT_ITEMS_FILE = 'inventory_analysis_urgent_items.png'
+
+
+def chart_slug(name):
+    """File-name-safe form of a bar or item name, suffixed with a short hash so distinct names never collide."""
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', str(name)).strip('_').lower() or 'unnamed'
+    return f"{slug}-{hashlib.sha1(str(name).encode('utf-8')).hexdigest()[:6]}"
+
+
+def _field(par_levels, keys, name):
+    if isinstance(par_levels, PairTable):
+        return par_levels.column(name, 0.0).astype(float)
+    return np.array([par_levels[key].get(name, 0.0) for key in keys], dtype=float)
+
+
+def _grouped(codes, n_groups, values):
+    """Sum rows of values (1-d or 2-d) into n_groups by codes."""
+    out = np.zeros((n_groups,) + values.shape[1:])
+    np.add.at(out, codes, values)
+    return out
+
+
+def build_chart_specs(series_index, par_levels, rec_df=None, history_days=HISTORY_DAYS, forecast_days=30):
+    """
+    Everything the report draws, computed in one pass over the series index.
+
+    One dense matrix of recent daily consumption is summed per bar and per
+    item; forecasts, spreads, par levels and current stock come from
+    par_levels and the index. Returns a list of chart specs
+    {'file', 'kind', 'data'}: one 'bar' chart per bar (consumption trend
+    with forecast band, par level vs stock for the STOCK_ROWS items with
+    the least stock relative to par), one 'item' chart per
+    item across bars, and the two summary charts (top bars, items most
+    often needing an order).
+    """
+    all_keys, par_level, reorder_point = par_arrays(par_levels)
+    keep = np.array([key in series_index for key in all_keys], dtype=bool)
+    keys = [key for key, k in zip(all_keys, keep) if k]
+    if not keys:
+        return []
+    par_level, reorder_point = par_level[keep], reorder_point[keep]
+    forecast = _field(par_levels, all_keys, 'forecast_daily')[keep]
+    spread = _field(par_levels, all_keys, 'std_daily')[keep]
+    stock = series_index.latest_closings(keys)
+    cover = stock / np.maximum(par_level, 1e-9)
+
+    days = series_index.days[-history_days:]
+    consumed, _ = series_index.window_matrix(keys, days[0])
+    totals = np.array([series_index[key].consumed.sum() for key in keys])
+    bar_codes, bars = pd.factorize(pd.Series([key[0] for key in keys], dtype=object), sort=True)
+    item_codes, items = pd.factorize(pd.Series([key[1] for key in keys], dtype=object), sort=True)
+
+    specs = []
+    for codes, names, kind in ((bar_codes, bars, 'bar'), (item_codes, items, 'item')):
+        n = len(names)
+        trend = _grouped(codes, n, consumed)
+        mean = _grouped(codes, n, forecast)
+        # Pair forecasts treated as independent: variances add
+        std = np.sqrt(_grouped(codes, n, spread ** 2))
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(n + 1))
+        for g, name in enumerate(names):
+            data = {'title': str(name), 'days': days, 'consumption': trend[g],
+                    'forecast': float(mean[g]), 'std': float(std[g]), 'forecast_days': forecast_days}
+            if kind == 'bar':
+                rows = order[bounds[g]:bounds[g + 1]]
+                rows = rows[np.argsort(cover[rows], kind='stable')[:STOCK_ROWS]]
+                data.update(labels=[keys[i][1] for i in rows], par=par_level[rows],
+                            reorder=reorder_point[rows], stock=stock[rows])
+            specs.append({'file': os.path.join(CHART_DIR, f"{kind}_{chart_slug(name)}.png"),
+                          'kind': kind, 'data': data})
+
+    bar_totals = _grouped(bar_codes, len(bars), totals)
+    top = np.argsort(-bar_totals, kind='stable')[:TOP_N]
+    specs.append({'file': TOP_BARS_FILE, 'kind': 'ranking',
+                  'data': {'title': f'Top {TOP_N} Bars by Consumption (ml)',
+                           'labels': [str(bars[i]) for i in top], 'values': bar_totals[top]}})
+    if rec_df is not None and not rec_df.empty:
+        urgent = rec_df.loc[rec_df['Action'] == 'ORDER NOW', 'Item'].value_counts().head(TOP_N)
+        if not urgent.empty:
+            specs.append({'file': URGENT_ITEMS_FILE, 'kind': 'ranking',
+                          'data': {'title': 'Top Items Needing Immediate Orders',
+                                   'labels': [str(i) for i in urgent.index],
+                                   'values': urgent.to_numpy(dtype=float)}})
+    return specs
+
+
+def chart_hash(spec):
+    """Digest of a chart's kind and data; equal digests render identical images."""
+    digest = hashlib.sha1(f"{RENDER_VERSION}:{spec['kind']}".encode('utf-8'))
+    for name in sorted(spec['data']):
+        value = spec['data'][name]
+        digest.update(name.encode('utf-8'))
+        if isinstance(value, np.ndarray):
+            digest.update(f"{value.dtype}{value.shape}".encode('utf-8'))
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(json.dumps(value, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _draw_trend(ax, data):
+    from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+
+    days = data['days']
+    ax.plot(days, data['consumption'], color='#4c72b0', linewidth=1, label='Daily consumption')
+    if len(days):
+        ahead = days[-1] + np.arange(1, data['forecast_days'] + 1)
+        low = max(data['forecast'] - BAND_Z * data['std'], 0.0)
+        high = data['forecast'] + BAND_Z * data['std']
+        ax.fill_between(ahead, low, high, color='#dd8452', alpha=0.3, linewidth=0)
+        ax.plot(ahead, np.full(len(ahead), data['forecast']), color='#dd8452', label='Forecast')
+    locator = AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+    ax.set_ylabel('ml per day')
+    ax.legend(loc='upper left', fontsize='small')
+
+
+def _draw(spec, path):
+    """Render one chart with the Agg canvas directly: no pyplot state, no GUI backend, no seaborn."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    data = spec['data']
+    if spec['kind'] == 'bar':
+        fig = Figure(figsize=(10, 4 + 0.25 * len(data['labels'])))
+        trend_ax, stock_ax = fig.subplots(2, 1, gridspec_kw={'height_ratios': [2, max(1, len(data['labels']) / 8)]})
+        fig.subplots_adjust(left=0.25, right=0.97, top=0.95, bottom=0.06, hspace=0.25)
+        _draw_trend(trend_ax, data)
+        trend_ax.set_title(data['title'])
+        rows = np.arange(len(data['labels']))
+        stock_ax.barh(rows - 0.2, data['par'], height=0.4, color='#55a868', label='Par level')
+        stock_ax.barh(rows + 0.2, data['stock'], height=0.4, color='#4c72b0', label='Current stock')
+        stock_ax.scatter(data['reorder'], rows, marker='|', color='#c44e52', s=120, label='Reorder point')
+        stock_ax.set_yticks(rows)
+        stock_ax.set_yticklabels(data['labels'], fontsize='small')
+        stock_ax.invert_yaxis()
+        stock_ax.set_xlabel('ml')
+        stock_ax.legend(loc='lower right', fontsize='small')
+    elif spec['kind'] == 'item':
+        fig = Figure(figsize=(10, 4))
+        ax = fig.subplots()
+        fig.subplots_adjust(left=0.1, right=0.97, top=0.9, bottom=0.1)
+        _draw_trend(ax, data)
+        ax.set_title(data['title'])
+    else:
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
+        fig.subplots_adjust(left=0.3, right=0.97, top=0.93, bottom=0.08)
+        rows = np.arange(len(data['labels']))
+        ax.barh(rows, data['values'], color='#4c72b0')
+        ax.set_yticks(rows)
+        ax.set_yticklabels(data['labels'])
+        ax.invert_yaxis()
+        ax.set_title(data['title'])
+    # Fixed margins instead of tight_layout, which draws every figure twice
+    FigureCanvasAgg(fig)
+    tmp_path = path + '.tmp'
+    fig.savefig(tmp_path, dpi=DPI, format='png')
+    os.replace(tmp_path, path)
+
+
+def _render_chunk(jobs):
+    """Render [(spec, path), ...] in one worker; returns seconds spent."""
+    start = time.perf_counter()
+    for spec, path in jobs:
+        _draw(spec, path)
+    return time.perf_counter() - start
+
+
+def _load_manifest(path):
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get('version') == RENDER_VERSION else {}
+
+
+def render_charts(specs, output_dir='.', n_jobs=None, force=False):
+    """
+    Render chart specs under output_dir, skipping charts whose data hash
+    matches the last run (recorded in charts/manifest.json) and whose file
+    still exists. The rest are rendered across n_jobs processes (None: one
+    per core). Returns {'charts', 'rendered', 'skipped', 'seconds'}.
+    """
+    manifest_path = os.path.join(output_dir, CHART_DIR, MANIFEST)
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    previous = _load_manifest(manifest_path).get('charts', {})
+
+    start = time.perf_counter()
+    hashes, jobs = {}, []
+    for spec in specs:
+        path = os.path.join(output_dir, spec['file'])
+        hashes[spec['file']] = chart_hash(spec)
+        if force or previous.get(spec['file']) != hashes[spec['file']] or not os.path.exists(path):
+            jobs.append((spec, path))
+
+    n_workers = min(n_jobs or os.cpu_count() or 1, len(jobs))
+    if n_workers > 1:
+        # A few chunks per worker keeps the pool busy when chart sizes differ
+        chunk_size = max(1, -(-len(jobs) // (n_workers * 4)))
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            list(executor.map(_render_chunk, chunks))
+    elif jobs:
+        _render_chunk(jobs)
+
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump({'version': RENDER_VERSION, 'charts': hashes}, f, indent=1, sort_keys=True)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    stats = {'charts': len(specs), 'rendered': len(jobs), 'skipped': len(specs) - len(jobs),
+             'seconds': time.perf_counter() - start}
+    print(f"   → Rendered {stats['rendered']} of {stats['charts']} charts "
+          f"({stats['skipped']} unchanged) in {stats['seconds']:.2f}s"
+          + (f" across {n_workers} workers" if n_workers > 1 else ""))
+    return stats
+
+
+def render_report(series_index, par_levels, rec_df=None, output_dir='.', n_jobs=None, forecast_days=30,
+                  history_days=HISTORY_DAYS, force=False):
+    """
+    Reporting stage: per-bar and per-item charts plus the summary charts.
+
+    Aggregates come from build_chart_specs in one pass; rendering uses the
+    headless Agg canvas in a process pool and skips unchanged charts
+    (see render_charts). Returns the render stats.
+    """
+    print("\n[7/7] Rendering charts...")
+    specs = build_chart_specs(series_index, par_levels, rec_df, history_days=history_days,
+                              forecast_days=forecast_days)
+    return render_charts(specs, output_dir, n_jobs=n_jobs, force=force)
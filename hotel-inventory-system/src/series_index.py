@@ -0,0 +1,203 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Day-sorted daily view of one (Bar Name, Item) pair
+PairSeries = namedtuple('PairSeries', ['days', 'consumed', 'closing'])
+
+
+def as_days(values):
+    """Dates, Timestamps, datetime64 values or ISO strings as a datetime64[D] array."""
+    values = np.asarray(values)
+    if values.dtype.kind != 'M':
+        values = pd.to_datetime(values).to_numpy()
+    return values.astype('datetime64[D]')
+
+
+class SeriesIndex:
+    """
+    Per-pair daily series, built once from the prepared DataFrame.
+
+    All pairs share three contiguous arrays (days, daily consumption, last
+    closing balance of the day) sorted by pair then day; each pair maps to a
+    (start, stop) slice, so looking a pair up is O(1) and returns views
+    instead of re-filtering the full frame. Days are datetime64[D].
+    """
+
+    def __init__(self, keys, starts, stops, days, consumed, closing):
+        self._slices = {key: (start, stop) for key, start, stop in zip(keys, starts, stops)}
+        self._days = days
+        self._consumed = consumed
+        self._closing = closing
+        # Hash-based codes over the integer day ordinals
+        codes, uniques = pd.factorize(days.view(np.int64), sort=True)
+        self.days = np.asarray(uniques, dtype=np.int64).view('datetime64[D]')
+        self._day_positions = codes
+
+    @classmethod
+    def from_frame(cls, df, fill_missing_days=True):
+        """
+        Aggregate df into daily per-pair series with a single groupby.
+
+        With fill_missing_days, each pair's series runs over every calendar
+        day from its first to its last record: days without a record get
+        zero consumption and carry the previous closing balance forward, so
+        forecasting never treats the days either side of a gap as adjacent.
+        """
+        frame = df[['Bar Name', 'Item', 'Consumed (ml)']].copy()
+        frame['Day'] = as_days(df['Day'])
+        if 'Closing Balance (ml)' in df.columns:
+            frame['Closing Balance (ml)'] = df['Closing Balance (ml)']
+        else:
+            frame['Closing Balance (ml)'] = 0.0
+
+        daily = frame.groupby(['Bar Name', 'Item', 'Day'], sort=True, observed=True).agg(
+            consumed=('Consumed (ml)', 'sum'),
+            closing=('Closing Balance (ml)', 'last')
+        ).reset_index()
+
+        bars = daily['Bar Name'].to_numpy(dtype=object)
+        items = daily['Item'].to_numpy(dtype=object)
+        n = len(daily)
+        change = np.ones(n, dtype=bool)
+        if n > 1:
+            change[1:] = (bars[1:] != bars[:-1]) | (items[1:] != items[:-1])
+        starts = np.flatnonzero(change)
+        stops = np.append(starts[1:], n)
+        keys = list(zip(bars[starts], items[starts]))
+
+        days = daily['Day'].to_numpy().astype('datetime64[D]')
+        consumed = daily['consumed'].to_numpy(dtype=float)
+        closing = daily['closing'].fillna(0).to_numpy(dtype=float)
+        if fill_missing_days and n:
+            starts, stops, days, consumed, closing = _fill_missing_days(starts, stops, days, consumed, closing)
+        return cls(keys, starts, stops, days, consumed, closing)
+
+    def __len__(self):
+        return len(self._slices)
+
+    def __contains__(self, key):
+        return key in self._slices
+
+    def __iter__(self):
+        return iter(self._slices)
+
+    def __getitem__(self, key):
+        start, stop = self._slices[key]
+        return PairSeries(self._days[start:stop],
+                          self._consumed[start:stop],
+                          self._closing[start:stop])
+
+    def since(self, key, start_day):
+        """Series for key restricted to days >= start_day."""
+        start, stop = self._slices[key]
+        offset = np.searchsorted(self._days[start:stop], self._as_day(start_day), side='left')
+        return PairSeries(self._days[start + offset:stop],
+                          self._consumed[start + offset:stop],
+                          self._closing[start + offset:stop])
+
+    @staticmethod
+    def _as_day(value):
+        """A date-like value as a datetime64[D] scalar (None stays None)."""
+        if value is None:
+            return None
+        return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+    def subset(self, keys=None, start=None, end=None):
+        """
+        New index over only keys (every pair if None) and days in [start, end].
+
+        The selected rows are gathered from the shared arrays in one pass;
+        pairs with no days left in the window are dropped.
+        """
+        if keys is None:
+            keys = list(self._slices)
+        start, end = self._as_day(start), self._as_day(end)
+        kept, bounds = [], []
+        for key in keys:
+            if key not in self._slices:
+                continue
+            first, stop = self._slices[key]
+            days = self._days[first:stop]
+            lo = first + int(np.searchsorted(days, start, side='left')) if start is not None else first
+            hi = first + int(np.searchsorted(days, end, side='right')) if end is not None else stop
+            if hi > lo:
+                kept.append(key)
+                bounds.append((lo, hi))
+
+        bounds = np.array(bounds, dtype=int).reshape(-1, 2)
+        lengths = bounds[:, 1] - bounds[:, 0]
+        stops = np.cumsum(lengths)
+        starts = stops - lengths
+        positions = np.repeat(bounds[:, 0] - starts, lengths) + np.arange(stops[-1] if len(stops) else 0)
+        return SeriesIndex(kept, starts, stops, self._days[positions],
+                           self._consumed[positions], self._closing[positions])
+
+    def window_matrix(self, keys, start_day):
+        """
+        Dense daily consumption for keys over every index day >= start_day.
+
+        Returns (consumed, present): two (len(keys), n_days) arrays, where
+        present marks the days on which the pair actually has data (absent
+        days hold 0 consumption). Keys missing from the index get empty rows.
+        """
+        first = int(np.searchsorted(self.days, self._as_day(start_day), side='left'))
+        n_days = len(self.days) - first
+        consumed = np.zeros((len(keys), n_days))
+        present = np.zeros((len(keys), n_days), dtype=bool)
+
+        bounds = np.array([self._slices.get(key, (0, 0)) for key in keys], dtype=int).reshape(-1, 2)
+        lengths = bounds[:, 1] - bounds[:, 0]
+        rows = np.repeat(np.arange(len(keys)), lengths)
+        # Flat positions of every selected pair's rows in the shared arrays
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.repeat(bounds[:, 0], lengths) + offsets
+        cols = self._day_positions[positions] - first
+        keep = cols >= 0
+        flat = rows[keep] * n_days + cols[keep]
+        consumed.ravel()[flat] = self._consumed[positions[keep]]
+        present.ravel()[flat] = True
+        return consumed, present
+
+    def latest_closing(self, key, default=0.0):
+        """Closing balance recorded on the pair's most recent day."""
+        if key not in self._slices:
+            return default
+        start, stop = self._slices[key]
+        return self._closing[stop - 1]
+
+    def latest_closings(self, keys, default=0.0):
+        """latest_closing for many keys at once, as an array aligned with keys."""
+        stops = np.array([self._slices.get(key, (0, 0))[1] for key in keys], dtype=int)
+        found = stops > 0
+        out = np.full(len(keys), default, dtype=float)
+        out[found] = self._closing[stops[found] - 1]
+        return out
+
+
+def _fill_missing_days(starts, stops, days, consumed, closing):
+    """Reindex day-sorted per-pair arrays onto each pair's full calendar span."""
+    ordinals = days.view(np.int64)
+    first, last = ordinals[starts], ordinals[stops - 1]
+    spans = last - first + 1
+    new_stops = np.cumsum(spans)
+    new_starts = new_stops - spans
+    pair = np.repeat(np.arange(len(starts)), stops - starts)
+    target = new_starts[pair] + (ordinals - first[pair])
+
+    total = int(new_stops[-1])
+    filled_consumed = np.zeros(total)
+    filled_consumed[target] = consumed
+    # Each gap day takes the closing balance of the last recorded day before it;
+    # every pair's first day is recorded, so the running max never crosses pairs
+    source = np.full(total, -1, dtype=np.int64)
+    source[target] = np.arange(len(target))
+    np.maximum.accumulate(source, out=source)
+    filled_days = (np.arange(total) - np.repeat(new_starts - first, spans)).view('datetime64[D]')
+    return new_starts, new_stops, filled_days, filled_consumed, closing[source]
+
+
+def build_series_index(df, fill_missing_days=True):
+    """Build the shared SeriesIndex once after load_and_prepare_data."""
+    return SeriesIndex.from_frame(df, fill_missing_days=fill_missing_days)
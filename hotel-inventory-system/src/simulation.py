@@ -1,24 +1,129 @@
 # filepath: /hotel-inventory-system/hotel-inventory-system/src/simulation.py
+import numpy as np
 import pandas as pd
 
-def simulate_inventory_system(df, forecasts, par_levels, simulation_days=30):
+try:
+    from .series_index import build_series_index
+    from .data_model import PairTable
+except ImportError:
+    from series_index import build_series_index
+    from data_model import PairTable
+
+SIMULATION_ENGINES = ('vectorized', 'loop')
+
+
+def simulate_inventory_system(df, forecasts, par_levels, simulation_days=30, series_index=None,
+                              engine='vectorized', query=None):
     """
     Simulate the inventory management system
     Shows how the system would perform with recommended par levels
+
+    engine='vectorized' advances every pair one day at a time as a NumPy
+    vector; engine='loop' is the original per-pair, per-day reference
+    implementation. Both produce the same results.
+
+    query (an InventoryQuery) limits the simulation to the pairs it
+    matches, over the last simulation_days of its date window.
     """
+    if engine not in SIMULATION_ENGINES:
+        raise ValueError(f"Unknown simulation engine: {engine!r}")
+
     print(f"\n[5/6] Running simulation for {simulation_days} days...")
 
+    if series_index is None:
+        series_index = build_series_index(df if query is None else query.apply(df))
+    if query is not None:
+        series_index = query.restrict(series_index)
+
     # Use last 30 days for simulation
-    df_sorted = df.sort_values('Day')
-    unique_days = sorted(df_sorted['Day'].unique())
+    unique_days = series_index.days
 
     if len(unique_days) < simulation_days:
         simulation_days = len(unique_days)
         print(f"   → Adjusted simulation period to {simulation_days} days (available data)")
 
     simulation_start = unique_days[-simulation_days]
-    simulation_data = df_sorted[df_sorted['Day'] >= simulation_start].copy()
 
+    if engine == 'vectorized':
+        results_df, stockout_count, total_transactions = _simulate_vectorized(
+            par_levels, series_index, simulation_start)
+    else:
+        results_df, stockout_count, total_transactions = _simulate_loop(
+            par_levels, series_index, simulation_start)
+
+    # Calculate overall metrics
+    service_level_achieved = 1 - (stockout_count / total_transactions) if total_transactions > 0 else 1
+
+    print(f"\n   Simulation Results:")
+    print(f"   → Total transactions simulated: {total_transactions}")
+    print(f"   → Stockouts occurred: {stockout_count}")
+    print(f"   → Service level achieved: {service_level_achieved*100:.2f}%")
+    print(f"   → Items with stockouts: {(results_df['Stockouts'] > 0).sum()}")
+    print(f"   ✓ Simulation complete")
+
+    return results_df, service_level_achieved
+
+
+RESULT_COLUMNS = ['Bar Name', 'Item', 'Days Simulated', 'Stockouts', 'Stockout Rate',
+                  'Final Inventory', 'Par Level']
+
+
+def par_arrays(par_levels):
+    """(keys, par level array, reorder point array) from a par-level dict or ParLevelTable."""
+    if isinstance(par_levels, PairTable):
+        return (par_levels.keys(), par_levels.columns['par_level_ml'],
+                par_levels.columns['reorder_point_ml'])
+    keys = list(par_levels)
+    par = np.array([par_levels[key]['par_level_ml'] for key in keys])
+    reorder = np.array([par_levels[key]['reorder_point_ml'] for key in keys])
+    return keys, par, reorder
+
+
+def _simulate_vectorized(par_levels, series_index, simulation_start):
+    """All pairs at once: one masked NumPy step per simulated day."""
+    keys, par_level, reorder_point = par_arrays(par_levels)
+    consumed, present = series_index.window_matrix(keys, simulation_start)
+
+    # Pairs without data in the window are not simulated
+    simulated = present.any(axis=1)
+    keys = [key for key, keep in zip(keys, simulated) if keep]
+    consumed, present = consumed[simulated], present[simulated]
+    par_level, reorder_point = par_level[simulated], reorder_point[simulated]
+
+    # Initialize inventory at par level
+    current_inventory = par_level.astype(float)
+    stockouts = np.zeros(len(keys), dtype=np.int64)
+
+    # Day-major copies so each step reads contiguous memory
+    consumed_by_day = np.ascontiguousarray(consumed.T)
+    present_by_day = np.ascontiguousarray(present.T)
+
+    for consumption, active in zip(consumed_by_day, present_by_day):
+        # A stockout empties the shelf; otherwise demand is fulfilled.
+        # Days without data carry zero consumption, so subtracting is a no-op there.
+        short = current_inventory < consumption
+        stockouts += short
+        current_inventory -= consumption
+        current_inventory[short] = 0
+
+        # Reorder if below reorder point
+        np.copyto(current_inventory, par_level, where=active & (current_inventory <= reorder_point))
+
+    days_simulated = present.sum(axis=1)
+    results_df = pd.DataFrame({
+        'Bar Name': [key[0] for key in keys],
+        'Item': [key[1] for key in keys],
+        'Days Simulated': days_simulated,
+        'Stockouts': stockouts,
+        'Stockout Rate': stockouts / days_simulated,
+        'Final Inventory': np.round(current_inventory, 2),
+        'Par Level': np.round(par_level, 2)
+    }, columns=RESULT_COLUMNS)
+    return results_df, int(stockouts.sum()), int(days_simulated.sum())
+
+
+def _simulate_loop(par_levels, series_index, simulation_start):
+    """Reference implementation: one pair, one day at a time."""
     # Initialize metrics
     stockout_count = 0
     total_transactions = 0
@@ -28,13 +133,13 @@ def simulate_inventory_system(df, forecasts, par_levels, simulation_days=30):
 
     # Simulate for each bar-item combination
     for (bar, item), par_info in par_levels.items():
-        # Get actual consumption during simulation period
-        actual_data = simulation_data[
-            (simulation_data['Bar Name'] == bar) & 
-            (simulation_data['Item'] == item)
-        ]
+        if (bar, item) not in series_index:
+            continue
+
+        # Get actual daily consumption during simulation period
+        daily_actual = series_index.since((bar, item), simulation_start).consumed
 
-        if len(actual_data) == 0:
+        if len(daily_actual) == 0:
             continue
 
         # Initialize inventory at par level
@@ -42,12 +147,10 @@ def simulate_inventory_system(df, forecasts, par_levels, simulation_days=30):
         par_level = par_info['par_level_ml']
         reorder_point = par_info['reorder_point_ml']
 
-        daily_actual = actual_data.groupby('Day')['Consumed (ml)'].sum()
-
         stockouts = 0
         days_simulated = 0
 
-        for day, consumption in daily_actual.items():
+        for consumption in daily_actual:
             days_simulated += 1
 
             # Check if we can fulfill demand
@@ -81,16 +184,5 @@ def simulate_inventory_system(df, forecasts, par_levels, simulation_days=30):
             'Par Level': round(par_level, 2)
         })
 
-    results_df = pd.DataFrame(results)
-
-    # Calculate overall metrics
-    service_level_achieved = 1 - (stockout_count / total_transactions) if total_transactions > 0 else 1
-
-    print(f"\n   Simulation Results:")
-    print(f"   → Total transactions simulated: {total_transactions}")
-    print(f"   → Stockouts occurred: {stockout_count}")
-    print(f"   → Service level achieved: {service_level_achieved*100:.2f}%")
-    print(f"   → Items with stockouts: {(results_df['Stockouts'] > 0).sum()}")
-    print(f"   ✓ Simulation complete")
-
-    return results_df, service_level_achieved
\ No newline at end of file
+    results_df = pd.DataFrame(results, columns=RESULT_COLUMNS)
+    return results_df, stockout_count, total_transactions
\ No newline at end of file
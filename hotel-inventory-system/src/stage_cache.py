@@ -0,0 +1,117 @@
+import functools
+import glob
+import hashlib
+import json
+import os
+import pickle
+
+DEFAULT_MAX_BYTES = 512 * 2 ** 20
+CACHE_VERSION = 2
+# Pipeline modules whose source is part of every key
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@functools.lru_cache(maxsize=None)
+def source_digest(directory=SOURCE_DIR):
+    """Digest of every module's source in directory, computed once per process."""
+    digest = hashlib.sha1()
+    for path in sorted(glob.glob(os.path.join(directory, '*.py'))):
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def stage_key(stage, params=None, *upstream):
+    """
+    Content address of a stage output: its name, parameters, the keys of
+    the inputs it was computed from (upstream stage keys or data digests)
+    and the pipeline source, so an edited forecasting, par-level or
+    simulation module never serves results the old code produced.
+    """
+    payload = json.dumps([CACHE_VERSION, source_digest(), stage, params or {}, list(upstream)],
+                         sort_keys=True, default=str)
+    return f"{stage}-{hashlib.sha1(payload.encode('utf-8')).hexdigest()[:20]}"
+
+
+class StageCache:
+    """
+    On-disk memo of pipeline stage outputs keyed by stage_key.
+
+    Each entry is one pickle file. A hit refreshes the file's mtime, and
+    after every write the least recently used entries are deleted until
+    the cache fits in max_bytes. cache_dir=None disables caching, so
+    callers can always go through memoize().
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.pkl')
+
+    def get(self, key):
+        """Cached value for key, or None on a miss."""
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        os.utime(path)
+        return value
+
+    def put(self, key, value):
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict(keep=key)
+
+    def entries(self):
+        """(mtime, size, path) for every entry, least recently used first."""
+        if self.cache_dir is None or not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                st = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((st.st_mtime_ns, st.st_size, os.path.join(self.cache_dir, name)))
+        return sorted(entries)
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits; returns the number removed."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        keep_path = self._path(keep) if keep is not None else None
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep_path:
+                continue
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def memoize(self, key, compute):
+        """Return the cached value for key, or compute, store and return it."""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            print(f"   → Reused cached {key}")
+            return value
+        self.misses += 1
+        value = compute()
+        self.put(key, value)
+        return value
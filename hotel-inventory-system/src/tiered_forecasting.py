@@ -0,0 +1,176 @@
+import time
+
+import numpy as np
+
+try:
+    from .batched_holt_winters import (SEASON_LENGTH, fit_holt_winters_batch, forecast_states,
+                                       pad_series)
+except ImportError:
+    from batched_holt_winters import SEASON_LENGTH, fit_holt_winters_batch, forecast_states, pad_series
+
+# Series shorter than two seasons can't support a weekly seasonal fit
+MIN_SEASONAL_DAYS = 2 * SEASON_LENGTH
+# Average demand interval above which a series counts as intermittent (Syntetos-Boylan cut-off)
+INTERMITTENT_ADI = 1.32
+# Regular series this flat (coefficient of variation) keep the moving average without a Holt-Winters fit
+EARLY_EXIT_CV = 0.05
+MOVING_AVERAGE_WINDOW = SEASON_LENGTH
+CROSTON_ALPHA = 0.1
+
+TIERS = ('short', 'intermittent', 'regular')
+
+
+def classify_series(values):
+    """'short', 'intermittent' or 'regular' for one daily consumption series."""
+    values = np.asarray(values, dtype=float)
+    if len(values) < MIN_SEASONAL_DAYS:
+        return 'short'
+    nonzero = int((values > 0).sum())
+    if nonzero == 0 or len(values) / nonzero > INTERMITTENT_ADI:
+        return 'intermittent'
+    return 'regular'
+
+
+def moving_average(matrix, lengths, window=MOVING_AVERAGE_WINDOW):
+    """
+    Mean of each series' last `window` observations, and the mean squared
+    one-step error of predicting every observation after the first from
+    the mean of the (up to) `window` observations before it.
+    """
+    n_series, width = matrix.shape
+    values = np.nan_to_num(matrix)
+    csum = np.zeros((n_series, width + 1))
+    csum[:, 1:] = np.cumsum(values, axis=1)
+    rows = np.arange(n_series)
+    lo = np.maximum(lengths - window, 0)
+    forecast = (csum[rows, lengths] - csum[rows, lo]) / np.maximum(lengths - lo, 1)
+
+    t = np.arange(1, width)
+    starts = np.maximum(t - window, 0)
+    predicted = (csum[:, t] - csum[:, starts]) / (t - starts)
+    errors = values[:, 1:] - predicted
+    valid = t[None, :] < lengths[:, None]
+    n_errors = valid.sum(axis=1)
+    mse = np.where(n_errors > 0, (np.where(valid, errors, 0.0) ** 2).sum(axis=1) / np.maximum(n_errors, 1),
+                   np.inf)
+    return np.maximum(forecast, 0.0), mse
+
+
+def croston_sba(matrix, lengths, alpha=CROSTON_ALPHA):
+    """
+    Syntetos-Boylan corrected Croston forecast for every series at once.
+
+    Demand sizes and intervals between non-zero demands are smoothed
+    separately; the daily rate is (1 - alpha / 2) * size / interval.
+    Series without any demand forecast zero.
+    """
+    n_series, width = matrix.shape
+    size = np.full(n_series, np.nan)
+    interval = np.full(n_series, np.nan)
+    since = np.ones(n_series)
+    for t in range(width):
+        y = matrix[:, t]
+        demand = (t < lengths) & (np.nan_to_num(y) > 0)
+        first = demand & np.isnan(size)
+        size = np.where(first, y, size)
+        interval = np.where(first, since, interval)
+        update = demand & ~first
+        size = np.where(update, size + alpha * (y - size), size)
+        interval = np.where(update, interval + alpha * (since - interval), interval)
+        since = np.where(demand, 1.0, since + 1.0)
+    rate = (1 - alpha / 2) * size / interval
+    return np.nan_to_num(rate, nan=0.0)
+
+
+def _record(forecasts, keys, values, daily, forecast_days, method, tier):
+    for key, v, rate in zip(keys, values, daily):
+        rate = float(rate)
+        forecasts[key] = {
+            'forecast_daily': rate,
+            'forecast_total': rate * forecast_days,
+            'historical_days': len(v),
+            'method': method,
+            'tier': tier
+        }
+
+
+def forecast_demand_tiered(series, forecast_days=30, timings=None):
+    """
+    Tiered backend for forecast_demand.
+
+    Each series is classified by length and intermittency and routed to
+    the cheapest method that suits it:
+
+    - short (under two weeks): moving average of the last week
+    - intermittent (demand on fewer than 1 in 1.32 days): Croston/SBA
+    - regular: a tournament between the moving average and batched
+      Holt-Winters on one-step-ahead MSE; near-constant series exit early
+      with the moving average and never reach the Holt-Winters fit
+
+    series is a list of ((bar, item), values). Returns the forecasts dict
+    used by forecast_demand with an extra 'tier' field. If a dict is passed
+    as timings it is filled with {tier: {'fits', 'seconds', 'methods'}}.
+    """
+    forecasts = {}
+    groups = {tier: [] for tier in TIERS}
+    for key, values in series:
+        values = np.asarray(values, dtype=float)
+        groups[classify_series(values)].append((key, values))
+
+    stats = {}
+    for tier in TIERS:
+        group = groups[tier]
+        start = time.perf_counter()
+        methods = {}
+        if group:
+            keys = [key for key, _ in group]
+            values = [v for _, v in group]
+            matrix, lengths = pad_series(values)
+            if tier == 'short':
+                daily, _ = moving_average(matrix, lengths)
+                _record(forecasts, keys, values, daily, forecast_days, 'moving_average', tier)
+                methods['moving_average'] = len(keys)
+            elif tier == 'intermittent':
+                daily = croston_sba(matrix, lengths)
+                _record(forecasts, keys, values, daily, forecast_days, 'croston_sba', tier)
+                methods['croston_sba'] = len(keys)
+            else:
+                methods = _regular_tournament(forecasts, keys, values, matrix, lengths, forecast_days)
+        stats[tier] = {'fits': len(group), 'seconds': time.perf_counter() - start, 'methods': methods}
+
+    for tier in TIERS:
+        if stats[tier]['fits']:
+            winners = ', '.join(f"{method} {n}" for method, n in stats[tier]['methods'].items())
+            print(f"   → Tier {tier}: {stats[tier]['fits']} series in {stats[tier]['seconds']:.3f}s ({winners})")
+    if timings is not None:
+        timings.update(stats)
+    return {key: forecasts[key] for key, _ in series}
+
+
+def _regular_tournament(forecasts, keys, values, matrix, lengths, forecast_days):
+    ma_daily, ma_mse = moving_average(matrix, lengths)
+    mean = np.array([v.mean() for v in values])
+    std = np.array([v.std() for v in values])
+    flat = std <= EARLY_EXIT_CV * np.abs(mean)
+
+    daily = ma_daily.copy()
+    method = np.where(flat, 'moving_average', '').astype(object)
+    contenders = np.flatnonzero(~flat)
+    if len(contenders):
+        fit = fit_holt_winters_batch([values[i] for i in contenders])
+        paths = forecast_states(fit['level'], fit['trend'], fit['season'], fit['lengths'], forecast_days)
+        n_errors = np.maximum(fit['lengths'], 1)
+        hw_mse = fit['sse'] / n_errors
+        hw_wins = np.isfinite(paths).all(axis=1) & (hw_mse < ma_mse[contenders])
+        daily[contenders] = np.where(hw_wins, np.maximum(np.nan_to_num(paths.mean(axis=1)), 0.0),
+                                     ma_daily[contenders])
+        method[contenders] = np.where(hw_wins, 'batched_holt_winters', 'moving_average')
+
+    methods = {}
+    for m in ('batched_holt_winters', 'moving_average'):
+        chosen = np.flatnonzero(method == m)
+        if len(chosen):
+            _record(forecasts, [keys[i] for i in chosen], [values[i] for i in chosen], daily[chosen],
+                    forecast_days, m, 'regular')
+            methods[m] = len(chosen)
+    return methods
@@ -1,32 +1,161 @@
+import os
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
 
+try:
+    from .series_index import build_series_index
+    from .data_model import PairTable
+    from .data_cache import cache_available, invalidate_cache, load_cached_frame, write_cached_frame
+except ImportError:
+    from series_index import build_series_index
+    from data_model import PairTable
+    from data_cache import cache_available, invalidate_cache, load_cached_frame, write_cached_frame
+
 # ...existing code...
-def load_and_prepare_data(file_path):
+def load_and_prepare_data(file_path, cache_dir=None, refresh_cache=False, query=None):
     """
     Load CSV and normalize expected columns:
     - Ensures Date/Day column exists and is datetime
     - Ensures numeric columns for consumption and closing balance
+
+    With cache_dir set, the prepared frame (categorical Bar Name/Item,
+    datetime64 Date) is stored as Feather keyed by the file's size, mtime and
+    content hash, and later loads memory-map it instead of parsing the CSV.
+    refresh_cache=True invalidates the cached copy first.
+
+    A query (InventoryQuery) is pushed down to the load: only its rows are
+    returned, and on a cache hit only those rows are materialised. The
+    cache itself always holds the whole export.
+    """
+    if cache_dir is not None:
+        if refresh_cache:
+            invalidate_cache(file_path, cache_dir)
+        cached = load_cached_frame(file_path, cache_dir, query=query)
+        if cached is not None:
+            return cached
+        df = load_and_prepare_data(file_path)
+        if not cache_available():
+            print("   → pyarrow not installed; prepared-data cache disabled")
+        df = write_cached_frame(df, file_path, cache_dir)
+    else:
+        df = prepare_frame(pd.read_csv(file_path))
+    return query.apply(df) if query is not None else df
+
+
+DATE_COLUMN_CANDIDATES = ['Date', 'Day', 'date', 'day', 'Date Time Served', 'DateTime']
+
+
+# Formats tried, in order, when detecting how an export writes its dates
+DATE_FORMATS = ['%m/%d/%Y %H:%M', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M',
+                '%Y-%m-%d', '%d/%m/%Y %H:%M', '%d/%m/%Y', '%Y-%m-%dT%H:%M:%S']
+DATE_FORMAT_SAMPLE = 1000
+
+
+def find_date_column(columns):
+    """First recognised Date/Day column name, or None."""
+    return next((c for c in DATE_COLUMN_CANDIDATES if c in columns), None)
+
+
+def detect_date_format(values, sample=DATE_FORMAT_SAMPLE):
+    """
+    The entry of DATE_FORMATS that parses the most of the first `sample`
+    non-empty values (the earliest listed on a tie), or None for
+    non-string columns or when no format parses any of them.
+    """
+    values = pd.Series(values)
+    if values.dtype.kind == 'M':
+        return None
+    head = values.dropna().head(sample)
+    if head.empty or not all(isinstance(v, str) for v in head):
+        return None
+    head = head.str.strip()
+    best, best_count = None, 0
+    for fmt in DATE_FORMATS:
+        count = int(pd.to_datetime(head, format=fmt, errors='coerce').notna().sum())
+        if count > best_count:
+            best, best_count = fmt, count
+    return best
+
+
+def parse_dates(values, date_format=None):
+    """
+    Parse a date column to datetime64 with an explicit format (detected
+    when not given), falling back to per-value inference for values the
+    format doesn't fit. Unparseable values become NaT.
+    """
+    if date_format is None:
+        date_format = detect_date_format(values)
+    if date_format is None:
+        return pd.to_datetime(values, errors='coerce')
+    parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+    missed = parsed.isna() & values.notna()
+    if missed.any():
+        # One value at a time: a vectorised call infers a single format from the first value
+        leftover = values[missed]
+        fallback = {value: pd.to_datetime(value, errors='coerce') for value in leftover.unique()}
+        parsed[missed] = leftover.map(fallback)
+    return parsed
+
+
+def parse_days(values, date_format=None):
+    """
+    Calendar day (normalized datetime64) of every value in a raw date column.
+
+    Exports repeat timestamps heavily, so each distinct string is parsed
+    once; when the format has a time part only the distinct date parts
+    ('1/1/2023' of '1/1/2023 19:35') are parsed, with the full value as the
+    fallback for strings the date part doesn't fit.
+    """
+    values = pd.Series(values)
+    if values.dtype.kind == 'M':
+        return values.dt.normalize()
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques)
+    if date_format is None:
+        date_format = detect_date_format(uniques)
+
+    if date_format is not None and ' ' in date_format:
+        # A regex replace stays vectorised on Arrow-backed strings, unlike split
+        date_part = uniques.astype(str).str.strip().str.replace(r'\s.*$', '', regex=True)
+        day_codes, day_uniques = pd.factorize(date_part)
+        days = pd.to_datetime(pd.Series(day_uniques), format=date_format.split(' ', 1)[0], errors='coerce')
+        parsed = pd.Series(days.to_numpy()[day_codes])
+        missed = parsed.isna()
+        if missed.any():
+            parsed[missed] = parse_dates(uniques[missed], date_format)
+    else:
+        parsed = parse_dates(uniques, date_format)
+
+    parsed = parsed.dt.normalize().to_numpy()
+    out = np.full(len(values), np.datetime64('NaT'), dtype=parsed.dtype)
+    found = codes >= 0
+    out[found] = parsed[codes[found]]
+    return pd.Series(out, index=values.index)
+
+
+def prepare_frame(df, strict=True, date_format=None):
+    """
+    Normalize a raw export frame (or one chunk of it) the way
+    load_and_prepare_data does. strict=False tolerates a frame whose dates
+    are all unparseable, which can legitimately happen for a single chunk.
+    date_format (e.g. '%m/%d/%Y %H:%M') skips format detection, so chunks
+    of one export can reuse the format found in the first.
+
+    Day is the datetime64 calendar day, not Python date objects, so later
+    groupbys and comparisons on it stay vectorised.
     """
-    df = pd.read_csv(file_path)
     # Normalize column names
     df.columns = [c.strip() for c in df.columns]
     # Detect date column
-    date_col = None
-    for candidate in ['Date', 'Day', 'date', 'day', 'Date Time Served', 'DateTime']:
-        if candidate in df.columns:
-            date_col = candidate
-            break
+    date_col = find_date_column(df.columns)
     if date_col is None:
         raise ValueError("Could not find a Date/Day column in the dataset")
-    df['Date'] = pd.to_datetime(df[date_col], errors='coerce')
-    if df['Date'].isna().all():
+    df['Date'] = parse_days(df[date_col], date_format)
+    if strict and df['Date'].isna().all():
         raise ValueError("Date column could not be parsed to datetime")
-    df['Date'] = df['Date'].dt.normalize()
-    df['Day'] = df['Date'].dt.date
+    df['Day'] = df['Date']
     # Ensure key columns exist
     if 'Bar Name' not in df.columns or 'Item' not in df.columns:
         # Try to construct Item if alternative columns exist
@@ -60,52 +189,90 @@ def perform_eda(df, top_n=10):
     return top_items, bar_consumption
 
 # ...existing code...
-def generate_recommendations(df, forecasts, par_levels, results_df):
+def _par_column(par_levels, keys, name, default):
+    """One par-level field as a float array aligned with keys."""
+    if isinstance(par_levels, PairTable):
+        return par_levels.column(name, default)
+    return np.array([par_levels[key].get(name, default) for key in keys], dtype=float)
+
+
+def _select_pairs(par_levels, keys):
+    """par_levels (dict or PairTable) restricted to keys."""
+    if isinstance(par_levels, PairTable):
+        return par_levels.select(keys)
+    return {key: par_levels[key] for key in keys}
+
+
+def recommendation_columns(current_stock, par_level, reorder_point, avg_daily_demand):
+    """(action, order quantity, days of stock) arrays for aligned per-pair arrays."""
+    below_reorder = current_stock < reorder_point
+    below_par = current_stock < par_level
+    action = np.select(
+        [below_reorder, below_par, current_stock > par_level * 1.5],
+        ["ORDER NOW", "Monitor - Below Par", "Reduce - Overstock"],
+        default="OK"
+    )
+    order_quantity = np.where(below_reorder | below_par, np.maximum(par_level - current_stock, 0), 0.0)
+    avg_daily = np.nan_to_num(avg_daily_demand, nan=0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_of_stock = np.where(avg_daily > 0, np.round(current_stock / avg_daily, 1), np.nan)
+    return action, order_quantity, days_of_stock
+
+
+def generate_recommendations(df, forecasts, par_levels, results_df, series_index=None, query=None):
     """
     Generate actionable recommendations (same signature used in main).
     Returns DataFrame with actions and order quantities.
+
+    Computed for all pairs at once: latest balances come from the series
+    index in one lookup and actions are chosen column-wise with np.select.
+    query (an InventoryQuery) limits recommendations to the pairs it
+    matches, with stock taken as of the end of its date window.
     """
-    recommendations = []
-    for (bar, item), par_info in par_levels.items():
-        # get latest closing balance
-        rows = df[(df['Bar Name'] == bar) & (df['Item'] == item)].sort_values('Date')
-        current_stock = rows['Closing Balance (ml)'].iloc[-1] if len(rows) > 0 else 0
-        par_level = par_info['par_level_ml']
-        reorder_point = par_info['reorder_point_ml']
-        if current_stock < reorder_point:
-            action = "ORDER NOW"
-            order_quantity = max(par_level - current_stock, 0)
-        elif current_stock < par_level:
-            action = "Monitor - Below Par"
-            order_quantity = max(par_level - current_stock, 0)
-        elif current_stock > par_level * 1.5:
-            action = "Reduce - Overstock"
-            order_quantity = 0
-        else:
-            action = "OK"
-            order_quantity = 0
-        avg_daily = par_info.get('avg_daily_demand', 0) or 0
-        days_of_stock = round(current_stock / avg_daily, 1) if avg_daily > 0 else np.nan
-        recommendations.append({
-            'Bar Name': bar,
-            'Item': item,
-            'Current Stock (ml)': round(current_stock, 2),
-            'Par Level (ml)': round(par_level, 2),
-            'Reorder Point (ml)': round(reorder_point, 2),
-            'Avg Daily Demand (ml)': par_info.get('avg_daily_demand', 0),
-            'Forecasted Daily Demand (ml)': par_info.get('forecast_daily', 0),
-            'Action': action,
-            'Order Quantity (ml)': round(order_quantity, 2),
-            'Days of Stock': days_of_stock
-        })
-    rec_df = pd.DataFrame(recommendations)
+    if series_index is None:
+        series_index = build_series_index(df if query is None else query.apply(df))
+    if query is not None:
+        series_index = query.restrict(series_index)
+        par_levels = _select_pairs(par_levels, [key for key in par_levels.keys() if query.matches(key)])
+    keys = list(par_levels.keys())
+    if not keys:
+        return pd.DataFrame()
+
+    # get latest closing balance
+    current_stock = series_index.latest_closings(keys, default=0)
+    par_level = _par_column(par_levels, keys, 'par_level_ml', np.nan)
+    reorder_point = _par_column(par_levels, keys, 'reorder_point_ml', np.nan)
+    avg_daily_demand = _par_column(par_levels, keys, 'avg_daily_demand', 0)
+    forecast_daily = _par_column(par_levels, keys, 'forecast_daily', 0)
+
+    action, order_quantity, days_of_stock = recommendation_columns(
+        current_stock, par_level, reorder_point, avg_daily_demand)
+
+    rec_df = pd.DataFrame({
+        'Bar Name': [key[0] for key in keys],
+        'Item': [key[1] for key in keys],
+        'Current Stock (ml)': np.round(current_stock, 2),
+        'Par Level (ml)': np.round(par_level, 2),
+        'Reorder Point (ml)': np.round(reorder_point, 2),
+        'Avg Daily Demand (ml)': avg_daily_demand,
+        'Forecasted Daily Demand (ml)': forecast_daily,
+        'Action': action.tolist(),
+        'Order Quantity (ml)': np.round(order_quantity, 2),
+        'Days of Stock': days_of_stock
+    })
     return rec_df
 
 # ...existing code...
-def create_visualizations(df, forecasts, par_levels, rec_df):
+def create_visualizations(df, forecasts, par_levels, rec_df, output_dir='.'):
     """
-    Create a couple of quick plots and save as inventory_analysis.png
+    Create a couple of quick plots and save them as PNGs in output_dir.
+
+    matplotlib and seaborn are imported here rather than at module load so
+    stages that never plot don't pay for them.
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     plt.figure(figsize=(12, 6))
     # consumption by bar
     if 'Bar Name' in df.columns and 'Consumed (ml)' in df.columns:
@@ -113,7 +280,7 @@ def create_visualizations(df, forecasts, par_levels, rec_df):
         sns.barplot(x=bar_sum.values, y=bar_sum.index, palette='viridis')
         plt.title('Top 10 Bars by Consumption (ml)')
         plt.tight_layout()
-        plt.savefig('inventory_analysis_top_bars.png', dpi=150)
+        plt.savefig(os.path.join(output_dir, 'inventory_analysis_top_bars.png'), dpi=150)
         plt.close()
 
     # Items with most ORDER NOW
@@ -124,7 +291,7 @@ def create_visualizations(df, forecasts, par_levels, rec_df):
             sns.barplot(x=urgent.values, y=urgent.index, palette='rocket')
             plt.title('Top Items Needing Immediate Orders')
             plt.tight_layout()
-            plt.savefig('inventory_analysis_urgent_items.png', dpi=150)
+            plt.savefig(os.path.join(output_dir, 'inventory_analysis_urgent_items.png'), dpi=150)
             plt.close()
     return True
 
@@ -156,7 +323,7 @@ def convert_date_columns(df):
     df['Date'] = pd.to_datetime(df[date_col], errors='coerce')
     if df['Date'].isna().all():
         return df
-    df['Day'] = df['Date'].dt.date
+    df['Day'] = df['Date'].dt.normalize()
     df['DayOfWeek'] = df['Date'].dt.dayofweek
     df['DayName'] = df['Date'].dt.day_name()
     df['Week'] = df['Date'].dt.isocalendar().week
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import make_raw_export
+from src.backtesting import backtest_forecasts, rolling_origins, summarize_backtest
+from src.forecasting import forecast_demand
+from src.series_index import build_series_index
+from src.utils import prepare_frame
+
+
+@pytest.fixture
+def index():
+    df = prepare_frame(make_raw_export(n_bars=2, n_brands=3, n_days=120, rows_per_day=2, seed=2))
+    return build_series_index(df)
+
+
+def test_rolling_origins():
+    days = np.arange(np.datetime64('2023-01-01'), np.datetime64('2023-04-01'))
+    origins = rolling_origins(days, n_origins=5, step_days=7, horizon_days=7, min_train_days=28)
+    assert list(origins.astype(str)) == ['2023-02-25', '2023-03-04', '2023-03-11', '2023-03-18', '2023-03-25']
+    # Origins without min_train_days of history are dropped
+    assert rolling_origins(days, n_origins=52, min_train_days=28)[0] == np.datetime64('2023-02-04')
+
+
+def test_backtest_scores_forecasts_against_holdout(index):
+    errors = backtest_forecasts(index, backends=['batched', 'incremental'], n_origins=6, n_jobs=1)
+    origins = rolling_origins(index.days, n_origins=6)
+    assert set(errors['Origin']) == set(origins)
+    assert set(errors['Backend']) == {'batched', 'incremental'}
+
+    # One case by hand: fit on the days before the origin, score the next 7 days
+    row = errors[errors['Backend'] == 'batched'].iloc[-1]
+    key, origin = (row['Bar Name'], row['Item']), np.datetime64(row['Origin'], 'D')
+    forecast = forecast_demand(None, forecast_days=7, series_index=index.subset([key], end=origin - 1),
+                               backend='batched')[key]['forecast_daily']
+    horizon = index.subset([key], start=origin, end=origin + 6)[key]
+    assert row['Forecast Daily (ml)'] == pytest.approx(forecast)
+    assert row['Actual Daily (ml)'] == pytest.approx(horizon.consumed.sum() / 7)
+
+    # The incremental state starts from a full fit, so its first origin matches batched
+    first = errors[errors['Origin'] == origins[0]]
+    np.testing.assert_allclose(first.loc[first['Backend'] == 'incremental', 'Forecast Daily (ml)'],
+                               first.loc[first['Backend'] == 'batched', 'Forecast Daily (ml)'])
+
+    # Units spread over worker processes give the same result
+    parallel = backtest_forecasts(index, backends=['batched', 'incremental'], n_origins=6, n_jobs=2)
+    pd.testing.assert_frame_equal(parallel, errors)
+
+
+def test_summarize_backtest():
+    errors = pd.DataFrame({
+        'Backend': ['a', 'a', 'a', 'b', 'b'],
+        'Origin': pd.to_datetime(['2023-01-01', '2023-01-08', '2023-01-01', '2023-01-01', '2023-01-08']),
+        'Bar Name': ['X'] * 5,
+        'Item': ['I', 'I', 'J', 'I', 'I'],
+        'Forecast Daily (ml)': [12.0, 6.0, 5.0, 10.0, 12.0],
+        'Actual Daily (ml)': [10.0, 8.0, 0.0, 10.0, 8.0],
+    })
+    errors['Error (ml)'] = errors['Forecast Daily (ml)'] - errors['Actual Daily (ml)']
+    per_pair, overall = summarize_backtest(errors)
+
+    a_i = per_pair[(per_pair['Backend'] == 'a') & (per_pair['Item'] == 'I')].iloc[0]
+    assert a_i['Origins'] == 2 and a_i['MAE'] == pytest.approx(2.0) and a_i['Bias'] == pytest.approx(0.0)
+    assert a_i['MAPE'] == pytest.approx((0.2 + 0.25) / 2)
+    # No non-zero actuals: MAPE is undefined
+    assert np.isnan(per_pair[per_pair['Item'] == 'J']['MAPE'].iloc[0])
+
+    # Overall compares backends on the cases both forecast (pair J only has 'a')
+    assert list(overall['Cases']) == [2, 2]
+    b = overall[overall['Backend'] == 'b'].iloc[0]
+    assert b['MAE'] == pytest.approx(2.0) and b['Bias'] == pytest.approx(2.0)
+    assert b['WAPE'] == pytest.approx(4.0 / 18.0)
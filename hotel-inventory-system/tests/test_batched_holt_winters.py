@@ -0,0 +1,46 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.batched_holt_winters import fit_holt_winters_batch, forecast_states
+from src.forecasting import forecast_demand
+
+
+def test_fit_holt_winters_batch():
+    weekly = np.array([0, 0, 0, 0, 40, 80, 20], dtype=float)
+    t = np.arange(56)
+    trending = 200 + 2 * t + weekly[t % 7]
+    flat = 100 + weekly[t[:30] % 7]
+
+    fit = fit_holt_winters_batch([trending, flat])
+    paths = forecast_states(fit['level'], fit['trend'], fit['season'], fit['lengths'], 7)
+
+    # Noise-free series are forecast almost exactly
+    assert np.allclose(paths[0], 200 + 2 * np.arange(56, 63) + weekly[np.arange(56, 63) % 7], atol=5)
+    assert np.allclose(paths[1], 100 + weekly[np.arange(30, 37) % 7], atol=5)
+
+    # Padding in a batch does not change a series' own fit
+    alone = fit_holt_winters_batch([flat])
+    assert alone['level'][0] == pytest.approx(fit['level'][1])
+    assert alone['alpha'][0] == fit['alpha'][1]
+
+
+def test_forecast_demand_batched_backend():
+    data = {
+        'Day': list(pd.date_range(start='2023-01-01', periods=21, freq='D')) * 2,
+        'Bar Name': ['Bar A'] * 21 + ['Bar B'] * 21,
+        'Item': ['Item 1'] * 42,
+        'Consumed (ml)': [100 + 10 * (d % 7) for d in range(21)] + [50] * 21
+    }
+    df = pd.DataFrame(data)
+
+    forecasts = forecast_demand(df, forecast_days=5, backend='batched')
+
+    assert set(forecasts) == {('Bar A', 'Item 1'), ('Bar B', 'Item 1')}
+    for forecast in forecasts.values():
+        assert forecast['method'] == 'batched_holt_winters'
+        assert forecast['historical_days'] == 21
+        assert forecast['forecast_total'] == pytest.approx(forecast['forecast_daily'] * 5)
+    assert forecasts[('Bar B', 'Item 1')]['forecast_daily'] == pytest.approx(50)
+
+    with pytest.raises(ValueError):
+        forecast_demand(df, backend='prophet')
@@ -0,0 +1,32 @@
+import numpy as np
+from benchmarks.bench_pipeline import compare_to_baseline
+from benchmarks.synthetic import make_raw_export
+from src.utils import prepare_frame
+
+
+def test_make_raw_export_schema_and_balances():
+    raw = make_raw_export(n_bars=2, n_brands=3, n_days=14, rows_per_day=2)
+    assert list(raw.columns[:4]) == ['Date Time Served', 'Bar Name', 'Alcohol Type', 'Brand Name']
+    assert len(raw) == 2 * 3 * 14 * 2
+    assert raw['Date Time Served'].is_monotonic_increasing
+
+    by_pair = raw.sort_values(['Bar Name', 'Brand Name', 'Date Time Served'], kind='stable')
+    expected = by_pair['Opening Balance (ml)'] + by_pair['Purchase (ml)'] - by_pair['Consumed (ml)']
+    assert np.allclose(expected, by_pair['Closing Balance (ml)'], atol=0.02)
+    assert (by_pair['Closing Balance (ml)'] > 0).all()
+
+    prepared = prepare_frame(raw.copy())
+    assert prepared.groupby(['Bar Name', 'Item']).ngroups == 6
+
+
+def test_compare_to_baseline_flags_slow_stages():
+    baseline = {'small': {'forecast_demand': {'wall_seconds': 1.0},
+                          'calculate_par_levels': {'wall_seconds': 0.001}}}
+    results = {'small': {'forecast_demand': {'wall_seconds': 1.5},
+                         'calculate_par_levels': {'wall_seconds': 0.004},
+                         'create_visualizations': {'wall_seconds': 9.0}},
+               'large': {'forecast_demand': {'wall_seconds': 30.0}}}
+    regressions = compare_to_baseline(results, baseline, threshold=0.2)
+    # Sub-noise slowdowns and stages/scales without a baseline are not flagged
+    assert [(r['scale'], r['stage'], r['slowdown']) for r in regressions] == [('small', 'forecast_demand', 1.5)]
+    assert compare_to_baseline(results, baseline, threshold=0.6) == []
@@ -1,5 +1,7 @@
 import pytest
-from src.par_levels import calculate_par_levels
+import numpy as np
+from src.data_model import ForecastTable
+from src.par_levels import calculate_par_levels, compute_par_levels, service_level_z
 
 def test_calculate_par_levels():
     forecasts = {
@@ -41,4 +43,37 @@ def test_calculate_par_levels():
     
     for key in expected_par_levels:
         for sub_key in expected_par_levels[key]:
-            assert par_levels[key][sub_key] == expected_par_levels[key][sub_key]
\ No newline at end of file
+            assert par_levels[key][sub_key] == expected_par_levels[key][sub_key]
+
+def test_calculate_par_levels_any_service_level_and_per_pair_lead_time():
+    forecasts = {
+        ('Bar A', 'Item 1'): {'avg_daily_consumption': 100, 'std_consumption': 20, 'forecast_daily': 110},
+        ('Bar B', 'Item 2'): {'avg_daily_consumption': 50, 'std_consumption': 10},
+        ('Bar C', 'Item 3'): {'history': [10, 20, 30]},
+    }
+    lead_times = {('Bar A', 'Item 1'): 2, ('Bar B', 'Item 2'): 5, ('Bar C', 'Item 3'): 1}
+
+    par_levels = calculate_par_levels(forecasts, lead_time_days=lead_times, service_level=0.975)
+
+    # z(0.975) = 1.959964
+    assert par_levels[('Bar A', 'Item 1')]['cycle_stock_ml'] == 200.0
+    assert par_levels[('Bar A', 'Item 1')]['safety_stock_ml'] == pytest.approx(1.959964 * 20 * 2 ** 0.5, abs=0.01)
+    assert par_levels[('Bar B', 'Item 2')]['cycle_stock_ml'] == 250.0
+    assert par_levels[('Bar B', 'Item 2')]['safety_stock_ml'] == pytest.approx(1.959964 * 10 * 5 ** 0.5, abs=0.01)
+    assert par_levels[('Bar B', 'Item 2')]['forecast_daily'] == 50.0
+    assert par_levels[('Bar C', 'Item 3')]['avg_daily_demand'] == 20.0
+    assert par_levels[('Bar C', 'Item 3')]['std_daily'] == 10.0
+    # A table falls back to the history series the same way
+    table = calculate_par_levels(ForecastTable.from_dict(forecasts), lead_time_days=lead_times,
+                                 service_level=0.975)
+    assert table.to_dict() == par_levels
+
+    # Columnar core agrees with the dict path
+    columns = compute_par_levels(np.array([100.0, 50.0]), np.array([20.0, 10.0]),
+                                 np.array([110.0, np.nan]), np.array([2, 5]), 0.975)
+    assert list(columns['par_level_ml']) == [par_levels[('Bar A', 'Item 1')]['par_level_ml'],
+                                             par_levels[('Bar B', 'Item 2')]['par_level_ml']]
+
+    assert service_level_z(0.5) == pytest.approx(0.0)
+    with pytest.raises(ValueError):
+        service_level_z(1.0)
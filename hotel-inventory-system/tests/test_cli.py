@@ -0,0 +1,60 @@
+import os
+
+import pandas as pd
+import pytest
+from benchmarks.synthetic import write_raw_export
+from src import cli
+
+
+def test_cli_runs_stages_and_skips_fresh_ones(tmp_path, capsys):
+    data = tmp_path / 'export.csv'
+    write_raw_export(str(data), n_bars=2, n_brands=3, n_days=28, rows_per_day=2)
+    common = ['--data', str(data), '--cache-dir', '', '--work-dir', str(tmp_path / 'work'),
+              '--output-dir', str(tmp_path / 'out'), '--backend', 'batched']
+
+    assert cli.main(['recommend'] + common) == 0
+    recs = pd.read_csv(tmp_path / 'out' / 'inventory_recommendations.csv')
+    assert len(recs) == 6
+    assert os.path.exists(tmp_path / 'out' / 'par_levels.csv')
+    assert not os.path.exists(tmp_path / 'out' / 'simulation_results.csv')
+    capsys.readouterr()
+
+    assert cli.main(['recommend'] + common) == 0
+    out = capsys.readouterr().out
+    assert '[forecast] up to date' in out and '[recommend] up to date' in out
+
+    # A changed setting reruns its stage and everything downstream of it
+    assert cli.main(['recommend', '--lead-time', '5'] + common) == 0
+    out = capsys.readouterr().out
+    assert '[forecast] up to date' in out
+    assert '[par] up to date' not in out and '[recommend] up to date' not in out
+
+    assert cli.main(['recommend', '--lead-time', '5', '--force'] + common) == 0
+    assert '[recommend] up to date' not in capsys.readouterr().out
+
+    # A query slice changes the stamps, so the stages rerun on just that slice
+    assert cli.main(['recommend', '--lead-time', '5', '--bars', 'Bar 001', '--start', '2023-01-08'] + common) == 0
+    assert '[forecast] up to date' not in capsys.readouterr().out
+    recs = pd.read_csv(tmp_path / 'out' / 'inventory_recommendations.csv')
+    assert set(recs['Bar Name']) == {'Bar 001'} and len(recs) == 3
+
+    # Bad query dates are a usage error
+    with pytest.raises(SystemExit):
+        cli.main(['recommend', '--start', '2023-02-01', '--end', '2023-01-01'] + common)
+
+
+def test_cli_backtest(tmp_path, capsys):
+    data = tmp_path / 'export.csv'
+    write_raw_export(str(data), n_bars=2, n_brands=2, n_days=70, rows_per_day=2)
+    common = ['--data', str(data), '--cache-dir', '', '--work-dir', str(tmp_path / 'work'),
+              '--output-dir', str(tmp_path / 'out'), '--workers', '1']
+
+    assert cli.main(['backtest', '--origins', '4', '--backtest-backends', 'batched,incremental'] + common) == 0
+    summary = pd.read_csv(tmp_path / 'out' / 'backtest_summary.csv')
+    assert list(summary['Backend']) == ['batched', 'incremental']
+    pairs = pd.read_csv(tmp_path / 'out' / 'backtest_pairs.csv')
+    assert len(pairs) == 8 and (pairs['Origins'] == 4).all()
+
+    # Asking for more history than there is is reported, not raised
+    assert cli.main(['backtest', '--horizon', '60'] + common) == 1
+    assert 'Not enough history' in capsys.readouterr().err
@@ -0,0 +1,41 @@
+import os
+import pytest
+import pandas as pd
+from src.data_cache import invalidate_cache
+from src.utils import load_and_prepare_data
+
+pytest.importorskip('pyarrow')
+
+CSV = """Date Time Served,Bar Name,Alcohol Type,Brand Name,Opening Balance (ml),Purchase (ml),Consumed (ml),Closing Balance (ml)
+1/1/2023 19:35,Bar A,Rum,Captain Morgan,2555.04,0,100,2455.04
+1/2/2023 10:07,Bar A,Wine,Yellow Tail,1344.37,0,50,1294.37
+1/2/2023 11:26,Bar B,Vodka,Grey Goose,1034.28,0,0,1034.28
+"""
+
+
+def test_load_and_prepare_data_cache(tmp_path):
+    source = tmp_path / 'inventory.csv'
+    source.write_text(CSV)
+    cache_dir = str(tmp_path / 'cache')
+
+    fresh = load_and_prepare_data(str(source), cache_dir=cache_dir)
+    assert isinstance(fresh['Bar Name'].dtype, pd.CategoricalDtype)
+    assert isinstance(fresh['Item'].dtype, pd.CategoricalDtype)
+    assert str(fresh['Date'].dtype).startswith('datetime64')
+
+    # Second load comes from the cache without touching the CSV parser
+    cached = load_and_prepare_data(str(source), cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(cached, fresh)
+
+    # Touched but unchanged: content hash still matches
+    os.utime(source, ns=(0, 0))
+    pd.testing.assert_frame_equal(load_and_prepare_data(str(source), cache_dir=cache_dir), fresh)
+
+    # Same size, different content: the hash forces a re-parse
+    source.write_text(CSV.replace('Bar B', 'Bar C'))
+    changed = load_and_prepare_data(str(source), cache_dir=cache_dir)
+    assert 'Bar C' in set(changed['Bar Name'])
+
+    assert invalidate_cache(str(source), cache_dir)
+    assert not invalidate_cache(str(source), cache_dir)
+    assert len(load_and_prepare_data(str(source), cache_dir=cache_dir, refresh_cache=True)) == 3
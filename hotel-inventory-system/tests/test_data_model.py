@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from src.data_model import ForecastTable, ParLevelTable
+from src.par_levels import calculate_par_levels
+from src.simulation import simulate_inventory_system
+from src.utils import generate_recommendations
+
+
+def test_forecast_table_roundtrip():
+    forecasts = {
+        ('Bar B', 'Item 2'): {'forecast_daily': 60.0, 'historical_days': 12, 'method': 'holt_winters'},
+        ('Bar A', 'Item 1'): {'forecast_daily': 110.0, 'historical_days': 30, 'method': 'mean_fallback'},
+        ('Bar A', 'Item 2'): {'forecast_daily': 80.5, 'historical_days': 7, 'method': 'holt_winters'},
+    }
+
+    table = ForecastTable.from_dict(forecasts)
+
+    assert list(table.pairs.bars) == ['Bar A', 'Bar B']
+    assert list(table.pairs.items) == ['Item 1', 'Item 2']
+    assert table.pairs.bar_codes.dtype == np.int32
+    assert list(table) == list(forecasts)
+    assert table.columns['forecast_daily'].dtype == float
+    assert table.to_dict() == forecasts
+
+    view = table[('Bar A', 'Item 2')]
+    assert view['forecast_daily'] == 80.5
+    assert view.get('missing', 0) == 0
+    assert not hasattr(view, '__dict__')
+    assert ('Bar C', 'Item 1') not in table
+
+
+def test_pipeline_accepts_tables():
+    forecasts = {
+        ('Bar A', 'Item 1'): {'avg_daily_consumption': 100, 'std_consumption': 20, 'forecast_daily': 110},
+        ('Bar B', 'Item 2'): {'avg_daily_consumption': 50, 'std_consumption': 0, 'forecast_daily': 60},
+    }
+    df = pd.DataFrame({
+        'Bar Name': ['Bar A', 'Bar A', 'Bar B', 'Bar B'],
+        'Item': ['Item 1', 'Item 1', 'Item 2', 'Item 2'],
+        'Day': pd.to_datetime(['2023-01-01', '2023-01-02', '2023-01-01', '2023-01-02']),
+        'Date': pd.to_datetime(['2023-01-01', '2023-01-02', '2023-01-01', '2023-01-02']),
+        'Consumed (ml)': [100, 350, 40, 45],
+        'Closing Balance (ml)': [500, 150, 300, 255]
+    })
+
+    par_dict = calculate_par_levels(forecasts)
+    par_table = calculate_par_levels(ForecastTable.from_dict(forecasts))
+
+    assert isinstance(par_table, ParLevelTable)
+    assert par_table.to_dict() == par_dict
+
+    results_dict, level_dict = simulate_inventory_system(df, forecasts, par_dict, simulation_days=2)
+    results_table, level_table = simulate_inventory_system(df, forecasts, par_table, simulation_days=2)
+    pd.testing.assert_frame_equal(results_table, results_dict)
+    assert level_table == level_dict
+
+    pd.testing.assert_frame_equal(generate_recommendations(df, forecasts, par_table, results_table),
+                                  generate_recommendations(df, forecasts, par_dict, results_dict))
@@ -73,4 +73,39 @@ def test_forecast_demand():
 
     # Check if the total forecast is calculated correctly
     expected_total_forecast_varying = forecasts_varying[('Bar A', 'Item 1')]['forecast_daily'] * 5
-    assert forecasts_varying[('Bar A', 'Item 1')]['forecast_total'] == expected_total_forecast_varying
\ No newline at end of file
+    assert forecasts_varying[('Bar A', 'Item 1')]['forecast_total'] == expected_total_forecast_varying
+
+def test_forecast_demand_parallel_matches_serial():
+    days = pd.date_range(start='2023-01-01', periods=28, freq='D')
+    frames = []
+    for bar in ['Bar A', 'Bar B']:
+        for i, item in enumerate(['Item 1', 'Item 2', 'Item 3']):
+            frames.append(pd.DataFrame({
+                'Day': days,
+                'Bar Name': bar,
+                'Item': item,
+                'Consumed (ml)': [100 + 10 * i + 40 * (d % 7 == 5) + d for d in range(len(days))]
+            }))
+    # Too short for weekly seasonality: this pair's fit fails and must fall back on its own
+    frames.append(pd.DataFrame({
+        'Day': days[:5],
+        'Bar Name': 'Bar C',
+        'Item': 'Item 1',
+        'Consumed (ml)': [50, 60, 70, 80, 90]
+    }))
+    df = pd.DataFrame(pd.concat(frames, ignore_index=True))
+
+    serial = forecast_demand(df, forecast_days=7)
+    timings = {}
+    parallel = forecast_demand(df, forecast_days=7, n_jobs=2, chunk_size=2, timings=timings)
+
+    assert list(parallel) == list(serial)
+    for key in serial:
+        assert parallel[key] == serial[key]
+    assert serial[('Bar C', 'Item 1')]['method'] == 'mean_fallback'
+    assert serial[('Bar C', 'Item 1')]['forecast_daily'] == 70.0
+    assert sum(stats['fits'] for stats in timings.values()) == len(serial)
+    assert sum(stats['chunks'] for stats in timings.values()) == 4
+    slowest = [fit for stats in timings.values() for fit in stats['slowest']]
+    assert {key for key, _ in slowest} <= set(serial)
+    assert all(seconds >= 0 for _, seconds in slowest)
@@ -0,0 +1,67 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.forecasting import forecast_demand
+from src.forecast_state import forecast_demand_incremental, load_state
+from src.series_index import build_series_index
+
+
+def _frame(n_days):
+    days = pd.date_range(start='2023-01-01', periods=n_days, freq='D')
+    return pd.DataFrame({
+        'Day': list(days) * 2,
+        'Bar Name': ['Bar A'] * n_days + ['Bar B'] * n_days,
+        'Item': ['Item 1'] * (2 * n_days),
+        'Consumed (ml)': [100 + 20 * (d % 7) for d in range(n_days)] + [50 + d for d in range(n_days)]
+    })
+
+
+def test_forecast_demand_incremental(tmp_path):
+    state_path = str(tmp_path / 'forecast_state.json')
+
+    forecasts, stats = forecast_demand_incremental(build_series_index(_frame(30)), state_path, 7)
+    assert stats == {'refitted': 2, 'advanced': 0, 'new_rows': 0}
+    assert load_state(state_path)[('Bar A', 'Item 1')]['n_obs'] == 30
+
+    # Two new days: states are advanced over just those rows, no refit
+    forecasts, stats = forecast_demand_incremental(build_series_index(_frame(32)), state_path, 7)
+    assert stats == {'refitted': 0, 'advanced': 2, 'new_rows': 4}
+    state = load_state(state_path)[('Bar B', 'Item 1')]
+    assert state['n_obs'] == 32
+    assert state['fitted_n_obs'] == 30
+    assert forecasts[('Bar B', 'Item 1')]['historical_days'] == 32
+    assert forecasts[('Bar A', 'Item 1')]['forecast_daily'] == pytest.approx(160, abs=10)
+
+    # No new data: nothing to advance, same forecasts
+    again, stats = forecast_demand_incremental(build_series_index(_frame(32)), state_path, 7)
+    assert stats['new_rows'] == 0
+    assert again == forecasts
+
+    # Scheduled refit once enough new observations have accumulated
+    _, stats = forecast_demand_incremental(build_series_index(_frame(32)), state_path, 7,
+                                           refit_every=2)
+    assert stats['refitted'] == 2
+
+
+def test_forecast_demand_incremental_drift(tmp_path):
+    state_path = str(tmp_path / 'forecast_state.json')
+    df = _frame(30)
+    forecast_demand_incremental(build_series_index(df), state_path, 7)
+
+    # Demand jumps: the recent one-step error drifts and triggers a refit
+    days = pd.date_range(start='2023-01-31', periods=10, freq='D')
+    jump = pd.DataFrame({'Day': days, 'Bar Name': 'Bar B', 'Item': 'Item 1',
+                         'Consumed (ml)': np.full(10, 900.0)})
+    index = build_series_index(pd.concat([df, jump], ignore_index=True))
+    forecast_demand_incremental(index, state_path, 7)
+    _, stats = forecast_demand_incremental(index, state_path, 7)
+    assert stats['refitted'] == 1
+
+
+def test_forecast_demand_state_path_rejects_other_backends(tmp_path):
+    df = _frame(30)
+    state_path = str(tmp_path / 'forecast_state.json')
+    for backend in ('tiered', 'hierarchical'):
+        with pytest.raises(ValueError):
+            forecast_demand(df, forecast_days=7, backend=backend, state_path=state_path)
+    assert forecast_demand(df, forecast_days=7, backend='batched', state_path=state_path)
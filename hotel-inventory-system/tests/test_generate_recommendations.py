@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from src.data_model import ParLevelTable
+from src.utils import generate_recommendations
+
+
+def test_generate_recommendations():
+    df = pd.DataFrame({
+        'Bar Name': ['Bar A', 'Bar A', 'Bar B', 'Bar C'],
+        'Item': ['Item 1', 'Item 1', 'Item 1', 'Item 1'],
+        'Date': pd.to_datetime(['2023-01-01', '2023-01-02', '2023-01-02', '2023-01-02']),
+        'Consumed (ml)': [10.0, 10.0, 10.0, 10.0],
+        'Closing Balance (ml)': [900.0, 50.0, 300.0, 1000.0]
+    })
+    df['Day'] = df['Date'].dt.date
+    par_levels = {
+        ('Bar A', 'Item 1'): {'par_level_ml': 400.0, 'reorder_point_ml': 100.0, 'avg_daily_demand': 25.0},
+        ('Bar B', 'Item 1'): {'par_level_ml': 400.0, 'reorder_point_ml': 100.0, 'avg_daily_demand': 0.0},
+        ('Bar C', 'Item 1'): {'par_level_ml': 400.0, 'reorder_point_ml': 100.0, 'avg_daily_demand': 25.0},
+        ('Bar D', 'Item 1'): {'par_level_ml': 400.0, 'reorder_point_ml': 0.0, 'avg_daily_demand': 25.0},
+    }
+
+    rec_df = generate_recommendations(df, {}, par_levels, None)
+
+    # Latest balance wins; pairs without history count as empty
+    assert rec_df['Current Stock (ml)'].tolist() == [50.0, 300.0, 1000.0, 0.0]
+    assert rec_df['Action'].tolist() == ["ORDER NOW", "Monitor - Below Par", "Reduce - Overstock",
+                                         "Monitor - Below Par"]
+    assert rec_df['Order Quantity (ml)'].tolist() == [350.0, 100.0, 0.0, 400.0]
+    assert rec_df['Days of Stock'].iloc[0] == 2.0
+    assert np.isnan(rec_df['Days of Stock'].iloc[1])
+
+    # A ParLevelTable gives the same frame
+    table = ParLevelTable.from_dict(par_levels)
+    pd.testing.assert_frame_equal(rec_df, generate_recommendations(df, {}, table, None))
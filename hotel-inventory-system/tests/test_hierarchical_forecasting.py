@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+from src.forecasting import forecast_demand
+from src.hierarchical_forecasting import group_codes, reconcile_levels
+
+
+def test_reconcile_levels_is_coherent():
+    codes, labels = group_codes([('Bar A', 'Rum - X'), ('Bar A', 'Rum - Y'), ('Bar A', 'Gin - Z')])
+    assert labels == [('Bar A', 'Rum'), ('Bar A', 'Gin')]
+    top = np.array([100.0, 30.0])
+    bottom = np.array([40.0, 40.0, 20.0])
+    for method in ('ols', 'wls'):
+        items = reconcile_levels(top, bottom, codes, method)
+        assert np.allclose(np.bincount(codes, weights=items), [items[0] + items[1], items[2]])
+        # Reconciled group totals lie between the group and summed item forecasts
+        assert 80.0 < items[0] + items[1] < 100.0 and 20.0 < items[2] < 30.0
+    # Already coherent forecasts are left unchanged
+    assert np.allclose(reconcile_levels(np.array([80.0, 20.0]), bottom, codes, 'ols'), bottom)
+
+
+def test_forecast_demand_hierarchical():
+    days = pd.date_range(start='2023-01-01', periods=56, freq='D')
+    weekly = np.tile([80, 90, 100, 110, 160, 200, 150], 8).astype(float)
+    df = pd.concat([
+        pd.DataFrame({'Day': days, 'Bar Name': 'Bar A', 'Item': 'Rum - X', 'Consumed (ml)': weekly}),
+        pd.DataFrame({'Day': days, 'Bar Name': 'Bar A', 'Item': 'Rum - Y', 'Consumed (ml)': weekly / 4}),
+        # Recorded every other day only: the days between count as zero demand
+        pd.DataFrame({'Day': days[::2], 'Bar Name': 'Bar A', 'Item': 'Gin - Z', 'Consumed (ml)': 60.0}),
+    ], ignore_index=True)
+
+    for reconcile in ('proportions', 'ols', 'wls'):
+        forecasts = forecast_demand(df, forecast_days=7, backend='hierarchical', reconcile=reconcile)
+        assert set(forecasts) == {('Bar A', 'Rum - X'), ('Bar A', 'Rum - Y'), ('Bar A', 'Gin - Z')}
+        assert forecasts[('Bar A', 'Rum - X')]['method'] == f'hierarchical_{reconcile}'
+        assert np.isclose(forecasts[('Bar A', 'Rum - X')]['forecast_daily'], weekly.mean(), rtol=0.1)
+        assert np.isclose(forecasts[('Bar A', 'Gin - Z')]['forecast_daily'], 30.0, rtol=0.1)
+        assert 'std_consumption' in forecasts[('Bar A', 'Rum - Y')]
+
+    proportions = forecast_demand(df, forecast_days=7, backend='hierarchical')
+    x = proportions[('Bar A', 'Rum - X')]['forecast_daily']
+    y = proportions[('Bar A', 'Rum - Y')]['forecast_daily']
+    assert np.isclose(x / y, 4.0)
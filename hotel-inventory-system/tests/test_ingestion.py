@@ -0,0 +1,37 @@
+import os
+import numpy as np
+from src.ingestion import load_daily_aggregates
+from src.series_index import build_series_index
+from src.utils import load_and_prepare_data
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '..', 'hotel_bar_inventory.csv')
+
+
+def test_load_daily_aggregates_matches_full_load():
+    full = build_series_index(load_and_prepare_data(DATA_FILE))
+    daily = load_daily_aggregates(DATA_FILE, chunksize=500)
+
+    assert not daily.duplicated(['Bar Name', 'Item', 'Day']).any()
+    streamed = build_series_index(daily)
+    assert list(streamed) == list(full)
+    for key in full:
+        assert list(streamed[key].days) == list(full[key].days)
+        assert np.allclose(streamed[key].consumed, full[key].consumed)
+        assert np.array_equal(streamed[key].closing, full[key].closing)
+
+
+def test_load_daily_aggregates_keeps_blank_type_and_brand(tmp_path):
+    path = tmp_path / 'export.csv'
+    path.write_text(
+        "Date Time Served,Bar Name,Alcohol Type,Brand Name,Consumed (ml),Closing Balance (ml)\n"
+        "1/1/2023 19:35,Smith's Bar,Rum,,30,970\n"
+        "1/1/2023 20:10,Smith's Bar,,Yellow Tail,150,600\n"
+        "1/2/2023 18:00,Smith's Bar,Rum,,60,910\n"
+    )
+    full = build_series_index(load_and_prepare_data(str(path)))
+    streamed = build_series_index(load_daily_aggregates(str(path)))
+
+    assert list(streamed) == list(full)
+    for key in full:
+        assert np.allclose(streamed[key].consumed, full[key].consumed)
+        assert np.array_equal(streamed[key].closing, full[key].closing)
@@ -0,0 +1,60 @@
+import pytest
+import pandas as pd
+from src.monte_carlo import simulate_monte_carlo
+
+
+def _frame():
+    days = pd.date_range(start='2023-01-01', periods=20, freq='D')
+    return pd.DataFrame({
+        'Bar Name': ['Bar A'] * 20 + ['Bar B'] * 20,
+        'Item': ['Item 1'] * 40,
+        'Day': list(days) * 2,
+        'Consumed (ml)': [100.0] * 20 + [0.0, 400.0] * 10
+    })
+
+
+def test_simulate_monte_carlo():
+    df = _frame()
+    par_levels = {
+        # Constant demand always covered
+        ('Bar A', 'Item 1'): {'par_level_ml': 500.0, 'reorder_point_ml': 100.0},
+        # 400 ml days exceed par: stocks out whenever one is drawn
+        ('Bar B', 'Item 1'): {'par_level_ml': 300.0, 'reorder_point_ml': 100.0},
+    }
+
+    mc_df, summary = simulate_monte_carlo(df, {}, par_levels, n_scenarios=200, simulation_days=10)
+
+    a = mc_df[mc_df['Bar Name'] == 'Bar A'].iloc[0]
+    b = mc_df[mc_df['Bar Name'] == 'Bar B'].iloc[0]
+    assert a['Stockout Probability'] == 0
+    assert a['Fill Rate'] == pytest.approx(1.0)
+    # P(at least one 400 ml day in 10) = 1 - 0.5 ** 10
+    assert b['Stockout Probability'] == pytest.approx(1 - 0.5 ** 10, abs=0.02)
+    assert b['Expected Stockout Days'] == pytest.approx(5, abs=0.5)
+    assert b['Fill Rate CI Low'] <= b['Fill Rate'] <= b['Fill Rate CI High']
+    assert summary['service_level_ci'][0] <= summary['service_level_mean'] <= summary['service_level_ci'][1]
+
+
+def test_simulate_monte_carlo_chunking_is_deterministic():
+    df = _frame()
+    par_levels = {
+        ('Bar A', 'Item 1'): {'par_level_ml': 150.0, 'reorder_point_ml': 40.0,
+                              'forecast_daily': 100.0, 'std_daily': 30.0},
+        ('Bar B', 'Item 1'): {'par_level_ml': 500.0, 'reorder_point_ml': 100.0,
+                              'forecast_daily': 200.0, 'std_daily': 200.0},
+    }
+
+    # A tiny memory budget forces many chunks; a process pool must not change results
+    serial, _ = simulate_monte_carlo(df, {}, par_levels, n_scenarios=50, simulation_days=5,
+                                     method='forecast_error', max_memory_mb=0.001)
+    pooled, _ = simulate_monte_carlo(df, {}, par_levels, n_scenarios=50, simulation_days=5,
+                                     method='forecast_error', max_memory_mb=0.001, n_jobs=2)
+
+    pd.testing.assert_frame_equal(serial, pooled)
+    assert serial['Stockout Probability'].between(0, 1).all()
+
+
+def test_simulate_monte_carlo_needs_a_scenario():
+    par_levels = {('Bar A', 'Item 1'): {'par_level_ml': 500.0, 'reorder_point_ml': 100.0}}
+    with pytest.raises(ValueError):
+        simulate_monte_carlo(_frame(), {}, par_levels, n_scenarios=0)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.order_pipeline import compare_policies, simulate_order_pipeline
+
+
+def _frame():
+    days = pd.date_range(start='2023-01-01', periods=10, freq='D')
+    return pd.DataFrame({
+        'Bar Name': ['Bar A'] * 10,
+        'Item': ['Item 1'] * 10,
+        'Day': list(days),
+        'Consumed (ml)': [100.0] * 10
+    })
+
+
+def test_simulate_order_pipeline_lead_time():
+    df = _frame()
+    par_levels = {('Bar A', 'Item 1'): {'par_level_ml': 150.0, 'reorder_point_ml': 150.0}}
+
+    # Next-day delivery keeps up with demand; a longer lead time does not
+    quick, summary = simulate_order_pipeline(df, {}, par_levels, simulation_days=10, lead_time_days=1)
+    slow, slow_summary = simulate_order_pipeline(df, {}, par_levels, simulation_days=10,
+                                                 lead_time_days={('Bar A', 'Item 1'): 2})
+
+    assert quick['Stockout Days'].iloc[0] == 0
+    assert summary['fill_rate'] == 1.0
+    assert slow['Stockout Days'].iloc[0] > 0
+    assert slow['Lost Demand (ml)'].iloc[0] > 0
+    assert slow_summary['service_level'] < 1.0
+
+
+def test_simulate_order_pipeline_policies():
+    df = _frame()
+    par_levels = {('Bar A', 'Item 1'): {'par_level_ml': 500.0, 'reorder_point_ml': 100.0}}
+
+    base_stock, _ = simulate_order_pipeline(df, {}, par_levels, simulation_days=10, policy='order_up_to')
+    s_s, _ = simulate_order_pipeline(df, {}, par_levels, simulation_days=10, policy='sS',
+                                     lead_time_days=1)
+
+    assert base_stock['Orders Placed'].iloc[0] == 10
+    # Stock falls from 500 to the 100 ml reorder point on days 4 and 8
+    assert s_s['Orders Placed'].iloc[0] == 2
+    assert s_s['Stockout Days'].iloc[0] == 0
+    assert np.isclose(s_s['Final Inventory'].iloc[0], 300.0)
+
+
+def test_order_pipeline_rejects_zero_review_period():
+    par_levels = {('Bar A', 'Item 1'): {'par_level_ml': 500.0, 'reorder_point_ml': 100.0}}
+    with pytest.raises(ValueError):
+        simulate_order_pipeline(_frame(), {}, par_levels, simulation_days=10, review_period=0)
+    with pytest.raises(ValueError):
+        compare_policies(_frame(), {}, par_levels, policies=(('order_up_to', 1), ('sS', 0)))
+
+
+def test_simulate_order_pipeline_partial_lead_time_dict():
+    df = pd.concat([_frame(), _frame().assign(Item='Item 2')], ignore_index=True)
+    par_levels = {
+        ('Bar A', 'Item 1'): {'par_level_ml': 150.0, 'reorder_point_ml': 150.0},
+        ('Bar A', 'Item 2'): {'par_level_ml': 150.0, 'reorder_point_ml': 150.0},
+        ('Bar B', 'Item 1'): {'par_level_ml': 150.0, 'reorder_point_ml': 150.0},  # No history: skipped
+    }
+    results, _ = simulate_order_pipeline(df, {}, par_levels, simulation_days=10,
+                                         lead_time_days={('Bar A', 'Item 1'): 1})
+
+    # Pairs the dict omits fall back to the default 3-day lead time
+    assert list(results['Item']) == ['Item 1', 'Item 2']
+    assert list(results['Lead Time (days)']) == [1, 3]
+    assert list(results['Stockout Days'] > 0) == [False, True]
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from src import par_sweep
+from src.par_sweep import pareto_mask, sweep_par_levels
+
+
+def _frame():
+    days = pd.date_range(start='2023-01-01', periods=30, freq='D')
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'Bar Name': ['Bar A'] * 30 + ['Bar B'] * 30,
+        'Item': ['Item 1'] * 60,
+        'Day': list(days) * 2,
+        'Consumed (ml)': np.concatenate([np.full(30, 100.0), rng.uniform(0, 400, 30)])
+    })
+
+
+def _forecasts():
+    return {
+        ('Bar A', 'Item 1'): {'avg_daily_consumption': 100.0, 'std_consumption': 0.0, 'forecast_daily': 100.0},
+        ('Bar B', 'Item 1'): {'avg_daily_consumption': 200.0, 'std_consumption': 115.0, 'forecast_daily': 200.0},
+    }
+
+
+def test_pareto_mask():
+    holding = np.array([[1.0], [2.0], [2.0], [3.0]])
+    stockout = np.array([[0.5], [0.2], [0.3], [0.2]])
+    assert pareto_mask(holding, stockout)[:, 0].tolist() == [True, True, False, False]
+
+
+def test_sweep_par_levels_reuses_cached_points(monkeypatch):
+    df = _frame()
+    par_sweep._POINT_CACHE.clear()
+    sweep_df, pareto_df = sweep_par_levels(df, _forecasts(), lead_times=(1, 3), service_levels=(0.9,),
+                                           review_periods=(1,), simulation_days=30)
+
+    assert len(sweep_df) == 4
+    assert pareto_df['Pareto Optimal'].all()
+    # Higher service level / longer cover never lowers the par level
+    b = sweep_df[sweep_df['Bar Name'] == 'Bar B'].set_index('Lead Time (days)')
+    assert b.loc[3, 'Par Level'] > b.loc[1, 'Par Level']
+
+    evaluated = []
+    original = par_sweep._evaluate_point
+    monkeypatch.setattr(par_sweep, '_evaluate_point', lambda args: evaluated.append(args) or original(args))
+    wider_df, _ = sweep_par_levels(df, _forecasts(), lead_times=(1, 3), service_levels=(0.9, 0.99),
+                                   review_periods=(1,), simulation_days=30)
+
+    # Only the two new service-level points are simulated
+    assert len(evaluated) == 2
+    assert len(wider_df) == 8
+    merged = sweep_df.merge(wider_df, on=['Bar Name', 'Item', 'Lead Time (days)', 'Service Level',
+                                          'Review Period (days)'])
+    assert np.allclose(merged['Avg On Hand (ml)_x'], merged['Avg On Hand (ml)_y'])
@@ -0,0 +1,83 @@
+import os
+
+import pandas as pd
+import pytest
+from benchmarks.synthetic import make_raw_export
+from src.partitioned_store import ingest_exports, load_manifest, read_store, store_fingerprint
+from src.query import InventoryQuery
+
+
+def _write_exports(root):
+    raw = make_raw_export(n_bars=2, n_brands=2, n_days=60, rows_per_day=1)
+    served = pd.to_datetime(raw['Date Time Served'])
+    raw['Date Time Served'] = served.dt.strftime('%m/%d/%Y %H:%M')
+    os.makedirs(root / 'grand', exist_ok=True)
+    os.makedirs(root / 'harbour', exist_ok=True)
+    # Overlapping daily exports for one property: days 0-35 and 25-59
+    raw[served < '2023-02-05'].to_csv(root / 'grand' / 'a.csv', index=False)
+    raw[served >= '2023-01-26'].to_csv(root / 'grand' / 'b.csv', index=False)
+    raw[raw['Bar Name'] == 'Bar 000'].to_csv(root / 'harbour' / 'c.csv', index=False)
+    return raw
+
+
+def test_ingest_and_read_store(tmp_path):
+    raw = _write_exports(tmp_path / 'exports')
+    store = str(tmp_path / 'store')
+
+    stats = ingest_exports(str(tmp_path / 'exports'), store, n_jobs=2)
+    assert stats['parsed'] == 3
+    manifest = load_manifest(store)
+    assert sorted(manifest['partitions']) == [
+        os.path.join(f'property={p}', f'month={m}')
+        for p in ('grand', 'harbour') for m in ('2023-01', '2023-02', '2023-03')]
+
+    everything = read_store(store)
+    # Overlapping rows of the two 'grand' exports are stored once
+    assert (everything['Property'] == 'grand').sum() == len(raw)
+    assert (everything['Property'] == 'harbour').sum() == (raw['Bar Name'] == 'Bar 000').sum()
+    # 'Bar 000' exists at both properties and must not merge into one bar
+    assert set(everything['Bar Name']) == {'grand / Bar 000', 'grand / Bar 001', 'harbour / Bar 000'}
+
+    # Re-running skips unchanged files and leaves the store as it was
+    fingerprint = store_fingerprint(store)
+    assert ingest_exports(str(tmp_path / 'exports'), store)['parsed'] == 0
+    assert store_fingerprint(store) == fingerprint
+
+    window = read_store(store, start='2023-02-01', end='2023-02-10', bars=['Bar 001'])
+    assert set(window['Bar Name']) == {'Bar 001'}  # one property: names left as exported
+    assert set(window['Property']) == {'grand'}
+    assert window['Date'].min() >= pd.Timestamp('2023-02-01')
+    assert window['Date'].max() <= pd.Timestamp('2023-02-10')
+    assert len(window) == 2 * 10
+
+    # A query prunes partitions and accepts property-qualified bar names
+    query = InventoryQuery(start='2023-03-01', bars=['harbour / Bar 000'])
+    sliced = read_store(store, query=query, qualify_bars=True)
+    assert set(sliced['Bar Name']) == {'harbour / Bar 000'}
+    assert sliced['Date'].min() >= pd.Timestamp('2023-03-01')
+
+
+def test_reingesting_a_changed_export_replaces_its_rows(tmp_path):
+    raw = make_raw_export(n_bars=1, n_brands=2, n_days=40, rows_per_day=1)
+    served = pd.to_datetime(raw['Date Time Served'])
+    raw['Date Time Served'] = served.dt.strftime('%m/%d/%Y %H:%M')
+    exports = tmp_path / 'exports' / 'grand'
+    os.makedirs(exports)
+    path = exports / 'a.csv'
+    raw.to_csv(path, index=False)
+    store = str(tmp_path / 'store')
+    ingest_exports(str(tmp_path / 'exports'), store, n_jobs=1)
+    total = read_store(store)['Consumed (ml)'].sum()
+
+    # Same rows, one consumption corrected; the rest of February dropped from the export
+    corrected = raw[served < '2023-02-05'].copy()
+    corrected.loc[corrected.index[0], 'Consumed (ml)'] += 50
+    corrected.to_csv(path, index=False)
+    os.utime(path, ns=(os.stat(path).st_mtime_ns + 10**9,) * 2)
+    assert ingest_exports(str(tmp_path / 'exports'), store, n_jobs=1)['parsed'] == 1
+
+    after = read_store(store)
+    assert len(after) == len(corrected)
+    assert after['Consumed (ml)'].sum() == pytest.approx(corrected['Consumed (ml)'].sum())
+    assert after['Consumed (ml)'].sum() != pytest.approx(total)
+    assert 'Source' not in after.columns
@@ -0,0 +1,32 @@
+import pandas as pd
+from src.utils import detect_date_format, parse_dates, prepare_frame
+
+
+def test_detect_date_format():
+    assert detect_date_format(pd.Series(['1/1/2023 19:35', '1/12/2023 10:07', None])) == '%m/%d/%Y %H:%M'
+    assert detect_date_format(pd.Series(['2023-01-05', '2023-02-01'])) == '%Y-%m-%d'
+    # A day above 12 settles day-first exports
+    assert detect_date_format(pd.Series(['1/1/2023 19:35', '13/1/2023 10:07'])) == '%d/%m/%Y %H:%M'
+    assert detect_date_format(pd.Series(['not a date'])) is None
+    assert detect_date_format(pd.Series(pd.to_datetime(['2023-01-01']))) is None
+
+
+def test_parse_dates_falls_back_for_odd_values():
+    parsed = parse_dates(pd.Series(['1/1/2023 19:35', '1/2/2023 10:07', '2023-01-05', 'Jan 6 2023', 'junk',
+                                    None]))
+    assert list(parsed[:4]) == [pd.Timestamp('2023-01-01 19:35'), pd.Timestamp('2023-01-02 10:07'),
+                                pd.Timestamp('2023-01-05'), pd.Timestamp('2023-01-06')]
+    assert parsed[4:].isna().all()
+
+
+def test_prepare_frame_days_are_datetime64():
+    df = prepare_frame(pd.DataFrame({
+        'Date Time Served': ['1/1/2023 19:35', '1/1/2023 21:10', '1/3/2023 09:00'],
+        'Bar Name': ['Bar A'] * 3,
+        'Alcohol Type': ['Rum'] * 3,
+        'Brand Name': ['Bacardi'] * 3,
+        'Consumed (ml)': [10, 20, 30]
+    }))
+    assert df['Day'].dtype.kind == 'M'
+    assert list(df['Day']) == list(pd.to_datetime(['2023-01-01', '2023-01-01', '2023-01-03']))
+    assert list(df['Item']) == ['Rum - Bacardi'] * 3
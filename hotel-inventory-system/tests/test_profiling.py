@@ -0,0 +1,32 @@
+import json
+import os
+
+from src.profiling import RunProfiler
+
+
+def test_run_profiler_report(tmp_path):
+    profiler = RunProfiler(trace_memory=True, profile_dir=str(tmp_path / 'profiles'))
+    with profiler.stage('load', rows=100) as stage:
+        data = list(range(100_000))
+        stage['pairs'] = 3
+    with profiler.stage('fit', pairs=3):
+        sum(data)
+    profiler.add_fit_timings({1: {'slowest': [(('Bar A', 'Item 1'), 0.2)]},
+                              2: {'slowest': [(('Bar B', 'Item 1'), 0.5)]}}, n=1)
+
+    report = profiler.write_report(str(tmp_path / 'run_report.json'))
+    assert report == json.loads((tmp_path / 'run_report.json').read_text())
+    assert [s['stage'] for s in report['stages']] == ['load', 'fit']
+    load = report['stages'][0]
+    assert load['rows'] == 100 and load['pairs'] == 3
+    assert load['wall_seconds'] >= 0 and load['cpu_seconds'] >= 0
+    assert load['peak_traced_mb'] > 0
+    assert os.path.exists(load['profile'])
+    assert report['slowest_fits'] == [{'key': ['Bar B', 'Item 1'], 'seconds': 0.5}]
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = RunProfiler(enabled=False)
+    with profiler.stage('load', rows=1) as stage:
+        stage['pairs'] = 1
+    assert profiler.report()['stages'] == []
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import make_raw_export, write_raw_export
+from src.forecasting import forecast_demand
+from src.ingestion import load_daily_aggregates
+from src.par_levels import calculate_par_levels
+from src.query import InventoryQuery, split_item
+from src.series_index import build_series_index
+from src.simulation import simulate_inventory_system
+from src.utils import generate_recommendations, load_and_prepare_data, prepare_frame
+
+
+@pytest.fixture
+def df():
+    return prepare_frame(make_raw_export(n_bars=3, n_brands=4, n_days=60, rows_per_day=2, seed=3))
+
+
+def test_split_item():
+    assert split_item('Whisky - Glenfiddich') == ('Whisky', 'Glenfiddich')
+    assert split_item('Water') == ('Water', 'Water')
+
+
+def test_query_mask_and_restrict(df):
+    item = df['Item'].iloc[0]
+    alcohol_type, brand = split_item(item)
+    query = InventoryQuery(start='2023-01-20', end='2023-02-10', bars=['Bar 001'], brands=[brand])
+    sliced = query.apply(df)
+
+    assert len(sliced) > 0
+    assert sliced['Date'].min() >= pd.Timestamp('2023-01-20')
+    assert sliced['Date'].max() <= pd.Timestamp('2023-02-10')
+    assert set(sliced['Bar Name']) == {'Bar 001'}
+    assert {split_item(i)[1] for i in sliced['Item']} == {brand}
+
+    # Restricting a prebuilt index gives the index of the sliced rows
+    restricted = query.restrict(build_series_index(df))
+    direct = build_series_index(sliced)
+    assert list(restricted) == list(direct)
+    assert list(restricted.days) == list(direct.days)
+    for key in direct:
+        np.testing.assert_allclose(restricted[key].consumed, direct[key].consumed)
+        np.testing.assert_allclose(restricted[key].closing, direct[key].closing)
+
+    # Property-qualified bar names match the plain name
+    assert query.matches(('grand / Bar 001', item))
+    assert not query.matches(('Bar 000', item))
+    assert InventoryQuery().apply(df) is df
+
+    with pytest.raises(ValueError):
+        InventoryQuery(start='2023-02-01', end='2023-01-01')
+
+
+def test_stages_with_query_match_sliced_data(df):
+    query = InventoryQuery(start='2023-01-15', bars=['Bar 000', 'Bar 002'])
+    index = build_series_index(df)
+    sliced = query.apply(df)
+
+    forecasts = forecast_demand(df, backend='batched', series_index=index, query=query)
+    expected = forecast_demand(sliced, backend='batched')
+    assert forecasts == expected
+    assert {bar for bar, _ in forecasts} == {'Bar 000', 'Bar 002'}
+
+    # Par levels for every pair; later stages still only look at the query's pairs
+    all_par = calculate_par_levels(forecast_demand(df, backend='batched', series_index=index))
+    results, service = simulate_inventory_system(df, None, all_par, series_index=index, query=query)
+    expected_results, expected_service = simulate_inventory_system(sliced, None, all_par)
+    pd.testing.assert_frame_equal(results, expected_results)
+    assert service == expected_service
+
+    recs = generate_recommendations(df, None, all_par, None, series_index=index, query=query)
+    assert set(recs['Bar Name']) == {'Bar 000', 'Bar 002'}
+    expected_recs = generate_recommendations(sliced, None, all_par, None)
+    expected_recs = expected_recs[expected_recs['Bar Name'] != 'Bar 001'].reset_index(drop=True)
+    pd.testing.assert_frame_equal(recs, expected_recs)
+
+
+def test_query_pushed_down_to_loading(tmp_path):
+    path = tmp_path / 'export.csv'
+    write_raw_export(str(path), n_bars=3, n_brands=2, n_days=30, rows_per_day=2, seed=1)
+    query = InventoryQuery(end='2023-01-10', bars='Bar 002')
+
+    loaded = load_and_prepare_data(str(path), query=query)
+    assert set(loaded['Bar Name']) == {'Bar 002'}
+    assert loaded['Date'].max() <= pd.Timestamp('2023-01-10')
+
+    daily = load_daily_aggregates(str(path), chunksize=50, query=query)
+    assert set(daily['Bar Name']) == {'Bar 002'}
+    assert daily['Consumed (ml)'].sum() == pytest.approx(loaded['Consumed (ml)'].sum())
+
+    pytest.importorskip('pyarrow')
+    cache_dir = str(tmp_path / 'cache')
+    load_and_prepare_data(str(path), cache_dir=cache_dir)
+    cached = load_and_prepare_data(str(path), cache_dir=cache_dir, query=query)
+    assert len(cached) == len(loaded)
+    assert set(cached['Bar Name'].astype(str)) == {'Bar 002'}
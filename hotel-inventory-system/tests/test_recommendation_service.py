@@ -0,0 +1,135 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+from src.recommendation_service import InventoryState, RecommendationServer
+
+
+def _state():
+    df = pd.DataFrame({
+        'Bar Name': ['Bar A', 'Bar A', 'Bar B'],
+        'Item': ['Item 1', 'Item 1', 'Item 1'],
+        'Date': pd.to_datetime(['2023-01-01', '2023-01-02', '2023-01-02']),
+        'Consumed (ml)': [10.0, 10.0, 10.0],
+        'Closing Balance (ml)': [900.0, 500.0, 300.0]
+    })
+    df['Day'] = df['Date'].dt.date
+    par_levels = {
+        ('Bar A', 'Item 1'): {'par_level_ml': 400.0, 'reorder_point_ml': 200.0, 'avg_daily_demand': 50.0},
+        ('Bar B', 'Item 1'): {'par_level_ml': 400.0, 'reorder_point_ml': 200.0, 'avg_daily_demand': 50.0},
+    }
+    return InventoryState.from_pipeline(df, par_levels)
+
+
+def test_inventory_state_events():
+    state = _state()
+    assert state.recommend('Bar A', 'Item 1')['Action'] == 'OK'
+    assert state.recommend('Bar X', 'Item 1') is None
+
+    state.apply_event({'bar': 'Bar A', 'item': 'Item 1', 'consumed': 350.0})
+    rec = state.recommend('Bar A', 'Item 1')
+    assert rec['Current Stock (ml)'] == 150.0
+    assert rec['Action'] == 'ORDER NOW'
+    assert rec['Order Quantity (ml)'] == 250.0
+    assert rec['Days of Stock'] == 3.0
+
+    state.apply_event({'bar': 'Bar A', 'item': 'Item 1', 'purchased': 250.0})
+    assert state.recommend('Bar A', 'Item 1')['Current Stock (ml)'] == 400.0
+    # Events become history rows for the next forecast refresh
+    assert len(state.history_frame()) == 5
+
+
+def test_recommendation_server():
+    async def exchange():
+        server = await RecommendationServer(_state()).start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+
+        async def request(raw):
+            writer.write(raw)
+            await writer.drain()
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = int(head.lower().split(b'content-length:')[1].split(b'\r\n')[0])
+            return int(head.split()[1]), json.loads(await reader.readexactly(length))
+
+        events = b'\n'.join(json.dumps({'bar': 'Bar B', 'item': 'Item 1', 'consumed': 50}).encode()
+                            for _ in range(2))
+        try:
+            posted = await request(b"POST /events HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(events)
+                                   + events)
+            found = await request(b"GET /recommendation?bar=Bar%20B&item=Item%201 HTTP/1.1\r\n\r\n")
+            missing = await request(b"GET /recommendation?bar=Bar%20X&item=Item%201 HTTP/1.1\r\n\r\n")
+        finally:
+            writer.close()
+            server.close()
+            await server.wait_closed()
+        return posted, found, missing
+
+    posted, found, missing = asyncio.run(exchange())
+    assert posted == (200, {'applied': 2})
+    assert found[0] == 200 and found[1]['Current Stock (ml)'] == 200.0
+    assert found[1]['Action'] == 'Monitor - Below Par'
+    assert missing[0] == 404
+
+
+def test_recommendation_server_rejects_bad_requests(monkeypatch):
+    monkeypatch.setattr('src.recommendation_service.MAX_BODY_BYTES', 64)
+
+    async def exchange(raw):
+        server = await RecommendationServer(_state()).start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            writer.write(raw)
+            await writer.drain()
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = int(head.lower().split(b'content-length:')[1].split(b'\r\n')[0])
+            await reader.readexactly(length)
+            # Every rejected request closes the connection
+            return int(head.split()[1]), await reader.read()
+        finally:
+            writer.close()
+            server.close()
+            await server.wait_closed()
+
+    for body in (b'[1, 2]', b'5'):
+        raw = b"POST /events HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body
+        assert asyncio.run(exchange(raw)) == (400, b'')
+    assert asyncio.run(exchange(b"GARBAGE\r\n\r\n")) == (400, b'')
+
+    # Chunked bodies are held to the size limit too, and a body left unread is never parsed as a request
+    chunk = b'x' * 50
+    chunked = (b"POST /events HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+               + (b"%x\r\n" % len(chunk) + chunk + b"\r\n") * 3 + b"0\r\n\r\n")
+    assert asyncio.run(exchange(chunked)) == (413, b'')
+    bad_event = json.dumps({'bar': 'Bar A'}).encode() + b'\n'
+    partial = (b"POST /events HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+               + b"%x\r\n" % len(bad_event) + bad_event + b"\r\n"
+               + b"%x\r\n" % len(bad_event) + bad_event + b"\r\n0\r\n\r\n")
+    assert asyncio.run(exchange(partial)) == (400, b'')
+
+
+def test_inventory_state_rejects_bad_events():
+    state = _state()
+    bad_events = [
+        {'bar': 'Bar A', 'item': 'Item 1', 'consumed': 5, 'date': 'yesterday-ish'},
+        {'bar': 'New Bar', 'item': 'Item 1', 'consumed': 'abc'},
+        {'bar': 'New Bar', 'item': 'Item 1', 'purchased': float('nan')},
+        {'bar': ['New Bar'], 'item': 'Item 1'},
+    ]
+    for event in bad_events:
+        with pytest.raises(ValueError):
+            state.apply_event(event)
+    # A batch is applied all-or-nothing
+    with pytest.raises(ValueError):
+        state.apply_events([{'bar': 'Bar A', 'item': 'Item 1', 'consumed': 100.0}, bad_events[1]])
+    assert ('New Bar', 'Item 1') not in state and len(state) == 2
+    assert state.recommend('Bar A', 'Item 1')['Current Stock (ml)'] == 500.0
+    assert state.events_applied == 0 and not state.events
+
+    # Accepted events are stored as parsed days, so a refresh still succeeds
+    state.apply_event({'bar': 'Bar A', 'item': 'Item 1', 'consumed': 5, 'date': '2023-01-03T21:15:00'})
+    assert state.history_frame()['Day'].iloc[-1] == pd.Timestamp('2023-01-03')
+    assert asyncio.run(state.refresh(forecast_days=7))
+    assert state.recommend('Bar A', 'Item 1')['Current Stock (ml)'] == 495.0
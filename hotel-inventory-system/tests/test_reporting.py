@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+from benchmarks.synthetic import make_raw_export
+from src.forecasting import forecast_demand
+from src.par_levels import calculate_par_levels
+from src.reporting import CHART_DIR, TOP_BARS_FILE, build_chart_specs, chart_slug, render_report
+from src.series_index import build_series_index
+from src.utils import generate_recommendations, prepare_frame
+
+
+@pytest.fixture
+def pipeline():
+    df = prepare_frame(make_raw_export(n_bars=3, n_brands=4, n_days=60, rows_per_day=2, seed=5))
+    index = build_series_index(df)
+    par_levels = calculate_par_levels(forecast_demand(df, backend='batched', series_index=index))
+    rec_df = generate_recommendations(df, None, par_levels, None, series_index=index)
+    return df, index, par_levels, rec_df
+
+
+def test_chart_specs_aggregate_every_bar_and_item(pipeline):
+    df, index, par_levels, rec_df = pipeline
+    specs = build_chart_specs(index, par_levels, rec_df, history_days=30)
+    by_file = {spec['file']: spec for spec in specs}
+
+    bars = sorted({bar for bar, _ in index})
+    items = sorted({item for _, item in index})
+    assert sum(spec['kind'] == 'bar' for spec in specs) == len(bars)
+    assert sum(spec['kind'] == 'item' for spec in specs) == len(items)
+
+    bar = bars[0]
+    spec = by_file[os.path.join(CHART_DIR, f"bar_{chart_slug(bar)}.png")]
+    keys = [key for key in index if key[0] == bar]
+    consumed, _ = index.window_matrix(keys, spec['data']['days'][0])
+    np.testing.assert_allclose(spec['data']['consumption'], consumed.sum(axis=0))
+    assert spec['data']['forecast'] == pytest.approx(sum(par_levels[key]['forecast_daily'] for key in keys))
+    assert sorted(spec['data']['labels']) == sorted(item for _, item in keys)
+
+    top = by_file[TOP_BARS_FILE]['data']
+    totals = df.groupby('Bar Name')['Consumed (ml)'].sum().sort_values(ascending=False)
+    assert top['labels'] == list(totals.index)
+    np.testing.assert_allclose(top['values'], totals.to_numpy())
+
+
+def test_render_report_skips_unchanged_charts(pipeline, tmp_path):
+    _, index, par_levels, rec_df = pipeline
+    first = render_report(index, par_levels, rec_df, output_dir=str(tmp_path), n_jobs=2)
+    assert first['rendered'] == first['charts'] > 0
+    assert (tmp_path / TOP_BARS_FILE).exists()
+    summaries = len(list(tmp_path.glob('*.png')))
+    assert len(list((tmp_path / CHART_DIR).glob('*.png'))) == first['charts'] - summaries
+
+    second = render_report(index, par_levels, rec_df, output_dir=str(tmp_path), n_jobs=2)
+    assert second['rendered'] == 0 and second['skipped'] == second['charts']
+
+    # Only the chart showing the changed par level is redrawn
+    key = next(iter(index))
+    par_levels[key]['par_level_ml'] += 100.0
+    third = render_report(index, par_levels, rec_df, output_dir=str(tmp_path), n_jobs=1)
+    assert third['rendered'] == 1
+
+    os.remove(tmp_path / TOP_BARS_FILE)
+    assert render_report(index, par_levels, rec_df, output_dir=str(tmp_path), n_jobs=1)['rendered'] == 1
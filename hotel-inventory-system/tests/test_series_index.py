@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from src.series_index import build_series_index
+
+
+def test_build_series_index():
+    data = {
+        'Day': pd.to_datetime(['2023-01-02', '2023-01-01', '2023-01-01', '2023-01-02',
+                               '2023-01-03', '2023-01-01']),
+        'Bar Name': ['Bar A', 'Bar A', 'Bar A', 'Bar A', 'Bar A', 'Bar B'],
+        'Item': ['Item 1', 'Item 1', 'Item 1', 'Item 2', 'Item 1', 'Item 1'],
+        'Consumed (ml)': [10, 20, 30, 40, 50, 60],
+        'Closing Balance (ml)': [900, 980, 950, 500, 850, 300]
+    }
+    df = pd.DataFrame(data)
+
+    index = build_series_index(df)
+
+    assert list(index) == [('Bar A', 'Item 1'), ('Bar A', 'Item 2'), ('Bar B', 'Item 1')]
+    assert len(index.days) == 3
+
+    # Days sorted, consumption summed per day, last closing balance of each day kept
+    series = index[('Bar A', 'Item 1')]
+    assert list(series.days) == list(pd.to_datetime(['2023-01-01', '2023-01-02', '2023-01-03']))
+    assert list(series.consumed) == [50.0, 10.0, 50.0]
+    assert list(series.closing) == [950.0, 900.0, 850.0]
+
+    window = index.since(('Bar A', 'Item 1'), pd.Timestamp('2023-01-02'))
+    assert list(window.consumed) == [10.0, 50.0]
+
+    assert index.latest_closing(('Bar A', 'Item 1')) == 850.0
+    assert index.latest_closing(('Bar C', 'Item 1')) == 0.0
+    assert ('Bar C', 'Item 1') not in index
+
+
+def test_series_index_fills_missing_days():
+    df = pd.DataFrame({
+        'Day': pd.to_datetime(['2023-01-01', '2023-01-04', '2023-01-02', '2023-01-03']),
+        'Bar Name': ['Bar A', 'Bar A', 'Bar B', 'Bar B'],
+        'Item': ['Item 1', 'Item 1', 'Item 1', 'Item 1'],
+        'Consumed (ml)': [10, 40, 20, 30],
+        'Closing Balance (ml)': [900, 800, 500, 470]
+    })
+
+    index = build_series_index(df)
+    series = index[('Bar A', 'Item 1')]
+    assert series.days.dtype == 'datetime64[D]'
+    assert list(series.days) == list(np.arange('2023-01-01', '2023-01-05', dtype='datetime64[D]'))
+    # Gap days are zero demand with the last closing balance carried forward
+    assert list(series.consumed) == [10.0, 0.0, 0.0, 40.0]
+    assert list(series.closing) == [900.0, 900.0, 900.0, 800.0]
+    # Each pair spans only its own first to last day
+    assert list(index[('Bar B', 'Item 1')].consumed) == [20.0, 30.0]
+
+    sparse = build_series_index(df, fill_missing_days=False)
+    assert list(sparse[('Bar A', 'Item 1')].consumed) == [10.0, 40.0]
@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 import pandas as pd
 from src.simulation import simulate_inventory_system
 
@@ -40,4 +41,29 @@ def test_simulate_inventory_system():
     assert results_df.loc[(results_df['Bar Name'] == 'Bar A') & (results_df['Item'] == 'Item 1'), 'Stockouts'].values[0] == 0
     assert results_df.loc[(results_df['Bar Name'] == 'Bar B') & (results_df['Item'] == 'Item 2'), 'Stockouts'].values[0] == 1  # Expected stockout for Item 2 in Bar B
 
-    # Additional checks can be added as needed for more comprehensive testing
\ No newline at end of file
+    # Additional checks can be added as needed for more comprehensive testing
+
+def test_simulate_inventory_system_engines_match():
+    rng = np.random.default_rng(7)
+    days = pd.date_range(start='2023-01-01', periods=40, freq='D')
+    rows = []
+    for bar in ['Bar A', 'Bar B', 'Bar C']:
+        for item in ['Item 1', 'Item 2', 'Item 3', 'Item 4']:
+            # Sparse histories: each pair only trades on some days
+            for day in days[rng.random(len(days)) < 0.6]:
+                rows.append({'Bar Name': bar, 'Item': item, 'Day': day,
+                             'Consumed (ml)': float(rng.gamma(2.0, 60.0))})
+    df = pd.DataFrame(rows)
+    par_levels = {
+        key: {'par_level_ml': float(rng.uniform(50, 400)), 'reorder_point_ml': float(rng.uniform(0, 150))}
+        for key in df.groupby(['Bar Name', 'Item']).size().index
+    }
+    par_levels[('Bar Z', 'Item 9')] = {'par_level_ml': 100.0, 'reorder_point_ml': 50.0}
+
+    loop_df, loop_level = simulate_inventory_system(df, {}, par_levels, simulation_days=30, engine='loop')
+    vec_df, vec_level = simulate_inventory_system(df, {}, par_levels, simulation_days=30, engine='vectorized')
+
+    assert len(vec_df) == 12
+    assert loop_df['Stockouts'].sum() > 0
+    pd.testing.assert_frame_equal(vec_df, loop_df, check_dtype=False)
+    assert vec_level == loop_level
@@ -0,0 +1,56 @@
+import os
+
+import pandas as pd
+from src.data_model import ForecastTable
+from src import stage_cache
+from src.stage_cache import StageCache, source_digest, stage_key
+
+
+def test_stage_key_depends_on_params_and_upstream():
+    data = stage_key('data', {'sha256': 'abc'})
+    forecast = stage_key('forecast', {'forecast_days': 30}, data)
+    assert forecast == stage_key('forecast', {'forecast_days': 30}, data)
+    assert forecast != stage_key('forecast', {'forecast_days': 14}, data)
+    assert forecast != stage_key('forecast', {'forecast_days': 30}, stage_key('data', {'sha256': 'def'}))
+    # A stage's own parameters change its key
+    assert stage_key('par', {'service_level': 0.95}, forecast) != stage_key('par', {'service_level': 0.99}, forecast)
+
+
+
+def test_stage_key_depends_on_pipeline_source(tmp_path, monkeypatch):
+    (tmp_path / 'forecasting.py').write_text('ALPHA = 0.2\n')
+    before = source_digest(str(tmp_path))
+    source_digest.cache_clear()
+    (tmp_path / 'forecasting.py').write_text('ALPHA = 0.3\n')
+    assert source_digest(str(tmp_path)) != before
+
+    key = stage_key('forecast', {'forecast_days': 30})
+    monkeypatch.setattr(stage_cache, 'source_digest', lambda: 'edited')
+    assert stage_key('forecast', {'forecast_days': 30}) != key
+
+
+def test_memoize_reuses_and_evicts_least_recently_used(tmp_path):
+    cache = StageCache(str(tmp_path), max_bytes=10 ** 9)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return ForecastTable.from_dict({('Bar A', 'Item 1'): {'forecast_daily': 10.0}})
+
+    first = cache.memoize('forecast-a', compute)
+    second = cache.memoize('forecast-a', compute)
+    assert len(calls) == 1 and cache.hits == 1
+    assert second.to_dict() == first.to_dict()
+
+    cache.put('b', pd.DataFrame({'x': range(1000)}))
+    os.utime(tmp_path / 'forecast-a.pkl', ns=(0, 0))  # make 'forecast-a' the least recently used
+    cache.max_bytes = os.path.getsize(tmp_path / 'b.pkl') + 1
+    cache.put('c', 1)
+    assert cache.get('forecast-a') is None
+    assert cache.get('c') == 1
+
+
+def test_disabled_cache_always_computes():
+    cache = StageCache(None)
+    assert cache.memoize('k', lambda: 1) == 1
+    assert cache.memoize('k', lambda: 2) == 2
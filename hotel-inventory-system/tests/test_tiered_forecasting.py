@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from src.batched_holt_winters import pad_series
+from src.forecasting import forecast_demand
+from src.tiered_forecasting import classify_series, croston_sba, moving_average
+
+
+def test_classify_series():
+    assert classify_series([5.0] * 10) == 'short'
+    assert classify_series([0, 0, 40, 0, 0, 0, 30] * 4) == 'intermittent'
+    assert classify_series([0.0] * 20) == 'intermittent'
+    assert classify_series(100 + 20 * np.sin(np.arange(28))) == 'regular'
+
+
+def test_cheap_methods():
+    matrix, lengths = pad_series([np.array([1.0, 2.0, 3.0]), np.arange(10, dtype=float)])
+    daily, mse = moving_average(matrix, lengths, window=2)
+    assert np.allclose(daily, [2.5, 8.5])
+    # Series 0: predict 2 from [1] and 3 from [1, 2] -> errors 1 and 1.5
+    assert np.isclose(mse[0], (1.0 + 1.5 ** 2) / 2)
+
+    # Demand of 10 every third day: SBA rate is (1 - alpha/2) * 10 / 3
+    matrix, lengths = pad_series([np.array([0, 0, 10] * 6, dtype=float), np.zeros(5)])
+    rate = croston_sba(matrix, lengths, alpha=0.1)
+    assert np.isclose(rate[0], 0.95 * 10 / 3)
+    assert rate[1] == 0.0
+
+
+def test_forecast_demand_tiered():
+    days = pd.date_range(start='2023-01-01', periods=56, freq='D')
+    weekly = np.tile([80, 90, 100, 110, 160, 200, 150], 8).astype(float)
+    frames = [
+        pd.DataFrame({'Day': days, 'Bar Name': 'Bar A', 'Item': 'Regular', 'Consumed (ml)': weekly}),
+        pd.DataFrame({'Day': days, 'Bar Name': 'Bar A', 'Item': 'Flat', 'Consumed (ml)': 50.0}),
+        pd.DataFrame({'Day': days, 'Bar Name': 'Bar A', 'Item': 'Sparse',
+                      'Consumed (ml)': np.where(np.arange(56) % 4 == 0, 60.0, 0.0)}),
+        pd.DataFrame({'Day': days[:2], 'Bar Name': 'Bar A', 'Item': 'New', 'Consumed (ml)': [30.0, 50.0]}),
+    ]
+    df = pd.concat(frames, ignore_index=True)
+    timings = {}
+    forecasts = forecast_demand(df, forecast_days=7, backend='tiered', timings=timings)
+
+    methods = {key[1]: f['method'] for key, f in forecasts.items()}
+    assert methods == {'Flat': 'moving_average', 'New': 'moving_average',
+                       'Regular': 'batched_holt_winters', 'Sparse': 'croston_sba'}
+    assert np.isclose(forecasts[('Bar A', 'Flat')]['forecast_daily'], 50.0)
+    assert np.isclose(forecasts[('Bar A', 'Regular')]['forecast_daily'], weekly.mean(), rtol=0.05)
+    assert forecasts[('Bar A', 'New')]['std_consumption'] > 0
+    assert {tier: stats['fits'] for tier, stats in timings.items()} == {'short': 1, 'intermittent': 1, 'regular': 2}
+    assert timings['regular']['methods'] == {'batched_holt_winters': 1, 'moving_average': 1}